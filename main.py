@@ -1,9 +1,11 @@
 import pygame, sys
-from scripts.helpers.timer import Timer
+from scripts.helpers.timer import Timer, scheduler
+from scripts.helpers.assets import assets
+from scripts.helpers.background import background
+from scripts.helpers.timestep import FixedTimestep
 from settings import *
 from scripts.level import Level
-from scripts.ui.menu import MainMenu, PauseMenu, ShopMenu, CharacterSelectUI
-from scripts.db.settings_db import SettingsDB
+from scripts.ui.menu import MainMenu, PauseMenu, ShopMenu, CharacterSelectUI, LoadingScreen
 from scripts.ui.overlay import FPSOverlay
 from scripts.models.mission import MissionManager
 from scripts.ui.mission_ui import MissionUI
@@ -15,26 +17,30 @@ class Game:
 		
 		self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 		pygame.display.set_caption('Sprout Land')
+		# Nạp settings trên thread nền trong lúc dựng menu
+		settings_service.load_async()
 		
 		# pygame.mouse.set_visible(False)
-		self.default_cursor_img = pygame.image.load(f"{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png").convert_alpha()	
-		self.point_cursor_img = pygame.image.load(f"{GRAPHICS_PATH}/mouse/Catpaw pointing Mouse icon.png").convert_alpha()
-		self.hold_cursor_img = pygame.image.load(f"{GRAPHICS_PATH}/mouse/Catpaw holding Mouse icon.png").convert_alpha()
+		self.default_cursor_img = assets.image(f"{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png")	
+		self.point_cursor_img = assets.image(f"{GRAPHICS_PATH}/mouse/Catpaw pointing Mouse icon.png")
+		self.hold_cursor_img = assets.image(f"{GRAPHICS_PATH}/mouse/Catpaw holding Mouse icon.png")
 	
 		self.clock = pygame.time.Clock()
+		self.timestep = FixedTimestep()
 
 		self.player_id = None  # Lưu ID người chơi hiện tại
 		self.main_menu_screen = MainMenu(self.screen)
 		self.pause_menu_screen = PauseMenu(self.screen)
 		self.character_select_ui = None  # Sẽ được khởi tạo khi cần thiết
+		self.loading_screen = LoadingScreen(self.screen)
 		player_id = 1
 		self.level = Level(str(player_id))
 		self.shop_menu = ShopMenu(self.level.player, self.level.toggle_shop)
 
-		self.timer = Timer(300)
+		self.timer = Timer(300, clock='wall')
 		self.running = True
 		self.paused = False
-		self.game_state = "menu"  # "menu", "character_select", "game", "paused", "shop"
+		self.game_state = "menu"  # "menu", "character_select", "loading", "game", "paused", "shop"
 		pygame.event.set_grab(True)  # Keep mouse in window
 		pygame.mouse.set_visible(False)  # Hide system cursor
 		self.last_mouse_pos = pygame.mouse.get_pos()
@@ -76,6 +82,11 @@ class Game:
 			# Clear screen
 			self.screen.fill('black')
 
+			# Chạy callback của các lần lưu/nạp đã xong trên thread nền
+			background.poll()
+			# Timer của UI (đồng hồ wall); timer trong game chạy qua Level.run
+			scheduler.update()
+
 			# Handle events
 			for event in pygame.event.get():
 				if event.type == pygame.QUIT:
@@ -117,24 +128,16 @@ class Game:
 		def on_character_selected(player_id):
 			"""Được gọi khi người chơi chọn hoặc tạo nhân vật"""
 			self.player_id = player_id
-			self.game_state = "game"
+			self.game_state = "loading"
+			self.loading_screen.reset()
 			
 			 # Dọn dẹp Level cũ nếu đã có
 			if hasattr(self, 'level') and self.level:
 				self.level.cleanup()
 			
-			# Khởi tạo Level mới với player_id đã chọn
-			self.level = Level(str(player_id))
-			
-			# Load dữ liệu game sau khi đã khởi tạo Level
-			self.level.load_game()
-			
-			# Khởi tạo lại các component phụ thuộc vào Level
-			self.shop_menu = ShopMenu(self.level.player, self.level.toggle_shop)
-			self.mission_manager = MissionManager(player_id=player_id, player=self.level.player)
-			self.mission_manager.load_player_missions()
-			self.level.player.mission_manager = self.mission_manager
-			self.mission_ui = MissionUI(self.mission_manager)
+			# Đọc DB trên thread nền, màn hình loading vẫn chạy; dựng Level khi đọc xong
+			background.submit(Level.fetch_player_data, str(player_id),
+				on_done=lambda prefetched, error: self.finish_loading(player_id, prefetched, error))
 		
 		def on_character_selection_cancelled():
 			"""Được gọi khi người chơi hủy chọn nhân vật"""
@@ -147,6 +150,32 @@ class Game:
 			on_cancel_callback=on_character_selection_cancelled
 		)
 
+	def finish_loading(self, player_id, prefetched, error):
+		"""Dựng Level từ dữ liệu đã đọc sẵn (chạy ở vòng lặp game qua background.poll)"""
+		if error:
+			print(f"Error loading player data: {error}")
+			prefetched = None
+		if self.game_state != "loading" or self.player_id != player_id:
+			return  # Người chơi đã rời màn hình loading
+
+		# Khởi tạo Level mới với player_id đã chọn
+		self.level = Level(str(player_id), prefetched)
+		
+		# Load dữ liệu game sau khi đã khởi tạo Level
+		if prefetched:
+			self.level.apply_game_state(prefetched['game_state'], prefetched['keys_bind'])
+		else:
+			self.level.load_game()
+		
+		# Khởi tạo lại các component phụ thuộc vào Level
+		self.shop_menu = ShopMenu(self.level.player, self.level.toggle_shop)
+		self.mission_manager = MissionManager(player_id=player_id, player=self.level.player)
+		self.mission_manager.load_player_missions(prefetched['missions'] if prefetched else None)
+		self.level.player.mission_manager = self.mission_manager
+		self.mission_ui = MissionUI(self.mission_manager)
+		self.timestep.reset()
+		self.game_state = "game"
+
 	def handle_escape(self):
 		"""Handle escape key press"""
 		if self.game_state == "character_select":
@@ -156,6 +185,9 @@ class Game:
 		elif self.game_state == "game":
 			self.game_state = "paused"
 			self.reset_pause_menu()
+			# Ghi các thay đổi inventory/nhiệm vụ đang chờ khi tạm dừng
+			self.level.player.save_inventory()
+			self.mission_manager.save_player_missions(urgent=True)
 		elif self.game_state == "shop":
 			self.game_state = "game"
 			self.level.shop_active = False
@@ -209,27 +241,30 @@ class Game:
 			# Xử lý sự kiện và vẽ UI chọn nhân vật
 			self.character_select_ui.update(dt)
 			self.character_select_ui.draw()
+
+		elif self.game_state == "loading":
+			self.loading_screen.draw(dt)
 		
 		elif self.game_state == "paused":
-			self.level.run(dt)
+			self.run_level(dt)
 			result = self.pause_menu_screen.run(dt)
 			if result == "home":
 				self.game_state = "menu"
-				if self.level.save_game():
-					print('Game saved!')
+				# Ghi trên thread nền, không chặn frame
+				self.level.save_game(on_done=lambda ok: print('Game saved!' if ok else 'Game save failed'))
 				self.main_menu_screen.running = True
 			elif not self.pause_menu_screen.active:
 				self.game_state = "game"
 		
 		elif self.game_state == "shop":
-			self.level.run(dt)
+			self.run_level(dt)
 			self.shop_menu.update(dt)
 				
 		elif self.game_state == "game":
 			# Update inventory
 			if self.level.player.inventory_ui.active:
 				self.level.player.inventory_ui.update(mouse_pos, mouse_pressed)
-			self.level.run(dt)
+			self.run_level(dt)
 			if self.level.shop_active:
 				self.game_state = "shop"
 
@@ -244,6 +279,12 @@ class Game:
 		# Single update per frame
 		pygame.display.flip()  # Use flip() instead of update()
 
+	def run_level(self, dt):
+		"""Chạy mô phỏng theo bước cố định (SIM_FPS) rồi vẽ một lần, nội suy player/camera"""
+		for _ in range(self.timestep.advance(dt)):
+			self.level.update(self.timestep.step)
+		self.level.draw(dt, self.timestep.alpha)
+
 	def reset_pause_menu(self):
 		"""Reset pause menu state when returning from main menu"""
 		self.pause_menu_screen.active = False
@@ -253,3 +294,5 @@ class Game:
 if __name__ == '__main__':
 	game = Game()
 	game.run()
+	# Chờ các lần lưu đang chạy trên thread nền
+	background.shutdown()
@@ -1,9 +1,154 @@
-import mysql.connector
-from mysql.connector import Error
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as MySQLError
+except ImportError:
+    # Chỉ dùng được backend SQLite
+    mysql = None
+    class MySQLError(Exception):
+        pass
+
+from scripts.db.sqlite_backend import SQLiteConnection, create_schema
+
+class PoolError(Exception):
+    pass
+
+# Bắt được lỗi của mọi backend: except Error as e
+Error = (MySQLError, sqlite3.Error, PoolError)
+
+# Khóa duy nhất cần có để ghi bằng upsert. Schema SQLite đã có sẵn (PRIMARY KEY),
+# database MySQL cũ được thêm khi mở connection đầu tiên (ensure_unique_keys)
+UNIQUE_KEYS = {
+    'inventory': ('player_id', 'slot_number'),
+}
+
+class PooledConnection:
+    """Bọc connection lấy từ pool: close() trả connection về pool thay vì đóng socket"""
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def close(self):
+        if self._connection is not None:
+            self._pool.release(self._connection)
+            self._connection = None
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class ConnectionPool:
+    """Pool connection có giới hạn: tái sử dụng connection thay vì kết nối lại cho mỗi truy vấn.
+       open_connection: hàm không tham số mở một connection mới (MySQL hoặc SQLite)"""
+    def __init__(self, open_connection, size=4, timeout=5, health_check_interval=30):
+        self.open_connection = open_connection
+        self.size = size
+        self.timeout = timeout  # số giây chờ connection rảnh khi pool đã dùng hết
+        self.health_check_interval = health_check_interval  # ping connection rảnh lâu hơn số giây này
+        self.idle = queue.LifoQueue()  # Format: (connection, thời điểm trả về)
+        self.lock = threading.Lock()
+        self.created = 0
+
+        # Thống kê
+        self.checkouts = 0
+        self.waits = 0
+        self.reconnects = 0
+        self.failures = 0
+
+    def _open(self):
+        try:
+            return self.open_connection()
+        except Error:
+            with self.lock:
+                self.created -= 1
+                self.failures += 1
+            raise
+
+    def _check(self, connection, idle_since):
+        """Kiểm tra connection đã rảnh lâu; mở lại nếu server đã đóng nó"""
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return connection
+        try:
+            connection.ping(reconnect=False)
+            return connection
+        except Error:
+            with self.lock:
+                self.reconnects += 1
+            try:
+                connection.close()
+            except Error:
+                pass
+            return self._open()
+
+    def acquire(self):
+        try:
+            connection, idle_since = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_create = self.created < self.size
+                if can_create:
+                    self.created += 1
+            if can_create:
+                connection = self._open()
+                idle_since = time.monotonic()
+            else:
+                with self.lock:
+                    self.waits += 1
+                try:
+                    connection, idle_since = self.idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolError(f"Connection pool exhausted ({self.size} connections busy)")
+        connection = self._check(connection, idle_since)
+        with self.lock:
+            self.checkouts += 1
+        return connection
+
+    def release(self, connection):
+        try:
+            # Bỏ transaction dang dở để connection sạch cho lần dùng sau
+            if connection.in_transaction:
+                connection.rollback()
+            self.idle.put((connection, time.monotonic()))
+        except Error:
+            self.discard(connection)
+
+    def discard(self, connection):
+        with self.lock:
+            self.created -= 1
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def close_all(self):
+        while True:
+            try:
+                connection, _ = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(connection)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': self.size,
+                'open': self.created,
+                'idle': self.idle.qsize(),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'reconnects': self.reconnects,
+                'failures': self.failures,
+            }
+
 
 class DatabaseConnection:
     _instance = None
-    _connection = None
     
     @classmethod
     def get_instance(cls):
@@ -11,7 +156,13 @@ class DatabaseConnection:
             cls._instance = DatabaseConnection()
         return cls._instance
     
-    def __init__(self):
+    def __init__(self, backend=None, sqlite_path=None):
+        # Chọn backend: 'mysql' (mặc định) hoặc 'sqlite' - chạy local không cần server
+        self.backend = backend or os.environ.get('SPROUT_DB_BACKEND', 'mysql')
+        self.sqlite_config = {
+            'path': sqlite_path or os.environ.get('SPROUT_DB_PATH', 'sprout_land.db'),
+            'timeout': 5
+        }
         self.db_config = {
             'host': 'localhost',
             'user': 'root',
@@ -22,54 +173,201 @@ class DatabaseConnection:
             'connection_timeout': 5,
             'autocommit': False
         }
+        self.pool_config = {
+            'size': 4,
+            'timeout': 5,
+            'health_check_interval': 30
+        }
+        self.pool = ConnectionPool(self.open_connection, **self.pool_config)
+        self.schema_ready = False
+        self.unique_keys = {}  # Format: {table: True/False} khóa trong UNIQUE_KEYS có tồn tại không
+
+        # Thống kê execute_transaction
+        self.stats_lock = threading.Lock()
+        self.last_transaction = None
+        self.transactions = 0
+        self.statements = 0
+        self.round_trips = 0
+        self.rows = 0
+        self.transaction_time = 0.0
+
+    @property
+    def dialect(self):
+        return 'sqlite' if self.backend == 'sqlite' else 'mysql'
+
+    def open_connection(self):
+        if self.dialect == 'sqlite':
+            if not self.schema_ready:
+                create_schema(self.sqlite_config['path'], self.sqlite_config['timeout'])
+                self.schema_ready = True
+            return SQLiteConnection(self.sqlite_config['path'], self.sqlite_config['timeout'])
+        if mysql is None:
+            raise PoolError("mysql-connector-python is not installed (set SPROUT_DB_BACKEND=sqlite)")
+        connection = mysql.connector.connect(**self.db_config)
+        if not self.schema_ready:
+            cursor = connection.cursor()
+            try:
+                self.ensure_unique_keys(cursor)
+            finally:
+                cursor.close()
+            self.schema_ready = True
+        return connection
+
+    def ensure_unique_keys(self, cursor):
+        """Thêm các khóa trong UNIQUE_KEYS nếu bảng MySQL chưa có. Lỗi (ví dụ dữ liệu đang trùng)
+           chỉ được in ra và ghi nhận, nơi ghi sẽ dùng cách cũ (xóa rồi chèn) thay vì upsert."""
+        for table, columns in UNIQUE_KEYS.items():
+            if self.dialect == 'sqlite':
+                self.unique_keys[table] = True
+                continue
+            try:
+                cursor.execute(f"SHOW INDEX FROM {table}")
+                indexes = {}
+                for row in cursor.fetchall():
+                    # Cột: Table, Non_unique, Key_name, Seq_in_index, Column_name, ...
+                    if not int(row[1]):
+                        indexes.setdefault(row[2], set()).add(row[4])
+                if set(columns) not in indexes.values():
+                    cursor.execute(f"ALTER TABLE {table} ADD UNIQUE KEY uq_{table}_{'_'.join(columns)} ({', '.join(columns)})")
+                self.unique_keys[table] = True
+            except Error as e:
+                print(f"Error adding unique key on {table}{columns}: {e}")
+                self.unique_keys[table] = False
+
+    def has_unique_key(self, table):
+        return self.unique_keys.get(table, self.dialect == 'sqlite')
+
+    def upsert(self, table, columns, keys):
+        """Câu INSERT cập nhật khi trùng khóa theo cú pháp của backend.
+           Tham số truyền theo thứ tự columns, mỗi cột một lần."""
+        placeholders = ', '.join(['%s'] * len(columns))
+        updates = [column for column in columns if column not in keys]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        if self.dialect == 'sqlite':
+            assignments = ', '.join(f"{column} = excluded.{column}" for column in updates)
+            return f"{query} ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {assignments}"
+        assignments = ', '.join(f"{column} = new_data.{column}" for column in updates)
+        return f"{query} AS new_data ON DUPLICATE KEY UPDATE {assignments}"
+
+    def table_columns(self, table):
+        """Danh sách cột của bảng (dùng cho công cụ chuyển dữ liệu)"""
+        with self.session() as cursor:
+            if self.dialect == 'sqlite':
+                cursor.execute(f"PRAGMA table_info({table})")
+                return [row[1] for row in cursor.fetchall()]
+            cursor.execute(f"SHOW COLUMNS FROM {table}")
+            return [row[0] for row in cursor.fetchall()]
 
     def connect(self):
-        """Create database connection with error handling"""
+        """Lấy một connection từ pool; gọi close() để trả lại pool"""
         try:
-            if not self._connection or not self._connection.is_connected():
-                self._connection = mysql.connector.connect(**self.db_config)
-            return self._connection
+            return PooledConnection(self.pool, self.pool.acquire())
         except Error as e:
             print(f"Connection error: {e}")
             return None
 
-    def execute_transaction(self, operations):
-        """Execute multiple operations in a single transaction"""
-        connection = self.connect()
-        if not connection:
-            return False
-
+    @contextmanager
+    def session(self, dictionary=False):
+        """with db.session() as cursor: ... - commit khi thoát bình thường, rollback khi có lỗi.
+           Ném Error nếu không lấy được connection."""
+        connection = self.pool.acquire()
         cursor = None
+        broken = False
         try:
-            cursor = connection.cursor()
-            for operation in operations:
-                query, params = operation
-                cursor.execute(query, params)
+            cursor = connection.cursor(dictionary=dictionary)
+            yield cursor
             connection.commit()
-            return True
+        except BaseException:
+            try:
+                connection.rollback()
+            except Error:
+                # Rollback cũng lỗi: connection đã hỏng, không trả lại pool
+                broken = True
+            raise
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Error:
+                    pass
+            if broken:
+                self.pool.discard(connection)
+            else:
+                self.pool.release(connection)
+
+    @staticmethod
+    def group_operations(operations):
+        """Gom các câu lệnh giống nhau liền kề thành một lô [(query, [params, ...])], giữ nguyên thứ tự"""
+        batches = []
+        for query, params in operations:
+            if batches and batches[-1][0] == query:
+                batches[-1][1].append(params)
+            else:
+                batches.append((query, [params]))
+        return batches
+
+    def execute_transaction(self, operations):
+        """Execute multiple operations in a single transaction.
+           Các câu lệnh giống nhau liền kề được gửi bằng một executemany
+           (MySQL gộp INSERT thành một câu VALUES nhiều dòng, SQLite dùng lại statement đã chuẩn bị)."""
+        batches = self.group_operations(operations)
+        rows = 0
+        round_trips = 0
+        start = time.perf_counter()
+        try:
+            with self.session() as cursor:
+                for query, params_list in batches:
+                    if len(params_list) == 1:
+                        cursor.execute(query, params_list[0])
+                    else:
+                        cursor.executemany(query, params_list)
+                    rows += max(cursor.rowcount, 0)
+                    round_trips += self.batch_round_trips(query, len(params_list))
         except Error as e:
-            connection.rollback()
             print(f"Transaction error: {e}")
             return False
-        finally:
-            if cursor:
-                cursor.close()
+        self.record_transaction(len(operations), round_trips, rows, time.perf_counter() - start)
+        return True
+
+    def batch_round_trips(self, query, count):
+        """Số lần gửi lệnh thật sự của một lô: mysql.connector chỉ gộp INSERT thành một câu,
+           các lệnh khác (UPDATE, DELETE) executemany vẫn chạy từng dòng một"""
+        if count == 1 or self.dialect == 'sqlite':
+            return 1
+        return 1 if query.lstrip().upper().startswith('INSERT') else count
+
+    def record_transaction(self, statements, round_trips, rows, seconds):
+        with self.stats_lock:
+            self.last_transaction = {
+                'statements': statements,
+                'round_trips': round_trips,
+                'rows': rows,
+                'seconds': seconds,
+            }
+            self.transactions += 1
+            self.statements += statements
+            self.round_trips += round_trips
+            self.rows += rows
+            self.transaction_time += seconds
+
+    def transaction_stats(self):
+        with self.stats_lock:
+            return {
+                'transactions': self.transactions,
+                'statements': self.statements,
+                'round_trips': self.round_trips,
+                'rows': self.rows,
+                'seconds': self.transaction_time,
+                'last': self.last_transaction,
+            }
 
 def get_db_connection():
     """Get database connection using singleton pattern"""
     return DatabaseConnection.get_instance().connect()
 
 def connect_db():
-    """Legacy support for existing code"""
-    try:
-        connection = get_db_connection()
-        if connection is None:
-            # Return a fallback connection for testing
-            return create_fallback_connection()
-        return connection
-    except Error as e:
-        print(f"Connection error: {e}")
-        return create_fallback_connection()
+    """Legacy support for existing code. Trả về None nếu không kết nối được"""
+    return get_db_connection()
 
 def close_db(connection):
     """Safely close database connection"""
@@ -78,31 +376,3 @@ def close_db(connection):
             connection.close()
     except Error as e:
         print(f"Error closing connection: {e}")
-
-def create_fallback_connection():
-    """Create a mock connection for testing"""
-    class MockConnection:
-        def cursor(self, dictionary=False):
-            return MockCursor()
-        def close(self):
-            pass
-        def is_connected(self):
-            return True
-        def commit(self):
-            pass
-        def rollback(self):
-            pass
-        def start_transaction(self):
-            pass
-            
-    class MockCursor:
-        def execute(self, query, params=None):
-            pass
-        def fetchall(self):
-            return []
-        def fetchone(self):
-            return None
-        def close(self):
-            pass
-
-    return MockConnection()
\ No newline at end of file
@@ -1,5 +1,6 @@
-from scripts.db.db import DatabaseConnection, Error, close_db
+from scripts.db.db import DatabaseConnection, Error
 from scripts.db.item_db import Item
+from scripts.db.write_behind import WriteBehindQueue
 
 class InventoryItem(Item):
     def __init__(self, item_data):
@@ -25,10 +26,26 @@ class InventoryItem(Item):
 class Inventory:
     def __init__(self, inventory_data=None):
         self.items = []
+        self.listeners = []  # Hàm gọi lại khi nội dung inventory thay đổi
+        self.stored = None  # Format: {slot_number: (item_id, quantity)} trong DB lúc đọc, None = không rõ
         if inventory_data:
             for item in inventory_data:
                 if item:
                     self.items.append(InventoryItem(item))
+
+    def add_listener(self, callback):
+        """Đăng ký callback() được gọi mỗi khi inventory thay đổi"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify_changed(self):
+        """Báo cho các listener (hotbar, overlay...) rằng inventory đã thay đổi"""
+        for callback in list(self.listeners):
+            callback()
     
     def add_item(self, item_data, quantity=1):
         """Add item to inventory or increase quantity if exists"""
@@ -36,6 +53,7 @@ class Inventory:
         for item in self.items:
             if item is not None and item.item_name == item_data.item_name:
                 item.increase_quantity(quantity)
+                self.notify_changed()
                 return True
         
         # If no existing item found, then look for empty slot
@@ -54,6 +72,7 @@ class Inventory:
             self.items[empty_slot] = new_item
         else:
             self.items.append(new_item)
+        self.notify_changed()
         return True
 
     def remove_item(self, item_name, quantity=1):
@@ -63,6 +82,7 @@ class Inventory:
                 if item.decrease_quantity(quantity):
                     if item.quantity <= 0 and not item.item_name == 'coins':
                         self.items[i] = None  # Replace with None instead of removing
+                    self.notify_changed()
                     return True
         return False
     
@@ -86,58 +106,126 @@ class Inventory:
 class InventoryDatabase:
     @staticmethod
     def get_player_inventory(player_id):
-        connection = None
-        cursor = None
+        # Ghi nốt các thay đổi đang chờ (phiên trước) để dữ liệu đọc ra đúng là nội dung DB
+        WriteBehindQueue.get_instance().flush()
         try:
-            connection = DatabaseConnection.get_instance().connect()
-            if not connection:
-                return Inventory()
-                
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT 
-                    i.item_id,
-                    i.item_name,
-                    i.description,
-                    inv.quantity,
-                    inv.slot_number
-                FROM inventory inv
-                JOIN items i ON inv.item_id = i.item_id
-                WHERE inv.player_id = %s order by inv.slot_number
-            """, (str(player_id),))
-            
-            inventory_data = cursor.fetchall()
-            return Inventory(inventory_data)
+            with DatabaseConnection.get_instance().session(dictionary=True) as cursor:
+                cursor.execute("""
+                    SELECT 
+                        i.item_id,
+                        i.item_name,
+                        i.description,
+                        inv.quantity,
+                        inv.slot_number
+                    FROM inventory inv
+                    JOIN items i ON inv.item_id = i.item_id
+                    WHERE inv.player_id = %s order by inv.slot_number
+                """, (str(player_id),))
+                inventory_data = cursor.fetchall()
+            inventory = Inventory(inventory_data)
+            # Slot trong DB có thể khác vị trí trong bộ nhớ (Inventory dồn các ô trống lại)
+            inventory.stored = {row['slot_number']: (row['item_id'], row['quantity']) for row in inventory_data}
+            return inventory
             
         except Error as e:
             print(f"Error getting inventory: {e}")
             return Inventory()
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+
+    @staticmethod
+    def write_operations(player_id, slots, snapshot, upsert):
+        """Ghi các slot của snapshot: upsert (một lô, cần khóa duy nhất (player_id, slot_number)),
+           hoặc INSERT khi các dòng cũ đã bị xóa trước đó"""
+        db = DatabaseConnection.get_instance()
+        query = (db.upsert('inventory', ('player_id', 'item_id', 'quantity', 'slot_number'), ('player_id', 'slot_number'))
+                 if upsert else
+                 """INSERT INTO inventory (player_id, item_id, quantity, slot_number)
+                   VALUES (%s, %s, %s, %s)""")
+        return [(query, (str(player_id), *snapshot[slot], slot)) for slot in slots]
+
+    @staticmethod
+    def delete_slots(player_id, slots, keep=False):
+        """Một câu DELETE cho các slot (keep=True: xóa mọi slot không nằm trong danh sách)"""
+        if not slots:
+            return [] if not keep else [("DELETE FROM inventory WHERE player_id = %s", (str(player_id),))]
+        return [(
+            "DELETE FROM inventory WHERE player_id = %s AND slot_number {}IN ({})".format(
+                'NOT ' if keep else '', ', '.join(['%s'] * len(slots))),
+            (str(player_id), *slots)
+        )]
+
+    @staticmethod
+    def full_sync_operations(player_id, snapshot, upsert=None):
+        """Đưa inventory của player trong DB về đúng snapshot {slot: (item_id, quantity)} khi không rõ
+           nội dung DB: xóa các slot không có trong snapshot rồi upsert phần còn lại"""
+        if upsert is None:
+            upsert = DatabaseConnection.get_instance().has_unique_key('inventory')
+        slots = sorted(snapshot)
+        # Không có khóa duy nhất: xóa hết rồi chèn lại
+        return (InventoryDatabase.delete_slots(player_id, slots if upsert else [], keep=True)
+                + InventoryDatabase.write_operations(player_id, slots, snapshot, upsert))
+
+    @staticmethod
+    def diff_operations(player_id, persisted, snapshot, upsert=None):
+        """Chỉ ghi lại các slot khác với lần ghi trước: một lô upsert cho slot đổi/mới
+           (một round trip), thêm một DELETE ... IN nếu có slot bị làm trống.
+           Không có khóa duy nhất thì xóa mọi slot đổi rồi chèn lại như trước."""
+        if upsert is None:
+            upsert = DatabaseConnection.get_instance().has_unique_key('inventory')
+        changed = [slot for slot in sorted(set(persisted) | set(snapshot))
+                   if persisted.get(slot) != snapshot.get(slot)]
+        present = [slot for slot in changed if slot in snapshot]
+        if upsert:
+            removed = [slot for slot in changed if slot not in snapshot]
+            return (InventoryDatabase.delete_slots(player_id, removed)
+                    + InventoryDatabase.write_operations(player_id, present, snapshot, True))
+        return (InventoryDatabase.delete_slots(player_id, changed)
+                + InventoryDatabase.write_operations(player_id, present, snapshot, False))
 
     @staticmethod
     def save_inventory(player_id, inventory):
         db = DatabaseConnection.get_instance()
-        
-        # Prepare all operations
-        operations = []
-        
-        # Add delete operation
-        operations.append((
-            "DELETE FROM inventory WHERE player_id = %s",
-            (str(player_id),)
-        ))
-        
-        # Add insert operations
-        for index, item in enumerate(inventory.items):
-            if item is not None:
-                operations.append((
-                    """INSERT INTO inventory (player_id, item_id, quantity, slot_number)
-                       VALUES (%s, %s, %s, %s)""",
-                    (str(player_id), item.item_id, item.quantity, index)
-                ))
         # Execute all operations in single transaction
-        return db.execute_transaction(operations)
+        return db.execute_transaction(
+            InventoryDatabase.full_sync_operations(player_id, InventoryWriter.snapshot_of(inventory)))
+
+
+class InventoryWriter:
+    """Lưu inventory kiểu write-behind: mỗi thay đổi chỉ chụp snapshot và đưa vào WriteBehindQueue,
+       thread nền ghi phần khác biệt so với nội dung DB đã biết (lúc đọc inventory, hoặc lần ghi trước).
+       Chỉ đồng bộ toàn bộ khi không rõ nội dung DB (đọc inventory lỗi)."""
+    def __init__(self, player_id, inventory, queue=None):
+        self.player_id = str(player_id)
+        self.inventory = inventory
+        self.queue = queue or WriteBehindQueue.get_instance()
+        # Format: {slot: (item_id, quantity)} đã nằm trong DB, None = không rõ (cần đồng bộ toàn bộ)
+        self.persisted = dict(inventory.stored) if inventory.stored is not None else None
+        inventory.add_listener(self.mark_dirty)
+
+    @staticmethod
+    def snapshot_of(inventory):
+        return {slot: (item.item_id, item.quantity)
+                for slot, item in enumerate(inventory.items) if item is not None}
+
+    def mark_dirty(self):
+        snapshot = self.snapshot_of(self.inventory)
+        self.queue.submit(('inventory', self.player_id), lambda: self.write(snapshot))
+
+    def save(self):
+        """Ghi sớm (pause, save game, đóng inventory) mà không chặn vòng lặp game"""
+        self.mark_dirty()
+        self.queue.request_flush()
+
+    def flush(self, timeout=None):
+        """Ghi đồng bộ ngay trên thread hiện tại"""
+        self.mark_dirty()
+        return self.queue.flush(timeout)
+
+    def write(self, snapshot):
+        if self.persisted is None:
+            operations = InventoryDatabase.full_sync_operations(self.player_id, snapshot)
+        else:
+            operations = InventoryDatabase.diff_operations(self.player_id, self.persisted, snapshot)
+        if operations and not DatabaseConnection.get_instance().execute_transaction(operations):
+            return False
+        self.persisted = snapshot
+        return True
@@ -1,5 +1,6 @@
-from scripts.db.db import close_db, connect_db, get_db_connection
-from mysql.connector import Error
+import time
+
+from scripts.db.db import DatabaseConnection, Error
 
 class Item:
     def __init__(self, item_data):
@@ -13,89 +14,180 @@ class Item:
     def get_sell_price(self):
         return ItemDatabase.get_item_price(self.item_id, 'sell')
     
+FALLBACK_ITEMS = [
+    {'item_id': 1, 'item_name': 'Corn Seeds', 'description': 'Plant corn'},
+    {'item_id': 2, 'item_name': 'Tomato Seeds', 'description': 'Plant tomatoes'},
+    {'item_id': 3, 'item_name': 'Wood', 'description': 'Building material'}
+]
+
+class ItemCatalog:
+    """Bản sao trong bộ nhớ của bảng items và item_transactions.
+
+    Nạp một lần (lần tra cứu đầu tiên), sau đó mọi lần tra item/giá chỉ là tra dict.
+    Gọi invalidate() sau khi sửa dữ liệu item trong DB, hoặc check_version()
+    để tự nạp lại khi dữ liệu trong DB đã khác lúc nạp.
+    Nếu nạp lỗi (DB không chạy), tra cứu không thử lại trước RETRY_DELAY giây
+    (trừ khi gọi invalidate()/check_version()), để mỗi lần tra item không tốn một lần gọi DB.
+    """
+    RETRY_DELAY = 30.0  # số giây chờ trước khi tra cứu thử nạp lại sau khi nạp lỗi
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = ItemCatalog()
+        return cls._instance
+
+    def __init__(self):
+        self.loaded = False
+        self.version = None  # dấu vân tay dữ liệu lúc nạp, xem fingerprint()
+        self.by_id = {}  # Format: {item_id: Item}
+        self.by_name = {}  # Format: {item_name: Item}
+        self.prices = {}  # Format: {(item_id, transaction_type): price}
+        self.transaction_types = {}  # Format: {item_id: transaction_type đầu tiên}
+        self.shop_items = []  # item có giao dịch mua/bán, theo thứ tự item_id
+        self.loads = 0
+        self.failures = 0
+        self.retry_at = None  # time.monotonic() sớm nhất được thử nạp lại sau lỗi
+        self.checked_at = None  # time.monotonic() lần cuối so version với DB (nạp cũng tính)
+
+    @staticmethod
+    def fingerprint(cursor):
+        """Số dòng/tổng giá của hai bảng: đổi khi có item hoặc giá bị thêm, xóa, sửa"""
+        version = ()
+        for query in ("SELECT COUNT(*), COALESCE(MAX(item_id), 0) FROM items",
+                      "SELECT COUNT(*), COALESCE(SUM(price), 0) FROM item_transactions"):
+            cursor.execute(query)
+            row = cursor.fetchone()
+            version += tuple(row.values()) if isinstance(row, dict) else tuple(row)
+        return version
+
+    def load(self):
+        """Nạp lại toàn bộ catalog trong một session. Trả về False nếu lỗi DB"""
+        try:
+            with DatabaseConnection.get_instance().session(dictionary=True) as cursor:
+                cursor.execute("SELECT item_id, item_name, description FROM items ORDER BY item_id")
+                item_rows = cursor.fetchall()
+                cursor.execute("""
+                    SELECT item_id, transaction_type, price
+                    FROM item_transactions
+                """)
+                transaction_rows = cursor.fetchall()
+                version = self.fingerprint(cursor)
+        except Error as e:
+            print(f"Error loading item catalog: {e}")
+            self.failures += 1
+            self.retry_at = time.monotonic() + self.RETRY_DELAY
+            return False
+
+        self.by_id = {}
+        self.by_name = {}
+        for row in item_rows:
+            item = Item(row)
+            self.by_id[item.item_id] = item
+            self.by_name[item.item_name] = item
+
+        self.prices = {}
+        self.transaction_types = {}
+        shop_ids = set()
+        for row in transaction_rows:
+            self.prices.setdefault((row['item_id'], row['transaction_type']), row['price'])
+            self.transaction_types.setdefault(row['item_id'], row['transaction_type'])
+            if row['transaction_type'] in ('sell', 'buy'):
+                shop_ids.add(row['item_id'])
+        self.shop_items = [item for item_id, item in self.by_id.items() if item_id in shop_ids]
+
+        self.version = version
+        self.loaded = True
+        self.retry_at = None
+        self.checked_at = time.monotonic()
+        self.loads += 1
+        return True
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return True
+        if self.retry_at is not None and time.monotonic() < self.retry_at:
+            # Lần nạp trước lỗi: dùng dữ liệu đang có (có thể rỗng) cho tới hết thời gian chờ
+            return False
+        return self.load()
+
+    def invalidate(self):
+        """Đánh dấu catalog cũ; lần tra cứu sau sẽ nạp lại từ DB"""
+        self.loaded = False
+        self.retry_at = None
+
+    def refresh(self):
+        """Như check_version() nhưng so version với DB nhiều nhất mỗi RETRY_DELAY giây;
+        các lần gọi khác chỉ đọc bộ nhớ (nạp lại ngay nếu đã invalidate())"""
+        if not self.loaded:
+            return self.ensure_loaded()
+        if self.checked_at is not None and time.monotonic() < self.checked_at + self.RETRY_DELAY:
+            return True
+        return self.check_version()
+
+    def check_version(self):
+        """Nạp lại nếu dữ liệu item trong DB đã thay đổi (một truy vấn nhỏ)"""
+        if not self.loaded:
+            return self.load()
+        self.checked_at = time.monotonic()
+        try:
+            with DatabaseConnection.get_instance().session() as cursor:
+                version = self.fingerprint(cursor)
+        except Error as e:
+            print(f"Error checking item catalog version: {e}")
+            return False
+        if version != self.version:
+            return self.load()
+        return True
+
+    def get(self, item_id):
+        self.ensure_loaded()
+        return self.by_id.get(item_id)
+
+    def get_by_name(self, item_name):
+        self.ensure_loaded()
+        return self.by_name.get(item_name)
+
+    def price(self, item_id, transaction_type):
+        self.ensure_loaded()
+        return self.prices.get((item_id, transaction_type))
+
+    def transaction_type(self, item_id):
+        self.ensure_loaded()
+        return self.transaction_types.get(item_id)
+
+    def stats(self):
+        return {
+            'items': len(self.by_id),
+            'prices': len(self.prices),
+            'loads': self.loads,
+            'failures': self.failures,
+            'version': self.version,
+        }
+
+
 class ItemDatabase:
     def __init__(self, db_config):
         self.db_config = db_config
 
     @staticmethod
     def get_all_items():
-        """Get all items with error handling"""
-        connection = None
-        try:
-            connection = get_db_connection()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT DISTINCT
-                    i.item_id,
-                    i.item_name,
-                    i.description
-                FROM item_transactions it
-                JOIN items i ON it.item_id = i.item_id
-                WHERE it.transaction_type IN ('sell', 'buy')
-            """)
-            items = [Item(item_data) for item_data in cursor.fetchall()]
-            return items
-            
-        except Error as e:
-            print(f"Error getting items: {e}")
+        """Item bán/mua trong shop (từ catalog; định kỳ kiểm tra dữ liệu DB đã đổi chưa)"""
+        catalog = ItemCatalog.get_instance()
+        if not catalog.refresh():
             # Return fallback items
-            return [
-                Item({'item_id': 1, 'item_name': 'Corn Seeds', 'description': 'Plant corn'}),
-                Item({'item_id': 2, 'item_name': 'Tomato Seeds', 'description': 'Plant tomatoes'}),
-                Item({'item_id': 3, 'item_name': 'Wood', 'description': 'Building material'})
-            ]
-        finally:
-            if connection:
-                close_db(connection)
+            return [Item(item_data) for item_data in FALLBACK_ITEMS]
+        return list(catalog.shop_items)
     
     def get_item_from_name(item_name):
-        connection = connect_db()
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT * FROM items WHERE item_name = %s"
-        , (item_name,))
-        item = cursor.fetchone()
-        cursor.close()
-        close_db(connection)
-
-        return Item(item)
+        """Trả về None nếu không có item tên này (hoặc catalog chưa nạp được)"""
+        return ItemCatalog.get_instance().get_by_name(item_name)
 
     def get_item_price(item_id, transaction_type):
         """Lấy giá của item theo transaction_type ('buy' hoặc 'sell')"""
-        connection = connect_db()
-        cursor = connection.cursor()
-
-        # Truy vấn lấy giá của item theo item_id và transaction_type
-        cursor.execute("""
-            SELECT price
-            FROM item_transactions
-            WHERE item_id = %s AND transaction_type = %s
-            LIMIT 1
-        """, (item_id, transaction_type))
-
-        # Lấy kết quả truy vấn
-        result = cursor.fetchone()
-
-        if result:
-            return result[0]  # Trả về giá của item
-        else:
-            return None  # Nếu không có giao dịch tương ứng, trả về None
+        return ItemCatalog.get_instance().price(item_id, transaction_type)
 
     def get_transaction_type(item_id):
-        """Lấy giá của item theo transaction_type ('buy' hoặc 'sell')"""
-        connection = connect_db()
-        cursor = connection.cursor()
-
-        cursor.execute("""
-            SELECT transaction_type
-            FROM item_transactions
-            WHERE item_id = %s
-            LIMIT 1
-        """, (item_id))
-
-        result = cursor.fetchone()
-
-        if result:
-            return result[0]  
-        else:
-            return None
\ No newline at end of file
+        """Lấy transaction_type đầu tiên của item"""
+        return ItemCatalog.get_instance().transaction_type(item_id)
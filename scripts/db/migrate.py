@@ -0,0 +1,80 @@
+"""Chép toàn bộ dữ liệu giữa hai backend.
+
+    python -m scripts.db.migrate mysql sqlite [đường dẫn file sqlite]
+    python -m scripts.db.migrate sqlite mysql [đường dẫn file sqlite]
+
+Dữ liệu cũ của các bảng bên đích bị thay thế, tất cả trong một transaction.
+Sau khi chép, bảng đích được thêm các khóa duy nhất trong UNIQUE_KEYS nếu còn thiếu.
+"""
+import sys
+
+from scripts.db.db import DatabaseConnection, Error
+
+# Bảng cha trước, bảng con sau
+TABLES = [
+    'players',
+    'items',
+    'item_transactions',
+    'missions',
+    'settings',
+    'game_states',
+    'world_states',
+    'world_state_deltas',
+    'inventory',
+    'player_missions',
+]
+
+
+def migrate(source, target, tables=TABLES):
+    """Chép dữ liệu từ source sang target (DatabaseConnection). Trả về {bảng: số dòng}"""
+    data = {}
+    with source.session(dictionary=True) as cursor:
+        for table in tables:
+            cursor.execute(f"SELECT * FROM {table}")
+            data[table] = cursor.fetchall()
+
+    copied = {}
+    target_columns = {table: target.table_columns(table) for table in tables}
+    with target.session() as cursor:
+        for table in reversed(tables):
+            cursor.execute(f"DELETE FROM {table}")
+        for table in tables:
+            rows = data[table]
+            copied[table] = len(rows)
+            if not rows:
+                continue
+            columns = [column for column in rows[0] if column in target_columns[table]]
+            skipped = [column for column in rows[0] if column not in target_columns[table]]
+            if skipped:
+                print(f"{table}: bỏ qua cột không có bên đích {skipped}")
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+            cursor.executemany(query, [tuple(row[column] for column in columns) for row in rows])
+
+    # Tách khỏi transaction trên: ALTER TABLE của MySQL tự commit
+    with target.session() as cursor:
+        target.ensure_unique_keys(cursor)
+    return copied
+
+
+def main(argv):
+    if len(argv) < 2 or set(argv[:2]) != {'mysql', 'sqlite'}:
+        print(__doc__)
+        return 1
+    sqlite_path = argv[2] if len(argv) > 2 else None
+    source = DatabaseConnection(argv[0], sqlite_path)
+    target = DatabaseConnection(argv[1], sqlite_path)
+    try:
+        copied = migrate(source, target)
+    except Error as e:
+        print(f"Migration error: {e}")
+        return 1
+    finally:
+        source.pool.close_all()
+        target.pool.close_all()
+    for table, count in copied.items():
+        print(f"{table}: {count} dòng")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,62 +1,49 @@
-from scripts.db.db import get_db_connection
-from mysql.connector import Error
+from scripts.db.db import DatabaseConnection, Error
 
 class MissionDatabase:
     @staticmethod
-    def get_connection():
+    def session(dictionary=False):
         """
-        Lấy connection thông qua db.py (sử dụng singleton).
+        Lấy cursor từ pool connection của db.py (sử dụng singleton).
         """
-        connection = get_db_connection()
-        if connection:
-            return connection
-        else:
-            return None
+        return DatabaseConnection.get_instance().session(dictionary=dictionary)
 
     @staticmethod
     def get_all_missions():
         """Lấy danh sách tất cả nhiệm vụ chung."""
-        connection = MissionDatabase.get_connection()
-        if connection is None:
-            return []
-        cursor = connection.cursor(dictionary=True)
         try:
-            sql = """SELECT 
-                mission_id, name, description, type, npc_assigned, 
-                reward_item, reward_quantity, required_progress,
-                prerequisite_missions, story_stage, previous_mission_id, next_mission_id
-            FROM missions"""
-            cursor.execute(sql)
-            result = cursor.fetchall()
+            with MissionDatabase.session(dictionary=True) as cursor:
+                sql = """SELECT 
+                    mission_id, name, description, type, npc_assigned, 
+                    reward_item, reward_quantity, required_progress,
+                    prerequisite_missions, story_stage, previous_mission_id, next_mission_id
+                FROM missions"""
+                cursor.execute(sql)
+                result = cursor.fetchall()
             return result
         except Error as e:
             print(f"Error in get_all_missions: {e}")
             return []
-        finally:
-            cursor.close()
 
     @staticmethod
     def get_player_missions(player_id):
         """Load nhiệm vụ của một người chơi."""
-        connection = MissionDatabase.get_connection()
-        if connection is None:
-            return []
-        cursor = connection.cursor(dictionary=True)
         try:
-            sql = """SELECT pm.*, m.name, m.description, m.type, m.npc_assigned, m.reward_item, 
-                     m.reward_quantity, m.required_progress
-                     FROM player_missions AS pm 
-                     JOIN missions AS m ON pm.mission_id = m.mission_id 
-                     WHERE player_id = %s"""
-            player_id_str = str(player_id)  # Chuyển đổi player_id thành chuỗi
-            cursor.execute(sql, (player_id_str,))
-            result = cursor.fetchall()
+            with MissionDatabase.session(dictionary=True) as cursor:
+                sql = """SELECT pm.*, m.name, m.description, m.type, m.npc_assigned, m.reward_item, 
+                         m.reward_quantity, m.required_progress
+                         FROM player_missions AS pm 
+                         JOIN missions AS m ON pm.mission_id = m.mission_id 
+                         WHERE player_id = %s"""
+                player_id_str = str(player_id)  # Chuyển đổi player_id thành chuỗi
+                cursor.execute(sql, (player_id_str,))
+                result = cursor.fetchall()
             return result
         except Error as e:
             print(f"Error in get_player_missions: {e}")
             return []
-        finally:
-            cursor.close()
+
+    PLAYER_MISSION_COLUMNS = ('player_id', 'mission_id', 'status', 'progress', 'date_assigned')
 
     @staticmethod
     def save_player_mission(player_id, mission_data):
@@ -69,30 +56,113 @@ class MissionDatabase:
             - date_assigned (ngày giao nhiệm vụ)
         Nếu mission đã tồn tại thì update, ngược lại thì insert.
         """
-        connection = MissionDatabase.get_connection()
-        if connection is None:
-            return
-        cursor = connection.cursor()
+        sql = DatabaseConnection.get_instance().upsert(
+            'player_missions', MissionDatabase.PLAYER_MISSION_COLUMNS, ('player_id', 'mission_id'))
+        params = (
+            str(player_id),
+            mission_data['mission_id'],
+            mission_data['status'],
+            mission_data['progress'],
+            mission_data['date_assigned']
+        )
         try:
-            sql = """
-                INSERT INTO player_missions (player_id, mission_id, status, progress, date_assigned)
-                VALUES (%s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE status = %s, progress = %s, date_assigned = %s
-                """
-            params = (
-                str(player_id),
-                mission_data['mission_id'],
-                mission_data['status'],
-                mission_data['progress'],
-                mission_data['date_assigned'],
-                mission_data['status'],
-                mission_data['progress'],
-                mission_data['date_assigned']
-            )
-            cursor.execute(sql, params)
-            connection.commit()
+            with MissionDatabase.session() as cursor:
+                cursor.execute(sql, params)
         except Error as e:
-            connection.rollback()
             print(f"Error in save_player_mission: {e}")
-        finally:
-            cursor.close()
\ No newline at end of file
+
+    @staticmethod
+    def save_player_missions(player_id, missions_data):
+        """
+        Lưu nhiều nhiệm vụ trong một transaction bằng một lệnh executemany.
+        missions_data: list dictionary có cùng keys với save_player_mission.
+        Trả về True nếu ghi thành công.
+        """
+        if not missions_data:
+            return True
+        sql = DatabaseConnection.get_instance().upsert(
+            'player_missions', MissionDatabase.PLAYER_MISSION_COLUMNS, ('player_id', 'mission_id'))
+        params = [
+            (str(player_id), data['mission_id'], data['status'], data['progress'], data['date_assigned'])
+            for data in missions_data
+        ]
+        try:
+            with MissionDatabase.session() as cursor:
+                cursor.executemany(sql, params)
+            return True
+        except Error as e:
+            print(f"Error in save_player_missions: {e}")
+            return False
+
+
+class MissionCatalog:
+    """Danh sách nhiệm vụ chung (bảng missions) nạp một lần thành đồ thị phụ thuộc (DAG).
+
+    prerequisites: nhiệm vụ -> các nhiệm vụ tiên quyết
+    dependents: cạnh ngược, nhiệm vụ tiên quyết -> các nhiệm vụ chờ nó hoàn thành
+    Gọi invalidate() sau khi sửa bảng missions để nạp lại.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = MissionCatalog()
+        return cls._instance
+
+    def __init__(self):
+        self.loaded = False
+        self.rows = {}  # Format: {mission_id: row}
+        self.prerequisites = {}  # Format: {mission_id: (prerequisite_id, ...)}
+        self.dependents = {}  # Format: {prerequisite_id: [mission_id, ...]}
+        self.loads = 0
+
+    @staticmethod
+    def parse_prerequisites(value):
+        """'1,2,3' -> (1, 2, 3); chuỗi lỗi định dạng được coi như không có điều kiện"""
+        if not value:
+            return ()
+        try:
+            return tuple(int(x) for x in str(value).split(','))
+        except ValueError:
+            return ()
+
+    def load(self):
+        rows = MissionDatabase.get_all_missions()
+        if not rows:
+            # Lỗi DB hoặc chưa có dữ liệu: thử lại ở lần dùng sau
+            return False
+
+        self.rows = {row['mission_id']: row for row in rows}
+        self.prerequisites = {}
+        self.dependents = {}
+        for mission_id, row in self.rows.items():
+            prerequisites = self.parse_prerequisites(row.get('prerequisite_missions'))
+            self.prerequisites[mission_id] = prerequisites
+            for prerequisite_id in prerequisites:
+                self.dependents.setdefault(prerequisite_id, []).append(mission_id)
+        self.loaded = True
+        self.loads += 1
+        return True
+
+    def ensure_loaded(self):
+        return self.loaded or self.load()
+
+    def invalidate(self):
+        self.loaded = False
+
+    def get(self, mission_id):
+        self.ensure_loaded()
+        return self.rows.get(mission_id)
+
+    def all_ids(self):
+        self.ensure_loaded()
+        return list(self.rows)
+
+    def dependents_of(self, mission_id):
+        self.ensure_loaded()
+        return self.dependents.get(mission_id, ())
+
+    def prerequisites_of(self, mission_id):
+        self.ensure_loaded()
+        return self.prerequisites.get(mission_id, ())
@@ -1,10 +1,12 @@
-import json
 import uuid
 from datetime import datetime
 
 import pygame
+from scripts.db import save_codec
 from scripts.db.db import DatabaseConnection, Error
 
+CHECKPOINT_INTERVAL = 10  # số lần lưu giữa hai checkpoint đầy đủ (các lần còn lại chỉ ghi delta)
+
 class PlayerData:
     def __init__(self, player_data):
         self.player_id = player_data['player_id']
@@ -13,130 +15,149 @@ class PlayerData:
 class PlayerDatabase:
     @staticmethod
     def get_player_info(player_id):
-        connection = None
-        cursor = None
         try:
-            connection = DatabaseConnection.get_instance().connect()
-            if not connection:
-                return None
+            with DatabaseConnection.get_instance().session(dictionary=True) as cursor:
+                cursor.execute("""
+                    SELECT * FROM players 
+                    WHERE player_id = %s
+                """, (player_id,))
                 
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT * FROM players 
-                WHERE player_id = %s
-            """, (player_id,))
-            
-            player_data = cursor.fetchone()
+                player_data = cursor.fetchone()
             return PlayerData(player_data) if player_data else None
             
         except Error as e:
             print(f"Error getting player info: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
                 
+    DELTA_TABLE = """
+        CREATE TABLE IF NOT EXISTS world_state_deltas (
+            player_id VARCHAR(36) NOT NULL PRIMARY KEY,
+            seq INT NOT NULL,
+            payload MEDIUMTEXT
+        )
+    """
+    delta_table_ready = False
+    checkpoints = {}  # Format: {player_id: (world của checkpoint, số delta đã ghi từ checkpoint)}
+
+    @staticmethod
+    def ensure_delta_table(cursor):
+        """Tạo bảng world_state_deltas trên database MySQL cũ (schema SQLite đã có sẵn)"""
+        if PlayerDatabase.delta_table_ready:
+            return
+        if DatabaseConnection.get_instance().dialect == 'mysql':
+            # Kiểm tra trước: IF NOT EXISTS vẫn sinh warning, raise_on_warnings sẽ ném lỗi
+            cursor.execute("SHOW TABLES LIKE 'world_state_deltas'")
+            if not cursor.fetchall():
+                cursor.execute(PlayerDatabase.DELTA_TABLE)
+        PlayerDatabase.delta_table_ready = True
+
     @staticmethod
     def save_game_state(player_id, player_data, level_data):
-        """Save complete game state"""
+        """Save complete game state.
+           world (soil/crops/trees/water) lưu dạng nhị phân (save_codec): mỗi lần chỉ ghi delta
+           so với checkpoint, ghi lại checkpoint đầy đủ sau CHECKPOINT_INTERVAL lần."""
         db = DatabaseConnection.get_instance()
-        connection = None
-        cursor = None
+        player_id = str(player_id)
+        world = {key: level_data[key] for key in save_codec.WORLD_SECTIONS}
+        world['soil_grid'] = world['soil_grid'].copy()
+        checkpoint = PlayerDatabase.checkpoints.get(player_id)
+        delta = None
+        if checkpoint and checkpoint[1] + 1 < CHECKPOINT_INTERVAL:
+            delta = save_codec.encode_delta(checkpoint[0], world)
         try:
-            connection = db.connect()
-            if not connection:
-                return False
+            with db.session() as cursor:
+                PlayerDatabase.ensure_delta_table(cursor)
+
+                # Save player state (upsert)
+                cursor.execute(db.upsert(
+                    'game_states',
+                    ('player_id', 'position_x', 'position_y', 'game_time', 'is_raining'),
+                    ('player_id',)
+                ), (
+                    player_id,
+                    player_data['position'].x,
+                    player_data['position'].y,
+                    player_data['game_time'],
+                    level_data['is_raining']
+                ))
                 
-            cursor = connection.cursor()
-            
-            # Save player state with alias
+                if delta is not None:
+                    # Save world delta (checkpoint giữ nguyên)
+                    cursor.execute("""
+                        UPDATE world_states SET time_of_day = %s
+                        WHERE player_id = %s
+                    """, (level_data['time_of_day'], player_id))
+                    cursor.execute(db.upsert(
+                        'world_state_deltas', ('player_id', 'seq', 'payload'), ('player_id',)
+                    ), (player_id, checkpoint[1] + 1, delta))
+                else:
+                    # Save world checkpoint (upsert)
+                    cursor.execute(db.upsert(
+                        'world_states',
+                        ('player_id', 'soil_grid', 'planted_crops', 'trees_state',
+                         'water_grid', 'time_of_day'),
+                        ('player_id',)
+                    ), (
+                        player_id,
+                        save_codec.encode_column('soil_grid', world['soil_grid']),
+                        save_codec.encode_column('planted_crops', world['planted_crops']),
+                        save_codec.encode_column('trees_state', world['trees_state']),
+                        save_codec.encode_column('water_grid', world['water_grid']),
+                        level_data['time_of_day']
+                    ))
+                    cursor.execute("DELETE FROM world_state_deltas WHERE player_id = %s", (player_id,))
 
-            cursor.execute("""
-                INSERT INTO game_states 
-                    (player_id, position_x, position_y, game_time, is_raining)
-                VALUES (%s, %s, %s, %s, %s) AS new_data
-                ON DUPLICATE KEY UPDATE
-                    position_x = new_data.position_x,
-                    position_y = new_data.position_y,
-                    game_time = new_data.game_time,
-                    is_raining = new_data.is_raining
-            """, (
-                player_id,
-                player_data['position'].x,
-                player_data['position'].y,
-                player_data['game_time'],
-                level_data['is_raining']
-            ))
-            
-            # Save world state with alias
-            cursor.execute("""
-                INSERT INTO world_states 
-                    (player_id, soil_grid, planted_crops, trees_state, 
-                    water_grid, time_of_day)
-                VALUES (%s, %s, %s, %s, %s, %s) AS new_data
-                ON DUPLICATE KEY UPDATE
-                    soil_grid = new_data.soil_grid,
-                    planted_crops = new_data.planted_crops,
-                    trees_state = new_data.trees_state,
-                    water_grid = new_data.water_grid,
-                    time_of_day = new_data.time_of_day
-            """, (
-                player_id,
-                json.dumps(level_data['soil_grid']),
-                json.dumps(level_data['planted_crops']),
-                json.dumps(level_data['trees_state']),
-                json.dumps(level_data['water_grid']),
-                level_data['time_of_day']
-            ))
-            
-            connection.commit()
+            if delta is not None:
+                PlayerDatabase.checkpoints[player_id] = (checkpoint[0], checkpoint[1] + 1)
+            else:
+                PlayerDatabase.checkpoints[player_id] = (world, 0)
             return True
             
         except Error as e:
-            if connection:
-                connection.rollback()
             print(f"Error saving game state: {e}")
             return False
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
                 
     @staticmethod
     def load_game_state(player_id):
-        """Load complete game state"""
+        """Load complete game state (đọc được cả save JSON cũ)"""
         db = DatabaseConnection.get_instance()
-        connection = None
-        cursor = None
+        player_id = str(player_id)
         try:
-            connection = db.connect()
-            if not connection:
-                return None
+            with db.session(dictionary=True) as cursor:
+                PlayerDatabase.ensure_delta_table(cursor)
+
+                # Get player state
+                cursor.execute("""
+                    SELECT * FROM game_states 
+                    WHERE player_id = %s
+                """, (player_id,))
+                game_state = cursor.fetchone()
                 
-            cursor = connection.cursor(dictionary=True)
-            
-            # Get player state
-            cursor.execute("""
-                SELECT * FROM game_states 
-                WHERE player_id = %s
-            """, (str(player_id),))
-            game_state = cursor.fetchone()
-            
-            if not game_state:
-                return None
+                if not game_state:
+                    return None
+                    
+                # Get world state
+                cursor.execute("""
+                    SELECT * FROM world_states
+                    WHERE player_id = %s
+                """, (player_id,))
+                world_state = cursor.fetchone()
+
+                cursor.execute("""
+                    SELECT seq, payload FROM world_state_deltas
+                    WHERE player_id = %s
+                """, (player_id,))
+                delta = cursor.fetchone()
                 
-            # Get world state
-            cursor.execute("""
-                SELECT * FROM world_states
-                WHERE player_id = %s
-            """, (str(player_id),))
-            world_state = cursor.fetchone()
-            
             if not world_state:
                 return None
+
+            checkpoint = {key: save_codec.decode_column(key, world_state[key])
+                          for key in save_codec.WORLD_SECTIONS}
+            world = checkpoint
+            if delta:
+                world = save_codec.apply_delta(checkpoint, delta['payload'])
+            PlayerDatabase.checkpoints[player_id] = (checkpoint, delta['seq'] if delta else 0)
                 
             # Return combined state
             return {
@@ -149,147 +170,85 @@ class PlayerDatabase:
                 },
                 'level': {
                     'is_raining': bool(game_state['is_raining']),
-                    'soil_grid': json.loads(world_state['soil_grid']),
-                    'planted_crops': json.loads(world_state['planted_crops']),
-                    'trees_state': json.loads(world_state['trees_state']),
-                    'water_grid': json.loads(world_state['water_grid']),
+                    'soil_grid': world['soil_grid'],
+                    'planted_crops': world['planted_crops'],
+                    'trees_state': world['trees_state'],
+                    'water_grid': world['water_grid'],
                     'time_of_day': float(world_state['time_of_day'])
                 }
             }
             
-        except Error as e:
+        except (Error, ValueError) as e:
             print(f"Error loading game state: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     @staticmethod
     def get_all_players():
         """Get all player characters from the database"""
-        connection = None
-        cursor = None
         try:
-            connection = DatabaseConnection.get_instance().connect()
-            if not connection:
-                return []
+            with DatabaseConnection.get_instance().session(dictionary=True) as cursor:
+                cursor.execute("""
+                    SELECT player_id, player_name, created_at, last_played
+                    FROM players
+                    WHERE player_id <> '1'
+                    ORDER BY last_played DESC
+                """)
                 
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT player_id, player_name, created_at, last_played
-                FROM players
-                WHERE player_id <> '1'
-                ORDER BY last_played DESC
-            """)
-            
-            result = cursor.fetchall()
+                result = cursor.fetchall()
             return result
             
         except Error as e:
             print(f"Error getting all players: {e}")
             return []
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     @staticmethod
     def create_player(player_name):
         """Create a new player character"""
-        connection = None
-        cursor = None
         try:
-            connection = DatabaseConnection.get_instance().connect()
-            if not connection:
-                return None
-                
             player_id = str(uuid.uuid4())  # Generate unique ID 
-            cursor = connection.cursor()
-            
-            # Create player entry
-            cursor.execute("""
-                INSERT INTO players (player_id, player_name, created_at, last_played)
-                VALUES (%s, %s, NOW(), NOW())
-            """, (player_id, player_name))
-        
-            
-            connection.commit()
+            with DatabaseConnection.get_instance().session() as cursor:
+                # Create player entry
+                cursor.execute("""
+                    INSERT INTO players (player_id, player_name, created_at, last_played)
+                    VALUES (%s, %s, NOW(), NOW())
+                """, (player_id, player_name))
             return player_id
             
         except Error as e:
-            if connection:
-                connection.rollback()
             print(f"Error creating player: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     @staticmethod
     def delete_player(player_id):
         """Delete a player character and all related data"""
-        connection = None
-        cursor = None
         try:
-            connection = DatabaseConnection.get_instance().connect()
-            if not connection:
-                return False
+            with DatabaseConnection.get_instance().session() as cursor:
+                # Delete related data first to maintain referential integrity
+                PlayerDatabase.ensure_delta_table(cursor)
+                for table in ["inventory", "player_missions", "game_states", "world_states", "world_state_deltas"]:
+                    cursor.execute(f"DELETE FROM {table} WHERE player_id = %s", (player_id,))
                 
-            cursor = connection.cursor()
-            
-            # Delete related data first to maintain referential integrity
-            for table in ["inventory", "player_missions", "game_states", "world_states"]:
-                cursor.execute(f"DELETE FROM {table} WHERE player_id = %s", (player_id,))
-            
-            # Finally delete the player entry
-            cursor.execute("DELETE FROM players WHERE player_id = %s", (player_id,))
-            
-            connection.commit()
+                # Finally delete the player entry
+                cursor.execute("DELETE FROM players WHERE player_id = %s", (player_id,))
+            PlayerDatabase.checkpoints.pop(str(player_id), None)
             return True
             
         except Error as e:
-            if connection:
-                connection.rollback()
             print(f"Error deleting player: {e}")
             return False
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     @staticmethod
     def update_last_played(player_id):
         """Update the last_played timestamp for a player"""
-        connection = None
-        cursor = None
         try:
-            connection = DatabaseConnection.get_instance().connect()
-            if not connection:
-                return False
-                
-            cursor = connection.cursor()
-            cursor.execute("""
-                UPDATE players 
-                SET last_played = NOW()
-                WHERE player_id = %s
-            """, (player_id,))
-            
-            connection.commit()
+            with DatabaseConnection.get_instance().session() as cursor:
+                cursor.execute("""
+                    UPDATE players 
+                    SET last_played = NOW()
+                    WHERE player_id = %s
+                """, (player_id,))
             return True
             
         except Error as e:
-            if connection:
-                connection.rollback()
             print(f"Error updating last played: {e}")
             return False
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
@@ -0,0 +1,248 @@
+"""Định dạng lưu world_states nhị phân, có version.
+
+Mỗi cột (soil_grid, planted_crops, trees_state, water_grid) và mỗi bản delta là một chuỗi
+'SLS1:' + base64(header + các section). Header: version (1 byte) + cờ (1 byte, bit 0 = zlib).
+Mỗi section: id (1 byte) + độ dài (4 byte) + dữ liệu.
+
+Save JSON cũ (list lồng nhau) vẫn đọc được qua decode_column.
+"""
+import base64
+import json
+import struct
+import zlib
+
+from scripts.models.soil_grid import SoilGrid
+
+MAGIC = 'SLS1:'
+VERSION = 1
+FLAG_ZLIB = 1
+ZLIB_MIN_SIZE = 64  # dữ liệu nhỏ hơn thì không nén
+
+# Section
+SOIL = 1        # toàn bộ lưới đất
+CROPS = 2
+TREES = 3
+WATER = 4
+SOIL_DELTA = 5  # các ô đất khác so với checkpoint
+
+HEADER = struct.Struct('<BB')
+SECTION = struct.Struct('<BI')
+COUNT = struct.Struct('<I')
+GRID_SIZE = struct.Struct('<HH')
+CELL_CHANGE = struct.Struct('<IB')        # index, giá trị mới
+CROP_RECORD = struct.Struct('<iiBd?')     # x, y, loại cây, age, đã tưới
+TREE_RECORD = struct.Struct('<iiBhB?')    # x, y, tên cây, health, số táo, còn sống
+WATER_RECORD = struct.Struct('<ii')
+
+WORLD_SECTIONS = {
+    'soil_grid': SOIL,
+    'planted_crops': CROPS,
+    'trees_state': TREES,
+    'water_grid': WATER,
+}
+
+
+# Khung chung
+def pack(sections):
+    """{section_id: bytes} -> chuỗi 'SLS1:...'"""
+    payload = b''.join(SECTION.pack(section_id, len(body)) + body
+                       for section_id, body in sections.items())
+    flags = 0
+    if len(payload) >= ZLIB_MIN_SIZE:
+        compressed = zlib.compress(payload)
+        if len(compressed) < len(payload):
+            payload = compressed
+            flags |= FLAG_ZLIB
+    return MAGIC + base64.b64encode(HEADER.pack(VERSION, flags) + payload).decode('ascii')
+
+
+def unpack(text):
+    """Ngược lại của pack(); ném ValueError nếu sai định dạng hoặc version mới hơn"""
+    if not is_encoded(text):
+        raise ValueError("Not an encoded save")
+    data = base64.b64decode(text[len(MAGIC):])
+    version, flags = HEADER.unpack_from(data)
+    if version > VERSION:
+        raise ValueError(f"Unsupported save version {version}")
+    payload = data[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+
+    sections = {}
+    offset = 0
+    while offset < len(payload):
+        section_id, length = SECTION.unpack_from(payload, offset)
+        offset += SECTION.size
+        sections[section_id] = payload[offset:offset + length]
+        offset += length
+    return sections
+
+
+def is_encoded(value):
+    return isinstance(value, str) and value.startswith(MAGIC)
+
+
+# Bảng chuỗi (tên loại cây, tên cây) dùng chung trong một section
+def _pack_strings(strings):
+    data = [COUNT.pack(len(strings))]
+    for string in strings:
+        encoded = string.encode('utf-8')
+        data.append(struct.pack('<B', len(encoded)) + encoded)
+    return b''.join(data)
+
+
+def _unpack_strings(data, offset):
+    (count,), offset = COUNT.unpack_from(data, offset), offset + COUNT.size
+    strings = []
+    for _ in range(count):
+        length = data[offset]
+        strings.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+        offset += 1 + length
+    return strings, offset
+
+
+def _pack_records(record, rows):
+    return COUNT.pack(len(rows)) + b''.join(record.pack(*row) for row in rows)
+
+
+def _unpack_records(record, data, offset=0):
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    return [record.unpack_from(data, offset + index * record.size) for index in range(count)]
+
+
+# Lưới đất: 4 bit mỗi ô (FARMABLE/TILLED/WATERED/PLANTED), 2 ô mỗi byte
+def encode_grid(grid):
+    cells = grid.cells
+    if len(cells) % 2:
+        cells = cells + b'\0'
+    packed = bytes((low & 0x0F) | ((high & 0x0F) << 4) for low, high in zip(cells[0::2], cells[1::2]))
+    return GRID_SIZE.pack(grid.width, grid.height) + packed
+
+
+def decode_grid(data):
+    width, height = GRID_SIZE.unpack_from(data)
+    cells = bytearray()
+    for byte in data[GRID_SIZE.size:]:
+        cells.append(byte & 0x0F)
+        cells.append(byte >> 4)
+    return SoilGrid(width, height, cells[:width * height])
+
+
+def encode_grid_delta(base, grid):
+    changes = [(index, value) for index, (old, value) in enumerate(zip(base.cells, grid.cells)) if old != value]
+    return _pack_records(CELL_CHANGE, changes)
+
+
+def apply_grid_delta(base, data):
+    grid = base.copy()
+    for index, value in _unpack_records(CELL_CHANGE, data):
+        grid.cells[index] = value
+    return grid
+
+
+# Cây trồng, cây to, ô đã tưới
+def normalize_crops(crops):
+    return [(int(crop['position'][0]), int(crop['position'][1]), crop['type'],
+             float(crop['age']), bool(crop['watered'])) for crop in crops]
+
+
+def normalize_trees(trees):
+    return [(int(tree['position'][0]), int(tree['position'][1]), tree.get('name', 'Oak'),
+             int(tree['health']), int(tree.get('apples', 0)), bool(tree.get('alive', True))) for tree in trees]
+
+
+def normalize_water(water):
+    return [(int(x), int(y)) for x, y in water]
+
+
+def _encode_named(record, rows, name_index):
+    names = sorted({row[name_index] for row in rows})
+    lookup = {name: index for index, name in enumerate(names)}
+    records = [row[:name_index] + (lookup[row[name_index]],) + row[name_index + 1:] for row in rows]
+    return _pack_strings(names) + _pack_records(record, records)
+
+
+def _decode_named(record, data, name_index):
+    names, offset = _unpack_strings(data, 0)
+    return [row[:name_index] + (names[row[name_index]],) + row[name_index + 1:]
+            for row in _unpack_records(record, data, offset)]
+
+
+def encode_crops(crops):
+    return _encode_named(CROP_RECORD, normalize_crops(crops), 2)
+
+
+def decode_crops(data):
+    return [{'type': plant_type, 'position': (x, y), 'age': age, 'watered': watered}
+            for x, y, plant_type, age, watered in _decode_named(CROP_RECORD, data, 2)]
+
+
+def encode_trees(trees):
+    return _encode_named(TREE_RECORD, normalize_trees(trees), 2)
+
+
+def decode_trees(data):
+    return [{'position': (x, y), 'name': name, 'health': health, 'apples': apples, 'alive': alive}
+            for x, y, name, health, apples, alive in _decode_named(TREE_RECORD, data, 2)]
+
+
+def encode_water(water):
+    return _pack_records(WATER_RECORD, normalize_water(water))
+
+
+def decode_water(data):
+    return [(x, y) for x, y in _unpack_records(WATER_RECORD, data)]
+
+
+ENCODERS = {SOIL: encode_grid, CROPS: encode_crops, TREES: encode_trees, WATER: encode_water}
+DECODERS = {SOIL: decode_grid, CROPS: decode_crops, TREES: decode_trees, WATER: decode_water}
+NORMALIZERS = {CROPS: normalize_crops, TREES: normalize_trees, WATER: normalize_water}
+
+
+# Cột world_states
+def encode_column(key, value):
+    """Giá trị một cột world_states -> JSON (chuỗi 'SLS1:...' bọc trong JSON để cột kiểu JSON vẫn nhận)"""
+    section_id = WORLD_SECTIONS[key]
+    return json.dumps(pack({section_id: ENCODERS[section_id](value)}))
+
+
+def decode_column(key, text):
+    """Đọc một cột world_states; hỗ trợ cả save JSON cũ"""
+    value = json.loads(text) if text else None
+    if key == 'soil_grid':
+        if is_encoded(value):
+            return decode_grid(unpack(value)[SOIL])
+        return SoilGrid.from_markers(value or [])
+    if is_encoded(value):
+        section_id = WORLD_SECTIONS[key]
+        return DECODERS[section_id](unpack(value)[section_id])
+    if key == 'water_grid':
+        return [tuple(position) for position in value or []]
+    return value or []
+
+
+# Delta so với checkpoint
+def encode_delta(base, world):
+    """Chỉ lưu phần world khác base (checkpoint). Trả về None nếu không thể lưu dạng delta."""
+    if (base['soil_grid'].width, base['soil_grid'].height) != (world['soil_grid'].width, world['soil_grid'].height):
+        return None
+    sections = {SOIL_DELTA: encode_grid_delta(base['soil_grid'], world['soil_grid'])}
+    for key, section_id in WORLD_SECTIONS.items():
+        if section_id == SOIL:
+            continue
+        normalize = NORMALIZERS[section_id]
+        if normalize(world[key]) != normalize(base[key]):
+            sections[section_id] = ENCODERS[section_id](world[key])
+    return pack(sections)
+
+
+def apply_delta(base, text):
+    sections = unpack(text)
+    world = dict(base)
+    if SOIL_DELTA in sections:
+        world['soil_grid'] = apply_grid_delta(base['soil_grid'], sections[SOIL_DELTA])
+    for key, section_id in WORLD_SECTIONS.items():
+        if section_id in sections and section_id != SOIL:
+            world[key] = DECODERS[section_id](sections[section_id])
+    return world
@@ -1,6 +1,4 @@
-import mysql.connector
-from mysql.connector import Error
-from .db import DatabaseConnection
+from .db import DatabaseConnection, Error
 import json
 
 class SettingsDB:	
@@ -14,20 +12,16 @@ class SettingsDB:
 			keys_bind JSON
 		"""
 		db = DatabaseConnection.get_instance()
-		connection = db.connect()
-		cursor = None
 		settings = {}
 		try:
-			cursor = connection.cursor(dictionary=True)
-			# assuming there is a single settings record with settingsid = 1
-			cursor.execute("SELECT volume, keys_bind FROM settings WHERE idsettings = 1")
-			row = cursor.fetchone()
+			with db.session(dictionary=True) as cursor:
+				# assuming there is a single settings record with settingsid = 1
+				cursor.execute("SELECT volume, keys_bind FROM settings WHERE idsettings = 1")
+				row = cursor.fetchone()
 			if row:
 				settings['volume'] = row['volume']
 				# Convert JSON string to dict:
 				settings['keys_bind'] = json.loads(row['keys_bind']) if row['keys_bind'] else {}
-			cursor.close()
-			connection.close()
 		except Error as e:
 			print("Error retrieving settings:", e)
 		return settings
@@ -36,28 +30,21 @@ class SettingsDB:
 	def save_setting(volume, keys_bind):
 		"""
 		Save or update settings in the database.
-		Uses an INSERT ... ON DUPLICATE KEY UPDATE query.
+		Uses an upsert (ON DUPLICATE KEY UPDATE / ON CONFLICT, depending on the backend).
 		The table structure is expected to have a single record with settingsid = 1.
 		"""
 		db = DatabaseConnection.get_instance()
-		connection = db.connect()
-		cursor = None
 		try:
-			cursor = connection.cursor()
 			# Convert keys_bind dictionary to JSON string
 			keys_bind_json = json.dumps(keys_bind)
-			query = """
-				INSERT INTO settings (idsettings, volume, keys_bind)
-				VALUES (1, %s, %s)
-				ON DUPLICATE KEY UPDATE volume = %s, keys_bind = %s
-			"""
-			cursor.execute(query, (volume, keys_bind_json, volume, keys_bind_json))
-			connection.commit()
-			cursor.close()
-			connection.close()
+			query = db.upsert('settings', ('idsettings', 'volume', 'keys_bind'), ('idsettings',))
+			with db.session() as cursor:
+				cursor.execute(query, (1, volume, keys_bind_json))
 			print("Settings saved successfully.")
+			return True
 		except Error as e:
 			print("Error saving settings:", e)
+			return False
 
 if __name__ == '__main__':
 	settings = SettingsDB.get_settings()
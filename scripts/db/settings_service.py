@@ -0,0 +1,131 @@
+import copy
+import threading
+import weakref
+
+from scripts.db.settings_db import SettingsDB
+from scripts.db.write_behind import WriteBehindQueue
+
+
+class SettingsService:
+    """Settings (volume, keys_bind) đọc từ DB một lần khi cần lần đầu, sau đó chỉ đọc từ bộ nhớ.
+
+    - Không đụng DB lúc import; load_async() nạp trước trên thread nền. Nếu get() được gọi khi
+      chưa nạp xong thì get() chờ (đọc DB ngay trên thread gọi), không trả về giá trị mặc định.
+    - Subscriber luôn được gọi trên thread chính: sau load_async() qua background.poll().
+    - update() đổi giá trị ngay, báo cho subscriber và ghi DB nền qua WriteBehindQueue.
+    - subscriber: callback(values) với values = {'volume': ..., 'keys_bind': ...};
+      bound method được giữ bằng weakref nên object (Player...) không bị giữ lại sau khi bị bỏ.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = SettingsService()
+        return cls._instance
+
+    def __init__(self, defaults=None, queue=None):
+        self.defaults = defaults or {}
+        self.values = None  # None = chưa nạp từ DB
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+        self.queue = queue or WriteBehindQueue.get_instance()
+        self.loads = 0
+
+    def set_defaults(self, **defaults):
+        """Giá trị dùng khi DB không có hoặc không đọc được"""
+        self.defaults.update(defaults)
+
+    def load(self):
+        """Nạp từ DB nếu chưa nạp rồi báo subscriber trên thread gọi. Trả về True nếu vừa nạp"""
+        if not self.read():
+            return False
+        self.notify()
+        return True
+
+    def read(self):
+        """Đọc DB vào bộ nhớ nếu chưa nạp, không báo subscriber (an toàn khi gọi từ nhiều thread)"""
+        with self.lock:
+            if self.values is not None:
+                return False
+            values = copy.deepcopy(self.defaults)
+            stored = SettingsDB.get_settings()
+            if stored.get('volume') is not None:
+                values['volume'] = stored['volume']
+            if stored.get('keys_bind'):
+                values['keys_bind'] = stored['keys_bind']
+            self.values = values
+            self.loads += 1
+        return True
+
+    def load_async(self):
+        """Nạp trước trên thread nền để lần truy cập đầu tiên không phải chờ DB.
+        Subscriber được báo trong background.poll() (thread chính), không phải trên worker"""
+        from scripts.helpers.background import background
+        background.submit(self.read, on_done=self.loaded)
+
+    def loaded(self, fresh, error):
+        if error is not None:
+            print(f"Error loading settings: {error}")
+        elif fresh:
+            self.notify()
+
+    def get(self, key):
+        self.load()
+        return self.values[key]
+
+    @property
+    def volume(self):
+        return self.get('volume')
+
+    @property
+    def keys_bind(self):
+        return self.get('keys_bind')
+
+    def update(self, **changes):
+        """Đổi settings: áp dụng ngay trong bộ nhớ, ghi DB trên thread nền"""
+        self.load()
+        with self.lock:
+            self.values.update(copy.deepcopy(changes))
+            snapshot = copy.deepcopy(self.values)
+        self.notify()
+        self.queue.submit('settings', lambda: self.persist(snapshot))
+        self.queue.request_flush()
+
+    @staticmethod
+    def persist(values):
+        return SettingsDB.save_setting(values['volume'], values['keys_bind'])
+
+    # Subscriber
+    def subscribe(self, callback):
+        """Đăng ký callback(values); gọi ngay nếu settings đã được nạp"""
+        reference = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda: callback)
+        with self.subscribers_lock:
+            self.subscribers.append(reference)
+        if self.values is not None:
+            callback(self.values)
+
+    def unsubscribe(self, callback):
+        with self.subscribers_lock:
+            self.subscribers = [reference for reference in self.subscribers
+                                if reference() is not None and reference() != callback]
+
+    def notify(self):
+        with self.subscribers_lock:
+            references = list(self.subscribers)
+        dead = []
+        for reference in references:
+            callback = reference()
+            if callback is None:
+                dead.append(reference)
+                continue
+            callback(self.values)
+        if dead:
+            # Chỉ bỏ các reference đã chết, không ghi đè subscriber được thêm trong lúc đang báo
+            with self.subscribers_lock:
+                self.subscribers = [reference for reference in self.subscribers
+                                    if not any(reference is gone for gone in dead)]
+
+
+settings_service = SettingsService.get_instance()
@@ -0,0 +1,186 @@
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+
+# Cùng schema với database MySQL (sprout_land_data); TEXT thay cho JSON/VARCHAR
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS players (
+        player_id TEXT PRIMARY KEY,
+        player_name TEXT NOT NULL,
+        created_at DATETIME,
+        last_played DATETIME
+    )""",
+    """CREATE TABLE IF NOT EXISTS game_states (
+        player_id TEXT PRIMARY KEY,
+        position_x REAL,
+        position_y REAL,
+        game_time INTEGER,
+        is_raining INTEGER
+    )""",
+    """CREATE TABLE IF NOT EXISTS world_states (
+        player_id TEXT PRIMARY KEY,
+        soil_grid TEXT,
+        planted_crops TEXT,
+        trees_state TEXT,
+        water_grid TEXT,
+        time_of_day REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS world_state_deltas (
+        player_id TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        payload TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS items (
+        item_id INTEGER PRIMARY KEY,
+        item_name TEXT NOT NULL UNIQUE,
+        description TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS item_transactions (
+        item_id INTEGER NOT NULL,
+        transaction_type TEXT NOT NULL,
+        price INTEGER,
+        PRIMARY KEY (item_id, transaction_type)
+    )""",
+    """CREATE TABLE IF NOT EXISTS inventory (
+        player_id TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        slot_number INTEGER NOT NULL,
+        PRIMARY KEY (player_id, slot_number)
+    )""",
+    """CREATE TABLE IF NOT EXISTS missions (
+        mission_id INTEGER PRIMARY KEY,
+        name TEXT,
+        description TEXT,
+        type TEXT,
+        npc_assigned TEXT,
+        reward_item TEXT,
+        reward_quantity INTEGER,
+        required_progress INTEGER,
+        prerequisite_missions TEXT,
+        story_stage INTEGER,
+        previous_mission_id INTEGER,
+        next_mission_id INTEGER
+    )""",
+    """CREATE TABLE IF NOT EXISTS player_missions (
+        player_id TEXT NOT NULL,
+        mission_id INTEGER NOT NULL,
+        status TEXT,
+        progress INTEGER,
+        date_assigned DATETIME,
+        date_completed DATETIME,
+        PRIMARY KEY (player_id, mission_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS settings (
+        idsettings INTEGER PRIMARY KEY,
+        volume INTEGER,
+        keys_bind TEXT
+    )""",
+]
+
+# Đọc/ghi ngày giờ giống mysql.connector (trả về datetime thay vì chuỗi)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', 'seconds'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+
+
+@lru_cache(maxsize=256)
+def translate(query):
+    """Đổi placeholder kiểu MySQL (%s) sang kiểu SQLite (?)"""
+    return query.replace('%s', '?')
+
+
+def _now():
+    return datetime.now().isoformat(' ', 'seconds')
+
+
+class SQLiteCursor:
+    """Cursor có cùng giao diện với cursor của mysql.connector (dictionary=True trả về dict)"""
+    def __init__(self, cursor, dictionary=False):
+        self.cursor = cursor
+        self.dictionary = dictionary
+
+    def execute(self, query, params=()):
+        self.cursor.execute(translate(query), params or ())
+
+    def executemany(self, query, seq_params):
+        self.cursor.executemany(translate(query), seq_params)
+
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self.cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self.cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self.cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def close(self):
+        self.cursor.close()
+
+
+class SQLiteConnection:
+    """Connection SQLite nhúng dùng thay cho connection MySQL trong ConnectionPool"""
+    def __init__(self, path, timeout=5, cached_statements=256):
+        # check_same_thread=False: connection được trả về pool và dùng lại ở thread ghi nền
+        self.connection = sqlite3.connect(
+            path,
+            timeout=timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            cached_statements=cached_statements,
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.create_function('NOW', 0, _now)
+
+    @property
+    def in_transaction(self):
+        return self.connection.in_transaction
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self.connection.cursor(), dictionary)
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def ping(self, reconnect=False):
+        self.connection.execute("SELECT 1")
+
+    def is_connected(self):
+        try:
+            self.ping()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self.connection.close()
+
+
+def create_schema(path, timeout=5):
+    """Tạo các bảng còn thiếu trong file database"""
+    connection = SQLiteConnection(path, timeout)
+    try:
+        for statement in SCHEMA:
+            connection.connection.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
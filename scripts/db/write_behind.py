@@ -0,0 +1,164 @@
+import atexit
+import threading
+import time
+
+DEFAULT_INTERVAL = 2.0  # số giây gom thay đổi trước khi ghi
+DEFAULT_RETRY_DELAY = 5.0  # số giây chờ trước khi thử ghi lại job lỗi
+
+class WriteBehindQueue:
+    """Hàng đợi ghi nền: các thay đổi được gom theo key và ghi xuống DB trên một thread riêng.
+
+    - Mỗi key chỉ giữ job mới nhất (job ghi trạng thái, không ghi từng thao tác).
+    - Job là hàm không tham số trả về True nếu ghi thành công; job lỗi được giữ lại
+      và thử lại sau, không bao giờ bị bỏ trừ khi đã có job mới hơn cho cùng key.
+    - flush() ghi ngay trên thread gọi và chỉ trả về True khi mọi job đã ghi xong,
+      nên dữ liệu được bảo đảm đã nằm trong DB sau một lần flush() thành công.
+      Khi thoát chương trình, atexit gọi shutdown() để flush lần cuối.
+    - discard(): bỏ mọi job từ giờ, không ghi gì (mô phỏng headless không được đổi DB).
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = WriteBehindQueue()
+            atexit.register(cls._instance.shutdown)
+        return cls._instance
+
+    def __init__(self, interval=DEFAULT_INTERVAL, retry_delay=DEFAULT_RETRY_DELAY):
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.pending = {}  # Format: {key: job}
+        self.due = None  # thời điểm (monotonic) cần ghi các job đang chờ
+        self.busy = False  # có thread đang chạy job
+        self.running = True
+        self.discarding = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+        # Thống kê
+        self.submitted = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.failures = 0
+        self.discarded = 0
+
+    def _start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self.thread.start()
+
+    def submit(self, key, job, delay=None):
+        """Đưa job vào hàng đợi; job cũ cùng key (chưa ghi) bị thay thế"""
+        with self.condition:
+            self.submitted += 1
+            if self.discarding:
+                self.discarded += 1
+                return
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = job
+            due = time.monotonic() + (self.interval if delay is None else delay)
+            if self.due is None or due < self.due:
+                self.due = due
+            self._start()
+            self.condition.notify_all()
+
+    def request_flush(self):
+        """Yêu cầu thread nền ghi ngay, không chờ (dùng khi pause/save)"""
+        with self.condition:
+            if self.pending:
+                self.due = time.monotonic()
+                self.condition.notify_all()
+
+    def _take(self):
+        """Lấy toàn bộ job đang chờ; gọi khi đang giữ condition"""
+        jobs = self.pending
+        self.pending = {}
+        self.due = None
+        self.busy = True
+        return jobs
+
+    def _execute(self, jobs):
+        failed = {}
+        for key, job in jobs.items():
+            try:
+                ok = job()
+            except Exception as e:
+                print(f"Write-behind error ({key}): {e}")
+                ok = False
+            if ok is False:
+                failed[key] = job
+            else:
+                self.writes += 1
+        return failed
+
+    def _finish(self, failed):
+        """Trả job lỗi về hàng đợi (trừ khi đã có job mới hơn); gọi khi đang giữ condition"""
+        self.busy = False
+        self.failures += len(failed)
+        for key, job in failed.items():
+            self.pending.setdefault(key, job)
+        if self.pending:
+            retry_at = time.monotonic() + (self.retry_delay if failed else 0)
+            self.due = retry_at if self.due is None else min(self.due, retry_at)
+        self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and (self.busy or not self.pending or time.monotonic() < self.due):
+                    timeout = None if self.busy or not self.pending else max(0, self.due - time.monotonic())
+                    self.condition.wait(timeout)
+                if not self.running:
+                    return
+                jobs = self._take()
+            failed = self._execute(jobs)
+            with self.condition:
+                self._finish(failed)
+
+    def flush(self, timeout=None):
+        """Ghi đồng bộ mọi job đang chờ trên thread hiện tại. Trả về True nếu không còn job nào chưa ghi."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            # Chờ thread nền ghi xong lô hiện tại
+            while self.busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            jobs = self._take()
+        failed = self._execute(jobs)
+        with self.condition:
+            self._finish(failed)
+            return not self.pending
+
+    def shutdown(self):
+        """Flush lần cuối và dừng thread nền"""
+        ok = self.flush()
+        if not ok:
+            print(f"Write-behind: {len(self.pending)} thay đổi chưa ghi được xuống DB")
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        return ok
+
+    def discard(self):
+        """Bỏ các job đang chờ và mọi job submit sau này (flush/shutdown không còn gì để ghi)"""
+        with self.condition:
+            self.discarding = True
+            self.discarded += len(self.pending)
+            self.pending = {}
+            self.due = None
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'pending': len(self.pending),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'writes': self.writes,
+                'failures': self.failures,
+                'discarded': self.discarded,
+            }
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from os import walk
+
+import pygame
+
+DEFAULT_BUDGET = 256 * 1024 * 1024  # 256 MB
+FONT_COST = 64 * 1024  # ước lượng cho một pygame.font.Font
+
+
+class SilentSound:
+    """Thay cho pygame.mixer.Sound khi chạy headless (không có thiết bị âm thanh)"""
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_volume(self):
+        return 0.0
+
+    def get_length(self):
+        return 0.0
+
+
+class AssetManager:
+    """Nơi duy nhất nạp surface, bản scale, font và sound.
+
+    Mỗi asset được cache theo đường dẫn + tham số biến đổi, có giới hạn bộ nhớ
+    (budget) và bỏ bớt asset ít dùng nhất (LRU) khi vượt giới hạn.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = AssetManager()
+        return cls._instance
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()  # Format: {key: (asset, cost)}
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.headless = False  # True: không convert surface, sound là SilentSound
+
+    # Cache nội bộ
+    def _get(self, key, loader, cost_of):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        asset = loader()
+        cost = cost_of(asset)
+        self.entries[key] = (asset, cost)
+        self.used += cost
+        self._evict()
+        return asset
+
+    def _evict(self):
+        # Giữ lại asset vừa nạp (cuối OrderedDict) kể cả khi một mình nó vượt budget
+        while self.used > self.budget and len(self.entries) > 1:
+            _, (_, cost) = self.entries.popitem(last=False)
+            self.used -= cost
+            self.evictions += 1
+
+    @staticmethod
+    def _surface_cost(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    @staticmethod
+    def _sound_cost(sound):
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        frequency, size, channels = mixer
+        return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+    # Surface
+    def convert(self, surface, alpha=True):
+        """convert_alpha() khi có màn hình; headless (chưa set_mode) thì giữ nguyên surface"""
+        if not alpha or self.headless or pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha()
+
+    def image(self, path, alpha=True, cached=True):
+        """cached=False: nạp một lần không giữ trong cache (ví dụ ảnh nền lớn chỉ dùng để nướng chunk)"""
+        def load():
+            return self.convert(pygame.image.load(path), alpha)
+        if not cached and ('image', path, alpha) not in self.entries:
+            self.misses += 1
+            return load()
+        return self._get(('image', path, alpha), load, self._surface_cost)
+
+    def image_size(self, path):
+        return self._get(('size', path), lambda: pygame.image.load(path).get_size(), lambda size: 0)
+
+    def scaled(self, path, size, alpha=True):
+        size = (int(size[0]), int(size[1]))
+        return self._get(
+            ('scaled', path, size, alpha),
+            lambda: pygame.transform.scale(self.image(path, alpha), size),
+            self._surface_cost,
+        )
+
+    def folder(self, path):
+        """Tương đương import_folder: list surface của mọi ảnh trong thư mục"""
+        def load():
+            surfaces = []
+            for _, __, image_files in walk(path):
+                for image in image_files:
+                    surfaces.append(self.convert(pygame.image.load(path + '/' + image)))
+            return surfaces
+        return self._get(('folder', path), load,
+                         lambda surfaces: sum(self._surface_cost(surface) for surface in surfaces))
+
+    def folder_dict(self, path):
+        """Tương đương import_folder_dict: {tên file không đuôi: surface}"""
+        def load():
+            surfaces = {}
+            for _, __, image_files in walk(path):
+                for image in image_files:
+                    surfaces[image.split('.')[0]] = self.convert(pygame.image.load(path + '/' + image))
+            return surfaces
+        return self._get(('folder_dict', path), load,
+                         lambda surfaces: sum(self._surface_cost(surface) for surface in surfaces.values()))
+
+    # Font & sound
+    def font(self, path, size):
+        return self._get(('font', path, size), lambda: pygame.font.Font(path, size), lambda font: FONT_COST)
+
+    def sound(self, path):
+        if self.headless:
+            return SilentSound()
+        return self._get(('sound', path), lambda: pygame.mixer.Sound(path), self._sound_cost)
+
+    # Manifest
+    def preload(self, manifest):
+        """Nạp trước một danh sách asset, mỗi phần tử là (loại, *tham số), ví dụ ('font', path, 30)"""
+        for kind, *args in manifest:
+            try:
+                getattr(self, kind)(*args)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Không thể nạp trước {kind} {args}: {e}")
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'used': self.used,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+assets = AssetManager.get_instance()
@@ -0,0 +1,55 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundTasks:
+    """Chạy việc lưu/nạp (DB, encode/decode) trên một thread riêng.
+
+    - Các task chạy tuần tự theo thứ tự submit (một worker), nên lần nạp luôn thấy lần lưu trước nó.
+    - Callback on_done(result, error) không chạy trên worker mà được gom lại và gọi trong poll()
+      ở vòng lặp game, vì pygame (sprite, surface) chỉ dùng an toàn trên thread chính.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = BackgroundTasks()
+        return cls._instance
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='persistence')
+        self.completed = queue.SimpleQueue()  # Format: (on_done, future)
+        self.pending = 0
+
+    def submit(self, func, *args, on_done=None):
+        """Chạy func(*args) trên worker; trả về Future"""
+        self.pending += 1
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda done: self.completed.put((on_done, done)))
+        return future
+
+    def poll(self):
+        """Gọi mỗi frame trên thread chính: chạy callback của các task đã xong"""
+        while True:
+            try:
+                on_done, future = self.completed.get_nowait()
+            except queue.Empty:
+                return
+            self.pending -= 1
+            error = future.exception()
+            if error is not None and on_done is None:
+                print(f"Background task error: {error}")
+            if on_done:
+                on_done(None if error else future.result(), error)
+
+    @property
+    def busy(self):
+        return self.pending > 0
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+        self.poll()
+
+
+background = BackgroundTasks.get_instance()
@@ -0,0 +1,95 @@
+import pygame
+from settings import TILE_SIZE
+
+
+class SpatialHash:
+	"""Lưới đều (mỗi ô TILE_SIZE) ánh xạ ô -> các đối tượng có hitbox chạm vào ô đó"""
+	def __init__(self, cell_size = TILE_SIZE):
+		self.cell_size = cell_size
+		self.cells = {}  # Format: {(cx, cy): {item: None}}
+		self.item_cells = {}  # Format: {item: (left, top, right, bottom)} theo đơn vị ô
+
+	def cell_range(self, rect):
+		size = self.cell_size
+		return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+	def insert(self, item, rect):
+		if rect.width <= 0 or rect.height <= 0:
+			# Hitbox rỗng không bao giờ va chạm
+			return
+		bounds = self.cell_range(rect)
+		left, top, right, bottom = bounds
+		for cy in range(top, bottom + 1):
+			for cx in range(left, right + 1):
+				self.cells.setdefault((cx, cy), {})[item] = None
+		self.item_cells[item] = bounds
+
+	def remove(self, item):
+		bounds = self.item_cells.pop(item, None)
+		if bounds is None:
+			return
+		left, top, right, bottom = bounds
+		for cy in range(top, bottom + 1):
+			for cx in range(left, right + 1):
+				bucket = self.cells.get((cx, cy))
+				if bucket is not None:
+					bucket.pop(item, None)
+					if not bucket:
+						del self.cells[(cx, cy)]
+
+	def move(self, item, rect):
+		"""Cập nhật vị trí; bỏ qua nếu hitbox vẫn nằm trong cùng các ô"""
+		if rect.width > 0 and rect.height > 0 and self.item_cells.get(item) == self.cell_range(rect):
+			return
+		self.remove(item)
+		self.insert(item, rect)
+
+	def query(self, rect):
+		"""Trả về các đối tượng nằm trong các ô mà rect chạm vào (không trùng lặp)"""
+		found = {}
+		left, top, right, bottom = self.cell_range(rect)
+		for cy in range(top, bottom + 1):
+			for cx in range(left, right + 1):
+				bucket = self.cells.get((cx, cy))
+				if bucket:
+					found.update(bucket)
+		return list(found)
+
+	def clear(self):
+		self.cells.clear()
+		self.item_cells.clear()
+
+
+class SpatialGroup(pygame.sprite.Group):
+	"""Sprite group tự đăng ký hitbox của sprite vào SpatialHash khi add/kill"""
+	def __init__(self, *sprites):
+		self.index = SpatialHash()
+		super().__init__(*sprites)
+
+	def add_internal(self, sprite, layer = None):
+		super().add_internal(sprite, layer)
+		hitbox = getattr(sprite, 'hitbox', None)
+		if hitbox is not None:
+			self.index.insert(sprite, hitbox)
+
+	def remove_internal(self, sprite):
+		super().remove_internal(sprite)
+		self.index.remove(sprite)
+
+	def empty(self):
+		super().empty()
+		self.index.clear()
+
+	def reindex(self, sprite):
+		if sprite in self:
+			self.index.move(sprite, sprite.hitbox)
+
+	def query(self, rect):
+		return self.index.query(rect)
+
+
+def reindex(sprite):
+	"""Gọi sau khi hitbox của sprite thay đổi (di chuyển, đổi kích thước)"""
+	for group in sprite.groups():
+		if isinstance(group, SpatialGroup):
+			group.reindex(sprite)
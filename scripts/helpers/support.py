@@ -1,23 +1,30 @@
-from os import walk
-
 import pygame
+import pytmx
+from pytmx.util_pygame import handle_transformation, load_pygame
+
+from scripts.helpers.assets import assets
 
 def import_folder(path):
-    surface_list = []
+    # Qua AssetManager: mỗi thư mục chỉ đọc từ đĩa một lần
+    return assets.folder(path)
+
+def import_folder_dict(path):
+    return assets.folder_dict(path)
 
-    for _, __, image_files in walk(path):
-        for image in image_files:
-            full_path = path + '/' + image
-            image_surface = pygame.image.load(full_path).convert_alpha()
-            surface_list.append(image_surface)
+def raw_image_loader(filename, colorkey, **kwargs):
+    """Image loader cho pytmx giống pygame_image_loader nhưng không convert surface (không cần màn hình)"""
+    image = pygame.image.load(filename)
 
-    return surface_list
+    def load_image(rect=None, flags=None):
+        tile = image.subsurface(rect) if rect else image.copy()
+        if flags:
+            tile = handle_transformation(tile, flags)
+        return tile
 
-def import_folder_dict(path):
-    surface_dict = {}
-    for _, __, image_files in walk(path):
-        for image in image_files:
-            full_path = path + '/' + image
-            image_surface = pygame.image.load(full_path).convert_alpha()
-            surface_dict[image.split('.')[0]] = image_surface
-    return surface_dict
+    return load_image
+
+def load_map(path):
+    """Đọc file .tmx; headless (chưa set_mode) thì bỏ bước convert surface"""
+    if assets.headless or pygame.display.get_surface() is None:
+        return pytmx.TiledMap(path, image_loader=raw_image_loader)
+    return load_pygame(path)
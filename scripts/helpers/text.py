@@ -0,0 +1,156 @@
+from collections import OrderedDict
+
+import pygame
+
+from scripts.helpers.assets import assets
+
+DEFAULT_CAPACITY = 512  # số surface chữ giữ lại trong cache
+
+
+class TextRenderer:
+    """Render chữ qua cache LRU theo (font, size, text, color, antialias).
+
+    Surface trả về được dùng chung giữa các nơi gọi, không được vẽ đè lên nó.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = TextRenderer()
+        return cls._instance
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.entries = OrderedDict()  # Format: {key: Surface}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _color_key(color):
+        # pygame.Color và list không hash được
+        return color if isinstance(color, (str, tuple)) else tuple(color)
+
+    def render(self, font_path, size, text, color, antialias=True):
+        key = (font_path, size, text, self._color_key(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = assets.font(font_path, size).render(text, antialias, color)
+        self.entries[key] = surface
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return surface
+
+    def font(self, font_path, size):
+        return CachedFont(self, font_path, size)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class CachedFont:
+    """Thay thế pygame.font.Font: render() đi qua TextRenderer, các hàm khác chuyển cho font gốc"""
+    def __init__(self, renderer, font_path, size):
+        self.renderer = renderer
+        self.font_path = font_path
+        self.point_size = size
+
+    @property
+    def font(self):
+        return assets.font(self.font_path, self.point_size)
+
+    def render(self, text, antialias, color):
+        return self.renderer.render(self.font_path, self.point_size, text, color, antialias)
+
+    def __getattr__(self, name):
+        # size(), get_linesize(), get_height()...
+        return getattr(self.font, name)
+
+
+class TypewriterLayout:
+    """Bố cục cho hiệu ứng gõ chữ: ngắt dòng toàn bộ văn bản một lần,
+    mỗi lần hiện thêm ký tự chỉ render phần ký tự mới lên surface của dòng."""
+    def __init__(self, font, max_width, color):
+        self.font = font
+        self.max_width = max_width
+        self.color = color
+        self.text = None
+        self.lines = []  # Format: [(start, line)]
+        self.surfaces = []
+        self.revealed = []  # số ký tự đã render của mỗi dòng
+        self.visible_lines = 0
+
+    def wrap(self, text):
+        """Ngắt dòng theo từ, giống Dialog.get_wrapped_text"""
+        if not text:
+            return [""]
+
+        words = text.split(' ')
+        lines = []
+        current_line = words[0]
+        for word in words[1:]:
+            test_line = current_line + ' ' + word
+            if self.font.size(test_line)[0] < self.max_width:
+                current_line = test_line
+            else:
+                lines.append(current_line)
+                current_line = word
+        lines.append(current_line)
+        return lines
+
+    def set_text(self, text):
+        self.text = text
+        self.lines = []
+        start = 0
+        for line in self.wrap(text):
+            self.lines.append((start, line))
+            start += len(line) + 1  # +1 cho dấu cách bị bỏ khi ngắt dòng
+        line_height = self.font.get_linesize()
+        self.surfaces = [pygame.Surface((max(1, self.font.size(line)[0]), line_height), pygame.SRCALPHA)
+                         for _, line in self.lines]
+        self.revealed = [0] * len(self.lines)
+        self.visible_lines = 0
+
+    def reveal(self, count):
+        """Hiện count ký tự đầu tiên của văn bản"""
+        self.visible_lines = 0
+        for index, (start, line) in enumerate(self.lines):
+            if count <= start and index > 0:
+                break
+            self.visible_lines = index + 1
+            shown = max(0, min(len(line), count - start))
+            done = self.revealed[index]
+            if shown > done:
+                x = self.font.size(line[:done])[0]
+                self.surfaces[index].blit(self.font.render(line[done:shown], True, self.color), (x, 0))
+                self.revealed[index] = shown
+
+    def update(self, text, shown_text):
+        """text: toàn bộ văn bản; shown_text: phần đã hiện (tiền tố của text)"""
+        if text != self.text or not text.startswith(shown_text):
+            self.set_text(text if text.startswith(shown_text) else shown_text)
+        self.reveal(len(shown_text))
+
+    def height(self):
+        return max(1, self.visible_lines) * self.font.get_linesize()
+
+    def draw(self, surface, x, y):
+        line_height = self.font.get_linesize()
+        for index in range(self.visible_lines):
+            surface.blit(self.surfaces[index], (x, y + index * line_height))
+
+
+text_renderer = TextRenderer.get_instance()
@@ -1,25 +1,132 @@
-import pygame 
+import heapq
+import itertools
+import pygame
+
+class Scheduler:
+	"""Hàng đợi hẹn giờ dùng chung: mỗi Timer đang chạy là một deadline trong heap,
+	mỗi frame chỉ lấy ra các timer đã hết hạn (timer chưa tới hạn không tốn gì).
+
+	Hai đồng hồ:
+	- 'game': thời gian trong game (ms), chỉ chạy khi Level cập nhật qua tick(); dừng được bằng pause(),
+	  tua nhanh bằng fast_forward() (khi ngủ).
+	- 'wall': pygame.time.get_ticks(), cho timer của UI (menu, nút bấm) vẫn chạy khi game dừng.
+	"""
+	_instance = None
+
+	@classmethod
+	def get_instance(cls):
+		if cls._instance is None:
+			cls._instance = Scheduler()
+		return cls._instance
+
+	def __init__(self):
+		self.game_time = 0
+		self.paused = False
+		self.queues = {'game': [], 'wall': []}  # Format: [(deadline, token, Timer)]
+		self.tokens = itertools.count(1)
+		self.fired = 0
+
+	def now(self, clock='game'):
+		return self.game_time if clock == 'game' else pygame.time.get_ticks()
+
+	def schedule(self, timer, deadline):
+		"""Đặt (lại) deadline cho timer; entry cũ trong heap bị bỏ qua khi lấy ra"""
+		timer.deadline = deadline
+		timer.token = next(self.tokens)
+		heapq.heappush(self.queues[timer.clock], (deadline, timer.token, timer))
+
+	def pause(self):
+		self.paused = True
+
+	def resume(self):
+		self.paused = False
+
+	def tick(self, dt_ms):
+		"""Cho đồng hồ game chạy thêm dt_ms rồi chạy các timer đã tới hạn"""
+		if not self.paused:
+			self.game_time += dt_ms
+		self.run_due('game')
+
+	def update(self):
+		"""Gọi mỗi frame ở vòng lặp chính cho các timer đồng hồ 'wall'"""
+		self.run_due('wall')
+
+	def run_due(self, clock):
+		queue = self.queues[clock]
+		now = self.now(clock)
+		while queue and queue[0][0] <= now:
+			_, token, timer = heapq.heappop(queue)
+			if timer.active and timer.token == token:
+				self.fired += 1
+				timer.expire()
+
+	def fast_forward(self, dt_ms):
+		"""Tua đồng hồ game thêm dt_ms, chạy các timer tới hạn theo đúng thứ tự deadline.
+		Trong lúc chạy callback đồng hồ đứng tại deadline đó, nên timer mới được tạo (đất ướt -> khô -> mất)
+		tính từ đúng thời điểm ấy như khi chạy từng frame."""
+		target = self.game_time + dt_ms
+		queue = self.queues['game']
+		while queue and queue[0][0] <= target:
+			deadline, token, timer = heapq.heappop(queue)
+			if timer.active and timer.token == token:
+				self.game_time = max(self.game_time, deadline)
+				self.fired += 1
+				timer.expire()
+		self.game_time = target
+
+	def stats(self):
+		return {
+			'game_time': self.game_time,
+			'paused': self.paused,
+			'fired': self.fired,
+			'queued': {clock: len(queue) for clock, queue in self.queues.items()},
+		}
+
+
+scheduler = Scheduler.get_instance()
+
 
 class Timer:
-	def __init__(self,duration,func = None, *args):
+	def __init__(self,duration,func = None, *args, clock = 'game'):
 		self.duration = duration
 		self.args = args
 		self.func = func
+		self.clock = clock
 		self.start_time = 0
+		self.deadline = 0
+		self.token = None
 		self.active = False
 
 	def activate(self):
 		self.active = True
-		self.start_time = pygame.time.get_ticks()
+		self.start_time = scheduler.now(self.clock)
+		scheduler.schedule(self, self.start_time + self.duration)
 
 	def deactivate(self):
 		self.active = False
 		self.start_time = 0
+		self.token = None
+
+	def expire(self):
+		"""Hết hạn: gọi func (nếu có) rồi tắt timer"""
+		self.deactivate()
+		if self.func:
+			self.func(*self.args)
 
 	def update(self):
-		current_time = pygame.time.get_ticks()
-		if current_time - self.start_time >= self.duration:
-			if self.func and self.start_time != 0:
-				self.func(*self.args)
-			self.deactivate()
-			
\ No newline at end of file
+		"""Không cần gọi mỗi frame nữa (Scheduler tự chạy timer tới hạn); giữ lại để kiểm tra ngay"""
+		if self.active and scheduler.now(self.clock) >= self.deadline:
+			self.expire()
+
+	def advance(self, dt_ms):
+		"""Cho riêng timer này trôi thêm dt_ms. func gọi nhiều nhất một lần.
+		Trả về số ms còn dư sau khi timer hết hạn, None nếu chưa hết hạn"""
+		if not self.active:
+			return None
+		remaining = self.deadline - scheduler.now(self.clock)
+		if dt_ms < remaining:
+			self.start_time -= dt_ms
+			scheduler.schedule(self, self.deadline - dt_ms)
+			return None
+		self.expire()
+		return dt_ms - max(remaining, 0)
@@ -0,0 +1,40 @@
+from settings import SIM_FPS, MAX_SIM_STEPS
+
+
+class FixedTimestep:
+    """Tách mô phỏng khỏi render: thời gian thực của mỗi frame được cộng dồn, rồi tiêu theo
+    các bước cố định 1/rate giây. Cùng một chuỗi input thì kết quả mô phỏng không phụ thuộc FPS vẽ.
+
+    - advance(frame_dt) trả về số bước cần chạy trong frame này (tối đa max_steps, phần dư bị bỏ
+      để máy chậm không bị kéo vào vòng lặp đuổi theo mãi).
+    - alpha: phần bước đang dở (0..1), dùng để nội suy vị trí khi vẽ.
+    """
+    def __init__(self, rate=SIM_FPS, max_steps=MAX_SIM_STEPS):
+        self.step = 1.0 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.ticks = 0
+        self.dropped = 0.0  # số giây đã bỏ do vượt max_steps
+
+    def advance(self, frame_dt):
+        self.accumulator += frame_dt
+        steps = 0
+        while self.accumulator >= self.step:
+            if steps == self.max_steps:
+                self.dropped += self.accumulator - self.accumulator % self.step
+                self.accumulator %= self.step
+                break
+            self.accumulator -= self.step
+            steps += 1
+        self.ticks += steps
+        self.alpha = self.accumulator / self.step
+        return steps
+
+    def reset(self):
+        """Bỏ thời gian đang dồn (vd. sau màn hình loading)"""
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def stats(self):
+        return {'ticks': self.ticks, 'dropped': self.dropped, 'alpha': self.alpha}
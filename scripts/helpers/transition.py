@@ -13,6 +13,11 @@ class Transition:
         self.speed = -2
 
     def play(self):
+        self.update()
+        self.draw()
+
+    def update(self):
+        """Một bước mờ dần/sáng dần; gọi reset() (ngủ) khi tối hẳn"""
         self.color += self.speed
         if self.color <= 0:
             self.speed *= -2
@@ -22,6 +27,7 @@ class Transition:
             self.color = 255
             self.player.sleep = False
             self.speed = -2
-        
+
+    def draw(self):
         self.image.fill((self.color, self.color, self.color))
         self.display_surface.blit(self.image, (0,0), special_flags= pygame.BLEND_RGBA_MULT)
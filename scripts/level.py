@@ -1,9 +1,10 @@
 import pygame
 from settings import *
 from random import randint, random
-from pytmx.util_pygame import load_pygame
 
-from scripts.db.item_db import ItemDatabase
+from scripts.db.item_db import ItemCatalog, ItemDatabase
+from scripts.db.inventory_db import InventoryDatabase
+from scripts.db.mission_db import MissionCatalog, MissionDatabase
 from scripts.db.player_db import PlayerDatabase
 
 from scripts.ui.menu import ShopMenu
@@ -11,28 +12,36 @@ from scripts.ui.overlay import Overlay, Dialog, Clock
 from scripts.ui.mission_ui import MissionUI
 
 from scripts.helpers.support import *
+from scripts.helpers.assets import assets
+from scripts.helpers.background import background
 from scripts.helpers.transition import Transition
-from scripts.helpers.timer import Timer
+from scripts.helpers.timer import scheduler
+from scripts.helpers.spatial_hash import SpatialGroup, reindex
 
 from scripts.models.sky import Rain, Sky
 from scripts.models.player import Player
 from scripts.models.soil import SoildLayer
+from scripts.models.soil_grid import TILLED, PLANTED
 from scripts.models.mission import MissionManager 
 from scripts.models.sprites import Generic, Interaction, Particle, Tree, Water, WildFlower
 
 
 class Level:
-	def __init__(self, player_id=None):
+	def __init__(self, player_id=None, prefetched=None):
+		"""prefetched: kết quả Level.fetch_player_data (đọc DB sẵn trên thread nền)"""
+		self.prefetched = prefetched or {}
 		# Get the display surface
 		self.display_surface = pygame.display.get_surface()
-		pygame.mixer.init()
-		 # Dừng nhạc nền hiện tại nếu có
-		pygame.mixer.stop()
+		assets.preload(ASSET_MANIFEST['level'])
+		if not HEADLESS:
+			pygame.mixer.init()
+			 # Dừng nhạc nền hiện tại nếu có
+			pygame.mixer.stop()
 
 		# Sprite groups
 		self.all_sprites = CameraGroup()
-		self.tree_sprites = pygame.sprite.Group()  # Only for trees
-		self.obstacle_sprites = pygame.sprite.Group()  # For non-tree obstacles
+		self.tree_sprites = SpatialGroup()  # Only for trees
+		self.obstacle_sprites = SpatialGroup()  # For non-tree obstacles
 		self.interaction_sprites = pygame.sprite.Group()
 
 		self.soil_layer = SoildLayer(self.all_sprites, self.obstacle_sprites)
@@ -94,33 +103,31 @@ class Level:
 		self.all_sprites.toggle_debug()
 		
 	def setup(self):
-		tmx_data = load_pygame(f'{MAPS_PATH}/map.tmx')
+		tmx_data = load_map(f'{MAPS_PATH}/map.tmx')
 
-		# Background
-		Generic(
+		# Background: các layer tĩnh được nướng sẵn vào chunk thay vì tạo sprite cho từng tile
+		self.all_sprites.add_static(
 			pos = (0,0),
-			surf = pygame.image.load(f'{GRAPHICS_PATH}/world/ground.png').convert_alpha(),
-			groups = self.all_sprites,
+			surf = assets.image(f'{GRAPHICS_PATH}/world/ground.png', cached = False),
 			z = LAYERS['ground'],
 			)
 		for layer in ['Ground', 'Forest Grass', 'Outside Decoration', 'Hills']:
 			for x, y, surface in tmx_data.get_layer_by_name(layer).tiles():
-				Generic(
+				self.all_sprites.add_static(
 					pos=(x * TILE_SIZE, y * TILE_SIZE),
 					surf=surface,
-					groups=[self.all_sprites],
 					z=LAYERS['ground']
 				)
 		
 
 		for layer in ['HouseFloor','HouseFurnitureBottom']:
 			for x, y, surface in tmx_data.get_layer_by_name(layer).tiles():
-				Generic(
+				self.all_sprites.add_static(
 					pos=(x * TILE_SIZE, y * TILE_SIZE),
 					surf=surface,
-					groups=[self.all_sprites],
 					z=LAYERS['house bottom']
-				)	
+				)
+		self.all_sprites.bake_static()
 
 		# House and Furniture
 		for layer in ['HouseWalls', 'HouseFurnitureTop']:
@@ -177,7 +184,9 @@ class Level:
 					interaction_sprites= self.interaction_sprites,
 					soil_layer= self.soil_layer,
 					toggle_shop = self.toggle_shop,
-					player_id=self.player_id
+					player_id=self.player_id,
+					inventory=self.prefetched.get('inventory'),
+					keys_bind=self.prefetched.get('keys_bind')
 					)
 				
 			if obj.name == 'Bed':
@@ -201,6 +210,9 @@ class Level:
 
 	def player_add(self, item_name, amount):
 		item = ItemDatabase.get_item_from_name(item_name)
+		if item is None:
+			print(f"Không tìm thấy item: {item_name}")
+			return
 		self.player.add_item(item, amount)
 		collect_item_sound.play()
 
@@ -257,6 +269,18 @@ class Level:
 		else:
 			return self.day_sleep_duration
 
+	def advance(self, dt_ms):
+		"""Tua thế giới thêm dt_ms (không gồm Sky), chi phí không phụ thuộc dt_ms"""
+		# Cây trồng, đất và timer của đất: tính trạng thái cuối một lần thay vì từng giây
+		self.soil_layer.advance(dt_ms)
+
+		# Cây (tree): đếm ngược respawn, táo mọc lại
+		for tree in self.tree_sprites.sprites():
+			tree.advance(dt_ms)
+
+		# Timer (đất khô/mất...): tua đồng hồ game, chỉ chạy các timer tới hạn
+		scheduler.fast_forward(dt_ms)
+
 	def sleep(self):
 			"""Xử lý thời gian trôi qua khi người chơi ngủ"""
 			# Lấy thời lượng ngủ (tính theo phút) từ hàm get_sleep_duration()
@@ -275,37 +299,10 @@ class Level:
 			# Tính thời gian ngủ đã trôi qua (ms) để cập nhật các hệ thống khác
 			self.time_elapsed = sleep_minutes * 1000  # chuyển từ phút sang ms
 			
-			# Cập nhật cây trồng (plant) theo thời gian ngủ
-			for plant in self.soil_layer.plant_sprites.sprites():
-					# Giả lập quá trình trưởng thành theo từng giây của thời gian ngủ
-					for _ in range(int(self.time_elapsed / 1000)):
-							plant.grow()
-			
-			# Xóa nước trên đất sau khi ngủ
-			self.soil_layer.remove_water()
-
-			# Cập nhật cây (tree) theo thời gian ngủ:
-			for tree in self.tree_sprites.sprites():
-					if not tree.tree_alive:
-							# Nếu cây đã chết, giảm thời gian respawn
-							tree.respawn_timer = tree.respawn_time
-							tree.respawn_timer -= self.time_elapsed
-							if tree.respawn_timer <= 0:
-									tree.regrow()
-					else:
-							# Nếu cây còn sống, cập nhật thời gian cho táo mọc
-							tree.apple_timer -= self.time_elapsed
-							if tree.apple_timer <= 0:
-									tree.grow_apples(self.time_elapsed / 1000)
-			
-			# Cập nhật các timer của soil tiles
-			if self.soil_layer.soil_timers:
-					for pos, timer in list(self.soil_layer.soil_timers.items()):
-							for _ in range(int(self.time_elapsed / 1000)):
-									timer.update()
+			self.advance(self.time_elapsed)
 			
 			# Có thể phát hiệu ứng chuyển màn (transition) nếu muốn
-			self.transition.play()
+			self.transition.update()
 			
 			# Sau khi xử lý, đặt lại time_elapsed
 			self.time_elapsed = 0
@@ -326,7 +323,7 @@ class Level:
 							groups= self.all_sprites,
 							z= LAYERS['main'])
 					
-					self.soil_layer.grid[plant.rect.bottom // TILE_SIZE][plant.rect.centerx // TILE_SIZE].remove('P')
+					self.soil_layer.grid.clear(plant.rect.centerx // TILE_SIZE, plant.rect.bottom // TILE_SIZE, PLANTED)
 
 	def update_rain(self, dt):
 			"""Cập nhật sự kiện mưa dựa trên dt (có thể tính cả khi ngủ)"""
@@ -349,51 +346,78 @@ class Level:
 							self.rain_elapsed = 0
 							self.soil_layer.water_all()
 
-	def save_game(self):
-		"""Save game data for the current player"""
+	def snapshot_game(self):
+		"""Chụp trạng thái cần lưu trên thread game (chỉ copy dữ liệu, không encode/IO)"""
+		player_data = {
+			'position': pygame.math.Vector2(self.player.pos),
+			'game_time': self.sky.day_passed,
+		}
+		
+		level_data = {
+			'is_raining': self.raining,
+			'soil_grid': self.soil_layer.grid.copy(),
+			'planted_crops': [
+				{
+					'type': plant.plant_type,
+					'position': (plant.rect.x, plant.rect.y),
+					'age': plant.age,
+					'watered': not plant.needs_water
+				}
+				for plant in self.soil_layer.plant_sprites.sprites()
+			],
+			'trees_state': [
+				{
+					'position': (tree.rect.topleft),  # Lưu topleft thay vì x,y
+					'name': tree.name,
+					'health': tree.health,
+					'alive': tree.tree_alive,
+					'apples': len(tree.apple_sprites.sprites()),
+				}
+				for tree in self.tree_sprites.sprites()
+			],
+			'water_grid': [
+				(sprite.rect.x, sprite.rect.y)
+				for sprite in self.soil_layer.water_sprites.sprites()
+			],
+			'time_of_day': self.sky.time_of_day
+		}
+		return player_data, level_data
+
+	def save_game(self, on_done=None):
+		"""Save game data for the current player.
+		   Encode và ghi DB chạy trên thread nền; on_done(ok) được gọi ở vòng lặp game khi xong.
+		   Trả về Future của lần lưu, None nếu không lưu được."""
 		if not self.player_id:
 			print("No player ID specified, cannot save game")
-			return False
+			return None
 			
 		try:
-			player_data = {
-				'position': self.player.pos,
-				'game_time': self.sky.day_passed,
-			}
-			
-			level_data = {
-				'is_raining': self.raining,
-				'soil_grid': self.soil_layer.grid,
-				'planted_crops': [
-					{
-						'type': plant.plant_type,
-						'position': (plant.rect.x, plant.rect.y),
-						'age': plant.age,
-						'watered': not plant.needs_water
-					}
-					for plant in self.soil_layer.plant_sprites.sprites()
-				],
-				'trees_state': [
-					{
-						'position': (tree.rect.topleft),  # Lưu topleft thay vì x,y
-						'name': tree.name,
-						'health': tree.health,
-						'alive': tree.tree_alive,
-						'apples': len(tree.apple_sprites.sprites()),
-					}
-					for tree in self.tree_sprites.sprites()
-				],
-				'water_grid': [
-					(sprite.rect.x, sprite.rect.y)
-					for sprite in self.soil_layer.water_sprites.sprites()
-				],
-				'time_of_day': self.sky.time_of_day
-			}
-			PlayerDatabase.save_game_state(self.player.player_id, player_data, level_data)
-			return True
+			player_data, level_data = self.snapshot_game()
+			self.player.save_inventory()
+			if getattr(self.player, 'mission_manager', None):
+				self.player.mission_manager.save_player_missions(urgent=True)
 		except Exception as e:
 			print(f"Error saving game: {e}")
-			return False
+			return None
+
+		def saved(ok, error):
+			if error:
+				print(f"Error saving game: {error}")
+			if on_done:
+				on_done(bool(ok) and not error)
+		return background.submit(PlayerDatabase.save_game_state, self.player.player_id, player_data, level_data, on_done=saved)
+
+	@staticmethod
+	def fetch_player_data(player_id):
+		"""Đọc mọi dữ liệu DB cần để vào game (chạy trên thread nền, không đụng tới pygame)"""
+		ItemCatalog.get_instance().ensure_loaded()
+		MissionCatalog.get_instance().ensure_loaded()
+		return {
+			'game_state': PlayerDatabase.load_game_state(player_id),
+			'inventory': InventoryDatabase.get_player_inventory(player_id),
+			'missions': MissionDatabase.get_player_missions(player_id),
+			'keys_bind': settings_service.keys_bind,
+		}
 
 	def load_game(self):
 		"""Load game data for the current player"""
@@ -401,8 +425,11 @@ class Level:
 		if not self.player_id:
 			print("No player ID specified, cannot load game")
 			return False
+		return self.apply_game_state(PlayerDatabase.load_game_state(self.player.player_id))
+
+	def apply_game_state(self, game_state, keys_bind=None):
+		"""Dựng lại thế giới từ game_state đã đọc (PlayerDatabase.load_game_state); chạy trên thread game"""
 		try:
-			game_state = PlayerDatabase.load_game_state(self.player.player_id)
 			if not game_state:
 				return False
 
@@ -412,14 +439,12 @@ class Level:
 			self.rainning = game_state['level']['is_raining']
 			self.sky.time_of_day = game_state['level']['time_of_day']
 
-			# Lấy grid đã lưu
+			# Grid đã lưu (PlayerDatabase chuyển save marker cũ sang bitflag)
 			self.soil_layer.grid = game_state['level']['soil_grid']
 			
 			# Đảm bảo rằng với mỗi ô có cây ('P') thì cũng có marker cày ('X')
-			for row in enumerate(self.soil_layer.grid):
-				for cell in enumerate(row):
-					if 'P' in cell and 'X' not in cell:
-						cell.append('X')
+			for x, y in list(self.soil_layer.grid.positions(PLANTED)):
+				self.soil_layer.grid.set(x, y, TILLED)
 
 			# Tái tạo lại các sprite soil dựa trên grid
 			self.recreate_soil_tiles()
@@ -441,7 +466,7 @@ class Level:
 
 			self.sky.day_passed = game_state['player']['game_time']
 
-			self.player.keys_bind = SettingsDB.get_settings()['keys_bind']
+			self.player.keys_bind = keys_bind or settings_service.keys_bind
 			return True
 		except Exception as e:
 			print(f"Error loading game: {e}")
@@ -476,6 +501,7 @@ class Level:
 				# Giữ nguyên offset giữa rect và hitbox
 				hitbox_offset = pygame.math.Vector2(tree.hitbox.topleft) - pygame.math.Vector2(tree.rect.topleft)
 				tree.hitbox.topleft = tree.rect.topleft + hitbox_offset
+				reindex(tree)
 			
 			# Cập nhật vị trí của táo nếu có
 			tree.apple_sprites.update()
@@ -490,8 +516,7 @@ class Level:
 		for plant in self.soil_layer.plant_sprites.sprites():
 			grid_x = plant.rect.centerx // TILE_SIZE
 			grid_y = plant.rect.centery // TILE_SIZE
-			if 'P' in self.soil_layer.grid[grid_y][grid_x]:
-				self.soil_layer.grid[grid_y][grid_x].remove('P')
+			self.soil_layer.grid.clear(grid_x, grid_y, PLANTED)
 			plant.kill()
 		
 		# Loop through the saved planted crops and re-create them.
@@ -509,67 +534,67 @@ class Level:
 			self.soil_layer.plant_seed_at(tile_origin, plant_type, age, watered)
 
 	def recreate_soil_tiles(self):
-		for tile in self.soil_layer.soil_sprites.sprites():
-			tile.kill()
-		self.soil_layer.soil_sprites.empty()
-			
-			# Rebuild soil tiles based on the loaded grid
+		# Rebuild soil tiles based on the loaded grid (xóa sprite cũ trong create_soil_tiles)
 		self.soil_layer.create_soil_tiles()
 
 		# Reinitialize soil timers for each tilled (X) tile if needed
-		for row_index, row in enumerate(self.soil_layer.grid):
-			for col_index, cell in enumerate(row):
-				# If the cell is already tilled and has no active timer, set one up.
-				if 'X' in cell and (col_index, row_index) not in self.soil_layer.soil_timers:
-					self.soil_layer.soil_timers[(col_index, row_index)] = Timer(
-						self.soil_layer.soil_duration,
-						self.soil_layer.remove_soil_tile,
-						col_index,
-						row_index
-					)
-					self.soil_layer.soil_timers[(col_index, row_index)].activate()
+		for col_index, row_index in self.soil_layer.grid.positions(TILLED):
+			# If the cell is already tilled and has no active timer, set one up.
+			if (col_index, row_index) not in self.soil_layer.soil_timers:
+				self.soil_layer.start_soil_timer(col_index, row_index)
 
 	def cleanup(self):
 		"""Dọn dẹp tài nguyên khi Level bị hủy"""
 		# Dừng nhạc nền
-		pygame.mixer.init()	
+		if not HEADLESS:
+			pygame.mixer.init()	
 		background_music.stop()
 		
 		# Xóa tất cả sprite để giải phóng bộ nhớ
 		for sprite in self.all_sprites:
 			sprite.kill()
 		self.all_sprites.empty()
+		self.all_sprites.clear_static()
+		self.all_sprites.clear_batches()
+		self.rain.clear()
 		self.tree_sprites.empty()
 		self.obstacle_sprites.empty()
 		self.interaction_sprites.empty()
 		
 		# Xóa các timer nếu có
 		if hasattr(self.soil_layer, 'soil_timers'):
-			self.soil_layer.soil_timers.clear()
+			self.soil_layer.clear_soil_timers()
 
-	def run(self, dt):
-		# Draw
-		self.display_surface.fill('black')
-		self.all_sprites.custom_draw(self.player)
-
-		# Update
+	def update(self, dt):
+		"""Một bước mô phỏng (dt cố định khi chạy từ Game); không vẽ gì, chạy được không cần màn hình"""
 		if not self.shop_active:
 			self.all_sprites.update(dt)
+			scheduler.tick(dt * 1000)
 			self.plant_collsion()
 			self.soil_layer.update(dt)
 			self.update_rain(dt)
-			
+			self.rain.update(dt, self.raining, self.all_sprites.offset)
+		self.sky.update_time(dt)
+
+		# Sleep
+		if self.player.sleep:
+			self.transition.update()
+
+	def draw(self, dt, alpha=1.0):
+		"""Vẽ trạng thái hiện tại; alpha là phần bước mô phỏng đã trôi qua, dùng để nội suy player/camera"""
+		self.display_surface.fill('black')
+		self.all_sprites.custom_draw(self.player, alpha)
+		self.player.draw_ui()
+
 		# Weather
-		if self.raining and not self.shop_active:
-			self.rain.update()
-		self.sky.display(dt)
+		self.sky.update_sky_color()
+		self.sky.draw()
 		self.overlay.display()
 		self.clock.display()
 		self.clock.day_counter.update(self.sky.day_passed)
 
-		# Sleep
 		if self.player.sleep:
-			self.transition.play()
+			self.transition.draw()
 
 		# Dialog
 		self.bonnie_the_trader_dialog.is_active = self.shop_active
@@ -579,6 +604,11 @@ class Level:
 
 		self.draw_mayor_dialog(dt)
 
+	def run(self, dt):
+		"""Cập nhật rồi vẽ với cùng dt (không dùng bước cố định)"""
+		self.update(dt)
+		self.draw(dt)
+
 	
 class CameraGroup(pygame.sprite.Group):
     def __init__(self):
@@ -587,14 +617,82 @@ class CameraGroup(pygame.sprite.Group):
         self.offset = pygame.math.Vector2()
         self.debug_mode = False
 
+        # Nền tĩnh: {z: {(chunk_x, chunk_y): Surface}}, được nướng một lần khi load map
+        self.static_chunks = {}
+        self.static_layers = []
+
+        # Vẽ theo lô ngoài danh sách sprite: {z: [draw(surface, offset)]}, ví dụ hạt mưa
+        self.batches = {}
+        self.layer_hooks = []
+
     def toggle_debug(self):
         """Toggle debug mode to show/hide hitboxes"""
         self.debug_mode = not self.debug_mode
 
-    def custom_draw(self, player):
-        # Calculate offset from player
-        self.offset.x = player.rect.centerx - SCREEN_WIDTH // 2
-        self.offset.y = player.rect.centery - SCREEN_HEIGHT // 2
+    def add_static(self, pos, surf, z):
+        """Vẽ một surface không bao giờ thay đổi vào các chunk của layer z"""
+        chunks = self.static_chunks.setdefault(z, {})
+        rect = surf.get_rect(topleft=pos)
+        for chunk_y in range(rect.top // CHUNK_SIZE, (rect.bottom - 1) // CHUNK_SIZE + 1):
+            for chunk_x in range(rect.left // CHUNK_SIZE, (rect.right - 1) // CHUNK_SIZE + 1):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    chunk = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE), pygame.SRCALPHA)
+                    chunks[(chunk_x, chunk_y)] = chunk
+                chunk.blit(surf, (rect.x - chunk_x * CHUNK_SIZE, rect.y - chunk_y * CHUNK_SIZE))
+
+    def bake_static(self):
+        """Chuyển các chunk sang định dạng của màn hình để blit nhanh"""
+        for chunks in self.static_chunks.values():
+            for key, chunk in chunks.items():
+                chunks[key] = assets.convert(chunk)
+        self.static_layers = sorted(self.static_chunks)
+        self.layer_hooks = sorted(set(self.static_layers) | set(self.batches))
+
+    def clear_static(self):
+        self.static_chunks.clear()
+        self.static_layers = []
+        self.layer_hooks = sorted(self.batches)
+
+    def add_batch(self, z, draw):
+        """Đăng ký hàm draw(surface, offset) được gọi ở layer z mỗi frame"""
+        self.batches.setdefault(z, []).append(draw)
+        self.layer_hooks = sorted(set(self.static_layers) | set(self.batches))
+
+    def clear_batches(self):
+        self.batches.clear()
+        self.layer_hooks = list(self.static_layers)
+
+    def draw_layer(self, z, first_chunk, last_chunk):
+        """Vẽ nền tĩnh rồi các lô của layer z"""
+        if z in self.static_chunks:
+            self.draw_static_layer(z, first_chunk, last_chunk)
+        for draw in self.batches.get(z, ()):
+            draw(self.display_surface, self.offset)
+
+    def draw_static_layer(self, z, first_chunk, last_chunk):
+        chunks = self.static_chunks[z]
+        for chunk_y in range(first_chunk[1], last_chunk[1] + 1):
+            for chunk_x in range(first_chunk[0], last_chunk[0] + 1):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    continue
+                pos = (chunk_x * CHUNK_SIZE - self.offset.x, chunk_y * CHUNK_SIZE - self.offset.y)
+                self.display_surface.blit(chunk, pos)
+                if self.debug_mode:
+                    pygame.draw.rect(self.display_surface, (0, 255, 255), (pos, chunk.get_size()), 1)
+
+    def custom_draw(self, player, alpha=1.0):
+        # Calculate offset from player (vị trí nội suy giữa hai bước mô phỏng)
+        center_x, center_y = player.render_center(alpha)
+        self.offset.x = center_x - SCREEN_WIDTH // 2
+        self.offset.y = center_y - SCREEN_HEIGHT // 2
+        player_shift = (center_x - player.rect.centerx, center_y - player.rect.centery)
+
+        # Các chunk nền nằm trong vùng hiển thị
+        first_chunk = (int(self.offset.x // CHUNK_SIZE), int(self.offset.y // CHUNK_SIZE))
+        last_chunk = (int((self.offset.x + SCREEN_WIDTH - 1) // CHUNK_SIZE),
+                      int((self.offset.y + SCREEN_HEIGHT - 1) // CHUNK_SIZE))
 
         # Lấy danh sách sprite một lần, sau đó lọc các sprite trong vùng hiển thị
         sprites = self.sprites()
@@ -604,6 +702,8 @@ class CameraGroup(pygame.sprite.Group):
             offset_rect = sprite.rect.copy()
             offset_rect.centerx -= self.offset.x
             offset_rect.centery -= self.offset.y
+            if sprite is player:
+                offset_rect.move_ip(player_shift)
 
             # Kiểm tra xem sprite có nằm trong màn hình không
             if (offset_rect.right > 0 and offset_rect.left < SCREEN_WIDTH and
@@ -616,8 +716,13 @@ class CameraGroup(pygame.sprite.Group):
         # Sắp xếp các sprite theo layer (và sau đó theo vị trí y)
         visible_sprites.sort(key=lambda item: (item[0], item[2].centery))
 
-        # Vẽ từng sprite
+        # Vẽ từng sprite, chèn các layer tĩnh và các lô vào đúng thứ tự z
+        layer_hooks = iter(self.layer_hooks)
+        next_hook = next(layer_hooks, None)
         for layer, sprite, offset_rect in visible_sprites:
+            while next_hook is not None and next_hook <= layer:
+                self.draw_layer(next_hook, first_chunk, last_chunk)
+                next_hook = next(layer_hooks, None)
             self.display_surface.blit(sprite.image, offset_rect)
             if self.debug_mode:
                 pygame.draw.rect(self.display_surface, (255, 255, 255), offset_rect, 1)
@@ -637,3 +742,7 @@ class CameraGroup(pygame.sprite.Group):
                     elif isinstance(sprite, WildFlower):
                         color = (255, 0, 255)
                     pygame.draw.rect(self.display_surface, color, hitbox_rect, 2)
+
+        while next_hook is not None:
+            self.draw_layer(next_hook, first_chunk, last_chunk)
+            next_hook = next(layer_hooks, None)
@@ -0,0 +1,244 @@
+"""Trạng thái cây trồng dạng struct-of-arrays: mỗi thuộc tính là một mảng, mỗi cây là một slot.
+
+Mỗi frame CropSystem.update() xử lý tất cả cây trong một lượt (numpy nếu có, không thì vòng lặp Python);
+sprite Plant chỉ đọc trạng thái để vẽ và chỉ được cập nhật khi đổi frame, chín hoặc chết.
+"""
+import math
+
+from scripts.models.soil_grid import WATERED
+
+try:
+	import numpy as np
+except ImportError:  # numpy không bắt buộc
+	np = None
+
+
+def repeated_add(value, step, count, limit=math.inf):
+	"""Kết quả của vòng lặp `while count and value < limit: value += step` (giống từng bit với float),
+	trả về (value, số lần đã cộng).
+	Trong cùng một khoảng [2^(e-1), 2^e) mỗi lần cộng tăng đúng một lượng cố định, nên cộng gộp
+	cả đoạn một lần; số vòng lặp chỉ phụ thuộc số khoảng đi qua, không phụ thuộc count."""
+	done = 0
+	while done < count and value < limit:
+		bulk = 0
+		if value > 0 and step > 0:
+			_, exponent = math.frexp(value)
+			unit = math.ldexp(1.0, exponent - 53)
+			ratio = step / unit
+			if ratio - math.floor(ratio) != 0.5:  # làm tròn kiểu half-even không cố định
+				increment = round(ratio) * unit
+				upper = math.ldexp(1.0, exponent)
+				if increment > 0:
+					# Bớt một bước để chắc chắn không vượt biên khoảng / limit do sai số phép chia
+					bulk = min(
+						count - done,
+						int((upper - value - step) / increment),
+						math.ceil((limit - value) / increment) - 1 if limit != math.inf else count,
+					) - 1
+		if bulk > 0:
+			value += bulk * increment
+			done += bulk
+		else:
+			value += step
+			done += 1
+	return value, done
+
+
+# Tên mảng và kiểu dữ liệu (kiểu numpy, giá trị mặc định)
+FIELDS = {
+	'type_id': ('int16', 0),
+	'x': ('int32', 0),
+	'y': ('int32', 0),
+	'age': ('float64', 0.0),
+	'speed': ('float64', 0.0),
+	'max_age': ('int16', 0),
+	'last_watered': ('int64', 0),
+	'needs_water': ('bool', True),
+	'harvestable': ('bool', False),
+	'alive': ('bool', False),
+}
+
+
+class CropChanges:
+	"""Kết quả một lượt cập nhật: các slot đổi frame, vừa chín, chết vì khô"""
+	__slots__ = ('grown', 'ripened', 'died')
+
+	def __init__(self, grown = (), ripened = (), died = ()):
+		self.grown = grown
+		self.ripened = ripened
+		self.died = died
+
+
+class CropSystem:
+	def __init__(self, water_deadline, capacity = 64, use_numpy = True):
+		self.water_deadline = water_deadline
+		self.use_numpy = use_numpy and np is not None
+		self.types = []  # type_id -> tên loại cây
+		self.type_ids = {}
+		self.views = []  # slot -> Plant (sprite), None nếu slot trống
+		self.free = []
+		self.size = 0  # slot lớn nhất đã dùng + 1
+		self.count = 0
+		self.capacity = 0
+		for name, (dtype, default) in FIELDS.items():
+			setattr(self, name, np.zeros(0, dtype = dtype) if self.use_numpy else [])
+		self.reserve(capacity)
+
+	def reserve(self, capacity):
+		if capacity <= self.capacity:
+			return
+		for name, (dtype, default) in FIELDS.items():
+			array = getattr(self, name)
+			if self.use_numpy:
+				grown = np.full(capacity, default, dtype = dtype)
+				grown[:self.capacity] = array
+				setattr(self, name, grown)
+			else:
+				array.extend([default] * (capacity - self.capacity))
+		self.views.extend([None] * (capacity - self.capacity))
+		self.capacity = capacity
+
+	def add(self, view, plant_type, x, y, max_age, speed, now, age = 0.0):
+		"""Thêm một cây, trả về slot"""
+		if self.free:
+			slot = self.free.pop()
+		else:
+			if self.size == self.capacity:
+				self.reserve(self.capacity * 2)
+			slot = self.size
+			self.size += 1
+		if plant_type not in self.type_ids:
+			self.type_ids[plant_type] = len(self.types)
+			self.types.append(plant_type)
+
+		self.type_id[slot] = self.type_ids[plant_type]
+		self.x[slot] = x
+		self.y[slot] = y
+		self.age[slot] = age
+		self.speed[slot] = speed
+		self.max_age[slot] = max_age
+		self.last_watered[slot] = now
+		self.needs_water[slot] = True
+		self.harvestable[slot] = False
+		self.alive[slot] = True
+		self.views[slot] = view
+		self.count += 1
+		return slot
+
+	def remove(self, slot):
+		if not self.alive[slot]:
+			return
+		self.alive[slot] = False
+		self.views[slot] = None
+		self.free.append(slot)
+		self.count -= 1
+
+	def live_slots(self):
+		if self.use_numpy:
+			return np.flatnonzero(self.alive[:self.size])
+		return [slot for slot in range(self.size) if self.alive[slot]]
+
+	def update(self, grid, now):
+		"""Một lượt grow() cho mọi cây: cây được tưới lớn thêm speed (chín khi đủ tuổi),
+		cây khô quá water_deadline thì chết. Trả về CropChanges."""
+		if not self.count:
+			return CropChanges()
+		if self.use_numpy:
+			return self._update_numpy(grid, now)
+		return self._update_python(grid, now)
+
+	def _update_numpy(self, grid, now):
+		live = np.flatnonzero(self.alive[:self.size])
+		cells = np.frombuffer(grid.cells, dtype = np.uint8)
+		watered_mask = (cells[self.y[live] * grid.width + self.x[live]] & WATERED) != 0
+		watered = live[watered_mask]
+		dry = live[~watered_mask]
+
+		self.last_watered[watered] = now
+		self.needs_water[watered] = False
+		age = self.age[watered]
+		max_age = self.max_age[watered]
+
+		ripe = watered[age >= max_age]
+		ripened = ripe[~self.harvestable[ripe]]
+		self.age[ripe] = self.max_age[ripe]
+		self.harvestable[ripe] = True
+
+		growing = watered[age < max_age]
+		old_frames = self.age[growing].astype(np.int64)
+		self.age[growing] += self.speed[growing]
+		grown = growing[self.age[growing].astype(np.int64) != old_frames]
+
+		died = dry[now - self.last_watered[dry] >= self.water_deadline]
+		self.needs_water[dry] = True
+		return CropChanges(grown.tolist(), ripened.tolist(), died.tolist())
+
+	def _update_python(self, grid, now):
+		cells, width = grid.cells, grid.width
+		age, max_age, speed = self.age, self.max_age, self.speed
+		grown, ripened, died = [], [], []
+		for slot in self.live_slots():
+			if cells[self.y[slot] * width + self.x[slot]] & WATERED:
+				self.last_watered[slot] = now
+				self.needs_water[slot] = False
+				if age[slot] >= max_age[slot]:
+					if not self.harvestable[slot]:
+						ripened.append(slot)
+					age[slot] = max_age[slot]
+					self.harvestable[slot] = True
+				else:
+					old_frame = int(age[slot])
+					age[slot] += speed[slot]
+					if int(age[slot]) != old_frame:
+						grown.append(slot)
+			else:
+				if now - self.last_watered[slot] >= self.water_deadline:
+					died.append(slot)
+				self.needs_water[slot] = True
+		return CropChanges(grown, ripened, died)
+
+	def advance(self, grid, dt_ms, now):
+		"""Giống gọi update() mỗi giây trong dt_ms, bắt đầu từ thời điểm now (đồng hồ game),
+		nhưng tính một lần cho mỗi cây. Trạng thái tưới không đổi trong khoảng này
+		(nước chỉ bị xóa sau khi ngủ xong)."""
+		steps = int(dt_ms / 1000)
+		if steps <= 0 or not self.count:
+			return CropChanges()
+		# Thời điểm của bước cuối: cùng đồng hồ mà Scheduler.fast_forward tua tới
+		end = now + steps * 1000
+		grown, ripened, died = [], [], []
+		for slot in self.live_slots():
+			slot = int(slot)
+			if not grid.has(int(self.x[slot]), int(self.y[slot]), WATERED):
+				# Chết nếu quá hạn ở bất kỳ bước nào, tức là ở bước cuối
+				if end - self.last_watered[slot] >= self.water_deadline:
+					died.append(slot)
+				self.needs_water[slot] = True
+				continue
+
+			self.last_watered[slot] = end
+			self.needs_water[slot] = False
+			remaining = steps
+			age, max_age, speed = float(self.age[slot]), int(self.max_age[slot]), float(self.speed[slot])
+			if age < max_age and speed > 0:
+				# Lớn đến khi chạm max_age; các bước còn lại cây đã chín
+				new_age, grow_steps = repeated_add(age, speed, remaining, max_age)
+				remaining -= grow_steps
+				self.age[slot] = new_age
+				if int(new_age) != int(age):
+					grown.append(slot)
+				age = new_age
+			if remaining > 0 and age >= max_age:
+				if not self.harvestable[slot]:
+					ripened.append(slot)
+				self.age[slot] = max_age
+				self.harvestable[slot] = True
+		return CropChanges(grown, ripened, died)
+
+	def stats(self):
+		return {
+			'crops': self.count,
+			'capacity': self.capacity,
+			'types': len(self.types),
+			'backend': 'numpy' if self.use_numpy else 'python',
+		}
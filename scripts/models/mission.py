@@ -1,6 +1,8 @@
 from scripts.db.item_db import ItemDatabase
-from scripts.db.mission_db import MissionDatabase
+from scripts.db.mission_db import MissionCatalog, MissionDatabase
+from scripts.db.write_behind import WriteBehindQueue
 from datetime import date, datetime, timedelta
+import threading
 
 class Mission:
     def __init__(self, mission_id, name, description, mission_type, npc_assigned, reward_item, reward_quantity, required_progress):
@@ -26,6 +28,7 @@ class Mission:
         self.action_location = None  # Địa điểm cần thực hiện (nếu có)
         self.reward_claimed = False  # Đánh dấu đã nhận phần thưởng
         self.reward_type = 'item'  # Loại phần thưởng: 'item', 'coins', 'xp'
+        self.dirty = False  # Trạng thái đã thay đổi so với DB, chờ MissionManager ghi
         
         # Phân tích mô tả để lấy thông tin
         self._parse_description()
@@ -71,6 +74,7 @@ class Mission:
         
         old_progress = self.progress
         self.progress += amount
+        self.dirty = True
         
         # Kiểm tra nếu nhiệm vụ đã hoàn thành
         if self.progress >= self.required_progress:
@@ -86,6 +90,7 @@ class Mission:
         self.date_completed = datetime.now()
         # Đạt đến 100% tiến độ
         self.progress = self.required_progress
+        self.dirty = True
         return True
         
     def get_progress_percentage(self):
@@ -113,6 +118,7 @@ class DailyMission(Mission):
         self.progress = 0
         self.date_assigned = datetime.now()
         self.date_completed = None
+        self.dirty = True
 
 class WeeklyMission(Mission):
     def check_reset(self):
@@ -133,6 +139,7 @@ class WeeklyMission(Mission):
         self.progress = 0
         self.date_assigned = datetime.now()
         self.date_completed = None
+        self.dirty = True
 
 class StoryMission(Mission):
     """Nhiệm vụ cốt truyện - mở khóa theo tiến độ game"""
@@ -152,13 +159,19 @@ class MissionManager:
         self.player_id = player_id
         self.player = player  # Lưu tham chiếu đến player
         self.missions = {}  # mission_id -> Mission instance
+        self.catalog = MissionCatalog.get_instance()
         self.last_check_time = None  # Thời điểm cuối cùng kiểm tra reset
         self.active_notification = None  # Thông báo nhiệm vụ đang hiển thị
         self.completed_missions = []  # Danh sách nhiệm vụ hoàn thành chưa nhận thưởng
+        self.queue = WriteBehindQueue.get_instance()
+        self.unsaved = {}  # Format: {mission_id: mission_data} đã đổi nhưng chưa ghi xuống DB
+        self.unsaved_lock = threading.Lock()  # thread game ghi, thread ghi nền xóa
         
-    def load_player_missions(self):
-        """Load nhiệm vụ từ database cho người chơi."""
-        data = MissionDatabase.get_player_missions(self.player_id)
+    def load_player_missions(self, data=None):
+        """Load nhiệm vụ từ database cho người chơi.
+           data: các dòng đã đọc sẵn (MissionDatabase.get_player_missions), None thì tự đọc."""
+        if data is None:
+            data = MissionDatabase.get_player_missions(self.player_id)
         for row in data:
             mission = self._create_mission_from_data(row)
             self.missions[mission.mission_id] = mission
@@ -231,18 +244,46 @@ class MissionManager:
                 
         return mission
 
-    def save_player_missions(self):
-        """Lưu trạng thái nhiệm vụ của người chơi vào database."""
-        for mission in self.missions.values():
-            mission_data = {
-                'mission_id': mission.mission_id,
-                'status': mission.status,
-                'progress': mission.progress,
-                'date_assigned': mission.date_assigned or date.today(),
-                'date_completed': mission.date_completed,
-                'reward_claimed': mission.reward_claimed
-            }
-            MissionDatabase.save_player_mission(self.player_id, mission_data)
+    @staticmethod
+    def mission_data(mission):
+        return {
+            'mission_id': mission.mission_id,
+            'status': mission.status,
+            'progress': mission.progress,
+            'date_assigned': mission.date_assigned or date.today(),
+            'date_completed': mission.date_completed,
+            'reward_claimed': mission.reward_claimed
+        }
+
+    def save_player_missions(self, urgent=False):
+        """Lưu các nhiệm vụ đã thay đổi. Không ghi ngay: WriteBehindQueue gom các lần gọi
+           và ghi một lô (executemany) trên thread nền. urgent=True: ghi sớm nhất có thể (pause, save game)."""
+        with self.unsaved_lock:
+            for mission in self.missions.values():
+                if mission.dirty:
+                    mission.dirty = False
+                    self.unsaved[mission.mission_id] = self.mission_data(mission)
+            batch = dict(self.unsaved)
+        if batch:
+            self.queue.submit(('missions', str(self.player_id)), lambda: self.write_missions(batch))
+        if urgent:
+            self.queue.request_flush()
+
+    def flush_player_missions(self, timeout=None):
+        """Ghi đồng bộ ngay trên thread hiện tại"""
+        self.save_player_missions()
+        return self.queue.flush(timeout)
+
+    def write_missions(self, batch):
+        """Job chạy trên thread ghi nền"""
+        if not MissionDatabase.save_player_missions(self.player_id, list(batch.values())):
+            return False
+        with self.unsaved_lock:
+            for mission_id, data in batch.items():
+                # Chỉ bỏ bản đã ghi; bản mới hơn (nếu có) chờ lần ghi sau
+                if self.unsaved.get(mission_id) is data:
+                    del self.unsaved[mission_id]
+        return True
 
     def update_mission_progress(self, mission_id, amount):
         """Cập nhật tiến độ của một nhiệm vụ cụ thể."""
@@ -251,7 +292,7 @@ class MissionManager:
             if updated:
                 self.save_player_missions()
                 if self.missions[mission_id].status == 'completed':
-                    self._check_mission_prerequisites()  # Kiểm tra mở khóa nhiệm vụ mới
+                    self._check_mission_prerequisites([mission_id])  # Kiểm tra mở khóa nhiệm vụ mới
                     return True  # Đã hoàn thành nhiệm vụ
             return updated
         return False
@@ -398,56 +439,42 @@ class MissionManager:
         # Lưu lại nếu có bất kỳ thay đổi nào
         if updated_missions:
             self.save_player_missions()
-            self._check_mission_prerequisites()
+            completed = [mission_id for mission_id in updated_missions
+                         if self.missions[mission_id].status == 'completed']
+            if completed:
+                self._check_mission_prerequisites(completed)
             
         return updated_missions
 
-    def _check_mission_prerequisites(self):
-        """Kiểm tra và mở khóa các nhiệm vụ nếu điều kiện tiên quyết đã được đáp ứng."""
-        all_missions = MissionDatabase.get_all_missions()
-        completed_mission_ids = [
-            mission.mission_id for mission in self.missions.values() 
-            if mission.status == 'completed'
-        ]
-        
-        # Lấy tất cả nhiệm vụ chưa gán cho người chơi
-        for mission_data in all_missions:
-            if mission_data['mission_id'] not in self.missions:
-                # Kiểm tra prerequisites
-                prerequisites_met = True
-                
-                # Nếu có prerequisite_missions và không phải là chuỗi rỗng
-                if 'prerequisite_missions' in mission_data and mission_data['prerequisite_missions']:
-                    try:
-                        prereq_ids = [int(x) for x in mission_data['prerequisite_missions'].split(',')]
-                        # Kiểm tra xem tất cả các nhiệm vụ tiên quyết đã hoàn thành chưa
-                        for prereq_id in prereq_ids:
-                            if prereq_id not in completed_mission_ids:
-                                prerequisites_met = False
-                                break
-                    except:
-                        pass  # Bỏ qua lỗi định dạng
-                        
-                # Nếu đáp ứng điều kiện, gán nhiệm vụ mới
-                if prerequisites_met:
-                    mission = self._create_mission_from_data(mission_data)
-                    self.assign_new_mission(mission)
+    def _check_mission_prerequisites(self, completed_ids=None):
+        """Kiểm tra và mở khóa các nhiệm vụ nếu điều kiện tiên quyết đã được đáp ứng.
+           completed_ids: các nhiệm vụ vừa hoàn thành - chỉ xét các nhiệm vụ phụ thuộc trực tiếp
+           vào chúng; None: xét toàn bộ catalog (khi load)."""
+        if completed_ids is None:
+            candidates = self.catalog.all_ids()
+        else:
+            candidates = [dependent for mission_id in completed_ids
+                          for dependent in self.catalog.dependents_of(mission_id)]
+
+        for mission_id in candidates:
+            if mission_id in self.missions:
+                continue
+            prerequisites_met = all(
+                prerequisite_id in self.missions and self.missions[prerequisite_id].status == 'completed'
+                for prerequisite_id in self.catalog.prerequisites_of(mission_id)
+            )
+            # Nếu đáp ứng điều kiện, gán nhiệm vụ mới
+            if prerequisites_met:
+                mission = self._create_mission_from_data(self.catalog.get(mission_id))
+                self.assign_new_mission(mission)
 
     def assign_new_mission(self, mission):
         """Gán một nhiệm vụ mới cho người chơi."""
         if mission.mission_id not in self.missions:
             mission.date_assigned = datetime.now()
+            mission.dirty = True
             self.missions[mission.mission_id] = mission
-            
-            mission_data = {
-                'mission_id': mission.mission_id,
-                'status': mission.status,
-                'progress': mission.progress,
-                'date_assigned': mission.date_assigned,
-                'date_completed': mission.date_completed,
-                'reward_claimed': mission.reward_claimed
-            }
-            MissionDatabase.save_player_mission(self.player_id, mission_data)
+            self.save_player_missions()
             return True
         return False
 
@@ -495,11 +522,15 @@ class MissionManager:
         if mission.reward_type == 'coins':
             # Lấy item coins từ database
             coin_item = ItemDatabase.get_item_from_name('coins')
+            if coin_item is None:
+                return False, "Không tìm thấy item coins"
             player.add_item(coin_item, mission.reward_quantity)
             print(f"Nhận {mission.reward_quantity} coins từ nhiệm vụ {mission.name}")
         elif mission.reward_type == 'item':
             # Thêm vật phẩm vào inventory
             item = ItemDatabase.get_item_from_name(mission.reward_item)
+            if item is None:
+                return False, f"Không tìm thấy item {mission.reward_item}"
             self.player.add_item(item, mission.reward_quantity)
             print(f"Nhận {mission.reward_quantity} {mission.reward_item} từ nhiệm vụ {mission.name}")
         elif mission.reward_type == 'xp':
@@ -510,17 +541,10 @@ class MissionManager:
         
         # Đánh dấu đã nhận phần thưởng
         mission.reward_claimed = True
+        mission.dirty = True
         
         # Cập nhật trạng thái nhiệm vụ trong cơ sở dữ liệu
-        mission_data = {
-            'mission_id': mission.mission_id,
-            'status': mission.status,
-            'progress': mission.progress,
-            'date_assigned': mission.date_assigned,
-            'date_completed': mission.date_completed,
-            'reward_claimed': True
-        }
-        MissionDatabase.save_player_mission(self.player_id, mission_data)
+        self.save_player_missions()
         
         return True, f"Đã nhận {mission.reward_quantity} {mission.reward_type}"
 
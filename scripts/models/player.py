@@ -5,16 +5,17 @@ from scripts.db.item_db import ItemDatabase
 import settings  # đảm bảo import module settings, thay vì “from settings import *”
 from scripts import level
 from scripts.models.sprites import Tree
-from scripts.db.inventory_db import InventoryDatabase
-from scripts.db.settings_db import SettingsDB
+from scripts.db.inventory_db import InventoryDatabase, InventoryWriter
 from scripts.helpers.support import *
 from scripts.helpers.timer import Timer
 from scripts.ui.inventory_ui import InventoryUI
 from settings import *
 class Player(pygame.sprite.Sprite):
-	def __init__(self, pos, group, collision_sprites, tree_sprites, interaction_sprites, soil_layer, toggle_shop, player_id):
+	def __init__(self, pos, group, collision_sprites, tree_sprites, interaction_sprites, soil_layer, toggle_shop, player_id, inventory = None, keys_bind = None):
+		"""inventory, keys_bind: dữ liệu đã đọc sẵn từ DB (Level.fetch_player_data); None thì tự đọc"""
 		super().__init__(group)
-		self.keys_bind = SettingsDB.get_settings()['keys_bind']
+		self.keys_bind = keys_bind or settings_service.keys_bind
+		settings_service.subscribe(self.apply_settings)
 		
 		self.mission_manager = MissionManager(player_id=1, player=self) 
 
@@ -33,6 +34,7 @@ class Player(pygame.sprite.Sprite):
 		# Movement attributes
 		self.direction = pygame.math.Vector2()
 		self.pos = pygame.math.Vector2(self.rect.center)
+		self.previous_pos = pygame.math.Vector2(self.pos)  # vị trí ở bước mô phỏng trước, dùng để nội suy khi vẽ
 		self.speed = 200
 		
 		# Collision
@@ -64,22 +66,21 @@ class Player(pygame.sprite.Sprite):
 		self.selected_tool = self.tools[self.tool_index]
 
 		# Inventory
-		self.inventory = InventoryDatabase.get_player_inventory(player_id=self.player_id)
+		self.inventory = inventory if inventory is not None else InventoryDatabase.get_player_inventory(player_id=self.player_id)
+		self.inventory_writer = InventoryWriter(self.player_id, self.inventory)
 
 		if self.inventory.get_item('coins') is None:
-			self.add_item(ItemDatabase.get_item_from_name('coins'), 0)
+			coins = ItemDatabase.get_item_from_name('coins')
+			if coins is not None:
+				self.add_item(coins, 0)
 
+		# Hotbar chỉ dựng lại khi inventory báo thay đổi
 		self.hotbar = []
-		for index, item in enumerate(self.inventory.items):
-			if item is not None and index < 6 and item.item_name != 'coins':
-				self.hotbar.append(item.item_name)
-
-		if self.hotbar:
-			self.hotbar_index = 0
-			self.selected_item = self.hotbar[self.hotbar_index]
-		else:
-			self.hotbar_index = 0
-			self.selected_item = None
+		self.hotbar_index = 0
+		self.selected_item = None
+		self.hotbar_dirty = True
+		self.inventory.add_listener(self.mark_hotbar_dirty)
+		self.update_hotbar()
 		# Inventory UI
 		self.inventory_ui = InventoryUI(self)
 		
@@ -90,23 +91,25 @@ class Player(pygame.sprite.Sprite):
 		self.talking_to = None
 		self.talking = False
 
+	def apply_settings(self, values):
+		"""Nhận keybind mới khi settings thay đổi"""
+		self.keys_bind = values['keys_bind']
+
 	def save_inventory(self):
 		"""Lưu inventory vào cơ sở dữ liệu"""
 		items_info = [(item.item_name, item.quantity) for item in self.inventory.items if item is not None]
 		print("📦 Inventory trước khi lưu:", items_info)
-		return InventoryDatabase.save_inventory(self.player_id, self.inventory)
+		# Ghi nền qua write-behind queue, không chặn frame
+		self.inventory_writer.save()
+		return True
 	
 	def add_item(self, item_data, quantity=1):
-		"""Thêm item vào inventory"""
+		"""Thêm item vào inventory (inventory_writer tự ghi nền khi inventory thay đổi)"""
 		self.inventory.add_item(item_data, quantity)
-		self.save_inventory()
 
 	def remove_item(self, item_name, quantity=1):
 		"""Sử dụng item trong inventory"""
-		result = self.inventory.remove_item(item_name, quantity)
-		if result:
-			self.save_inventory()
-		return result
+		return self.inventory.remove_item(item_name, quantity)
 
 	def has_item(self, item_name, quantity=1):
 		"""Kiểm tra xem có đủ số lượng item không"""
@@ -179,11 +182,17 @@ class Player(pygame.sprite.Sprite):
 			self.frame_index = 0
 		self.image = self.animations[self.status][int(self.frame_index)]
 
-	def update_hotbar(self):	
-		self.hotbar = []
-		for index, item in enumerate(self.inventory.items):
-			if item is not None and index < 6 and item.item_name != 'coins':
-				self.hotbar.append(item.item_name)
+	def mark_hotbar_dirty(self):
+		self.hotbar_dirty = True
+
+	def update_hotbar(self):
+		"""Dựng lại danh sách hotbar nếu inventory đã thay đổi, rồi đồng bộ vật phẩm đang chọn"""
+		if self.hotbar_dirty:
+			self.hotbar = []
+			for index, item in enumerate(self.inventory.items):
+				if item is not None and index < 6 and item.item_name != 'coins':
+					self.hotbar.append(item.item_name)
+			self.hotbar_dirty = False
 
 		if self.hotbar:
 			if self.hotbar_index >= len(self.hotbar):
@@ -264,13 +273,9 @@ class Player(pygame.sprite.Sprite):
 		if self.timers['tool use'].active:
 			self.status = self.status.split('_')[0] + f'_{self.selected_tool}'
 
-	def update_timers(self):
-		for timer in self.timers.values():
-			timer.update()
-
 	def collision(self, direction):
-		# Check collision with both obstacles and trees
-		for sprite in list(self.tree_sprites.sprites()) + list(self.obstacle_sprites.sprites()):
+		# Check collision with both obstacles and trees (chỉ các ô lưới mà hitbox chạm vào)
+		for sprite in self.tree_sprites.query(self.hitbox) + self.obstacle_sprites.query(self.hitbox):
 			if hasattr(sprite, 'hitbox'):
 				if sprite.hitbox.colliderect(self.hitbox):
 					if direction == 'horizontal':
@@ -306,15 +311,25 @@ class Player(pygame.sprite.Sprite):
 		self.collision('vertical')
 
 	def update(self, dt):
+		self.previous_pos.update(self.pos)
 		self.input()
 		self.get_status()
-		self.update_timers()
 		self.get_target_pos()
 		self.move(dt)
 		self.animate(dt)
+		self.update_hotbar()
+
+	def render_center(self, alpha = 1.0):
+		"""Tâm player nội suy giữa hai bước mô phỏng (alpha 0..1); dịch chuyển xa (load, dịch chuyển) thì không nội suy"""
+		if self.previous_pos.distance_squared_to(self.pos) > TILE_SIZE * TILE_SIZE:
+			return self.rect.center
+		x = self.previous_pos.x + (self.pos.x - self.previous_pos.x) * alpha
+		y = self.previous_pos.y + (self.pos.y - self.previous_pos.y) * alpha
+		return (round(x), round(y))
+
+	def draw_ui(self):
 		# Draw inventory UI only
 		self.inventory_ui.draw()
-		self.update_hotbar()
 
 
 
@@ -2,54 +2,105 @@ from random import choice, randint
 import pygame
 from settings import *
 from scripts.helpers.support import *
-from scripts.models.sprites import Generic
+from scripts.helpers.assets import assets
 
-class Drop(Generic):
-    def __init__(self, surf, pos, moving, groups, z):
-        
-        super().__init__(pos, surf, groups, z)
-        self.lifetime = randint(400, 500)
-        self.start_time = pygame.time.get_ticks()
+RAIN_DIRECTION = (-2, 4)
+RAIN_SPAWN_MARGIN = (250, 500)  # hạt mưa bay ~(-250, 500) px trong thời gian sống
 
+class RainPool:
+    """Ring buffer cố định cho hạt mưa: không tạo/xóa object khi mưa, hạt cũ nhất bị ghi đè khi đầy"""
+    def __init__(self, surfaces, capacity, moving):
+        self.surfaces = surfaces
+        self.capacity = capacity
         self.moving = moving
+        self.cursor = 0
+
+        # Dữ liệu từng hạt dạng mảng song song
+        self.surf = [surfaces[0]] * capacity
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.speed = [0] * capacity
+        self.death = [0] * capacity  # thời điểm hết hạn (ms), 0 = ô trống
+        self.blit_sequence = []
+
+    def spawn(self, x, y, now):
+        index = self.cursor
+        self.cursor = (index + 1) % self.capacity
+        self.surf[index] = choice(self.surfaces)
+        self.x[index] = x
+        self.y[index] = y
+        self.speed[index] = randint(200, 250)
+        self.death[index] = now + randint(400, 500)
+
+    def update(self, dt, now):
+        death = self.death
+        for index in range(self.capacity):
+            if death[index] and now >= death[index]:
+                death[index] = 0
         if self.moving:
-            self.pos = pygame.math.Vector2(self.rect.topleft)
-            self.direction = pygame.math.Vector2(-2, 4)
-            self.speed = randint(200, 250)
-    def update(self, dt):
-        if self.moving:
-            self.pos += self.direction * self.speed * dt
-            self.rect.topleft = (round(self.pos.x), round(self.pos.y))
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
-            self.kill()
+            x, y, speed = self.x, self.y, self.speed
+            for index in range(self.capacity):
+                if death[index]:
+                    x[index] += RAIN_DIRECTION[0] * speed[index] * dt
+                    y[index] += RAIN_DIRECTION[1] * speed[index] * dt
+
+    def draw(self, surface, offset):
+        sequence = self.blit_sequence
+        sequence.clear()
+        ox, oy = offset
+        for index in range(self.capacity):
+            if self.death[index]:
+                sequence.append((self.surf[index], (round(self.x[index] - ox), round(self.y[index] - oy))))
+        if sequence:
+            surface.blits(sequence, False)
+
+    def clear(self):
+        for index in range(self.capacity):
+            self.death[index] = 0
 
 class Rain:
     def __init__(self, all_sprites):
         self.all_sprites = all_sprites
-        self.rain_drops = import_folder(f'{GRAPHICS_PATH}/world/rain/drops/')
-        self.rain_floor = import_folder(f'{GRAPHICS_PATH}/world/rain/floor/')
-
-        self.floor_w, self.floor_h = pygame.image.load(f'{GRAPHICS_PATH}/world/ground.png').get_size()
-
-    def create_floor(self):
-        Drop(
-            surf= choice(self.rain_floor),
-            pos= (randint(0, self.floor_w), randint(0, self.floor_h)),
-            moving= False,
-            groups= self.all_sprites,
-            z = LAYERS['rain floor'])
-
-    def create_drops(self):
-        Drop(            
-            surf= choice(self.rain_drops),
-            pos= (randint(0, self.floor_w), randint(0, self.floor_h)),
-            moving= True,
-            groups= self.all_sprites,
-            z = LAYERS['rain drops'])
-
-    def update(self):
-        self.create_floor()
-        self.create_drops()
+        rain_drops = import_folder(f'{GRAPHICS_PATH}/world/rain/drops/')
+        rain_floor = import_folder(f'{GRAPHICS_PATH}/world/rain/floor/')
+
+        self.floor_w, self.floor_h = assets.image_size(f'{GRAPHICS_PATH}/world/ground.png')
+
+        capacity = RAIN_PROP['pool']
+        self.floor = RainPool(rain_floor, capacity, moving=False)
+        self.drops = RainPool(rain_drops, capacity, moving=True)
+        self.time = 0  # thời gian mưa đã chạy (ms), chỉ tăng khi update
+        self.spawn_budget = 0.0
+
+        # Vẽ theo lô ở đúng layer thay vì làm sprite trong all_sprites
+        all_sprites.add_batch(LAYERS['rain floor'], self.floor.draw)
+        all_sprites.add_batch(LAYERS['rain drops'], self.drops.draw)
+
+    def spawn(self, offset, count):
+        ox, oy = offset
+        for _ in range(count):
+            # Vệt nước trên mặt đất: trong màn hình
+            self.floor.spawn(ox + randint(0, SCREEN_WIDTH), oy + randint(0, SCREEN_HEIGHT), self.time)
+            # Hạt mưa rơi chéo xuống trái: sinh lệch lên trên/phải để bay vào màn hình
+            self.drops.spawn(ox + randint(0, SCREEN_WIDTH + RAIN_SPAWN_MARGIN[0]),
+                             oy + randint(-RAIN_SPAWN_MARGIN[1], SCREEN_HEIGHT), self.time)
+
+    def update(self, dt, raining, offset):
+        self.time += dt * 1000
+        if raining:
+            # Giữ mật độ mưa như cũ (spawn_rate hạt/giây trên toàn bản đồ), chỉ sinh trong vùng nhìn thấy
+            view_area = (SCREEN_WIDTH + RAIN_SPAWN_MARGIN[0]) * (SCREEN_HEIGHT + RAIN_SPAWN_MARGIN[1])
+            self.spawn_budget += RAIN_PROP['spawn_rate'] * dt * min(1, view_area / (self.floor_w * self.floor_h))
+            count = int(self.spawn_budget)
+            self.spawn_budget -= count
+            self.spawn(offset, count)
+        self.floor.update(dt, self.time)
+        self.drops.update(dt, self.time)
+
+    def clear(self):
+        self.floor.clear()
+        self.drops.clear()
+        self.spawn_budget = 0.0
 
 class Sky:
     def __init__(self):
@@ -116,8 +167,9 @@ class Sky:
         # Update time and sky color
         self.update_time(dt)
         self.update_sky_color()
-        
-        # Draw sky
+        self.draw()
+
+    def draw(self):
         self.full_surf.fill(self.current_color)
         self.display_surface.blit(self.full_surf, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
 
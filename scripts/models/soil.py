@@ -1,9 +1,11 @@
 from random import choice
 import pygame
 from settings import *
-from pytmx.util_pygame import load_pygame
 from scripts.helpers.support import *
 from scripts.helpers.timer import *
+from scripts.helpers.spatial_hash import reindex
+from scripts.models.soil_grid import SoilGrid, FARMABLE, TILLED, WATERED, PLANTED
+from scripts.models.crops import CropSystem
 
 class SoilTile(pygame.sprite.Sprite):
 	def __init__(self, pos, surf, groups):
@@ -19,75 +21,101 @@ class WaterTile(pygame.sprite.Sprite):
 		self.rect = self.image.get_rect(topleft = pos)
 		self.z = LAYERS['soil water']
 
+class PlantFrames:
+	"""Cache frame tăng trưởng dùng chung cho mọi Plant, key là loại cây"""
+	frames = {}  # Format: {'corn': [Surface, ...]}
+	hits = 0
+	misses = 0
+
+	@classmethod
+	def get(cls, plant_type):
+		name = plant_type.replace(' seeds', '')
+		frames = cls.frames.get(name)
+		if frames is None:
+			cls.misses += 1
+			frames = import_folder(f"{GRAPHICS_PATH}/fruit/{name}")
+			cls.frames[name] = frames
+		else:
+			cls.hits += 1
+		return frames
+
+	@classmethod
+	def warm(cls, plant_types = GROW_SPEED):
+		"""Nạp trước frame khi vào level để trồng cây/load game không phải đọc đĩa"""
+		for plant_type in plant_types:
+			if plant_type.replace(' seeds', '') not in cls.frames:
+				cls.get(plant_type)
+
+	@classmethod
+	def stats(cls):
+		return {'hits': cls.hits, 'misses': cls.misses, 'cached': len(cls.frames)}
+
 class Plant(pygame.sprite.Sprite):
-	def __init__(self, plant_type, groups, soil, check_watered):
+	"""Sprite để vẽ một cây; tuổi, trạng thái tưới và chín nằm trong CropSystem (slot)"""
+	def __init__(self, plant_type, groups, soil, crops, age = 0):
 		super().__init__(groups)
 		self.plant_type = plant_type
-		# Import folder cho loại cây; đảm bảo folder tồn tại và tên khớp
-		self.frames = import_folder(f"{GRAPHICS_PATH}/fruit/{plant_type.replace(' seeds', '')}")
+		# Frame lấy từ cache dùng chung; đảm bảo folder tồn tại và tên khớp
+		self.frames = PlantFrames.get(plant_type)
 		if not self.frames:
 			raise ValueError(f"Không tìm thấy asset cho cây: {plant_type}")
 		self.soil = soil
-		self.check_watered = check_watered
+		self.crops = crops
 
-		self.age = 0
 		self.max_age = len(self.frames) - 1
 		self.grow_speed = GROW_SPEED.get(plant_type.replace(' seeds', ''), 0.05) / 1000
-		self.harvestable = False
-
-		self.last_watered = pygame.time.get_ticks()
-		self.water_deadline = SEED_PROP.get('thirsty', 10 * 1000)
-		self.needs_water = True
+		self.slot = crops.add(
+			self, plant_type,
+			soil.rect.x // TILE_SIZE, soil.rect.y // TILE_SIZE,
+			self.max_age, self.grow_speed, scheduler.now('game'), age
+		)
 
-		self.image = self.frames[self.age]
 		self.y_offset = -16 
-		self.rect = pygame.Rect(0, 0, 0, 0) 
-		
-		# self.image.get_rect(midbottom=self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
-
 		self.z = LAYERS['ground plant']
-		self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.4, -self.rect.height * 0.4)
-
-	def check_water_status(self):
-		"""Check if plant has been watered and update status"""
-		current_time = pygame.time.get_ticks()
-		is_watered = self.check_watered(self.rect.midbottom)
-		if is_watered:
-			self.last_watered = current_time
-			self.needs_water = False
-		else:
-			# Check if too long without water
-			time_since_water = current_time - self.last_watered
-			if time_since_water >= self.water_deadline:
-				# Plant dies from lack of water
-				self.kill()
-				self.soil.grid[self.soil.rect.y // TILE_SIZE][self.soil.rect.x // TILE_SIZE].remove('P')
-				return False
-			
-			self.needs_water = True
-		
-		return True
-
-	def grow(self):
-		# First check water status
-		if not self.check_water_status():
-			return
-
-		# Only grow if currently watered
-		if not self.needs_water:
-			if self.age >= self.max_age:
-				self.z = LAYERS['main']
-				self.hitbox = self.rect.copy().inflate(-26, -self.rect.height * 0.8)
-				self.hitbox.bottom = self.rect.bottom
-				self.age = self.max_age
-				self.harvestable = True
-			else:
-				self.age += self.grow_speed
-				self.image = self.frames[int(self.age)]
-				self.rect = self.image.get_rect(midbottom = self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
-
-		# Update sprite position even if not growing
-		self.rect = self.image.get_rect(midbottom = self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
+		self.refresh()
+		# Cây đang lớn không chặn đường (hitbox rỗng như bản gốc); ripen() đặt hitbox thật
+		self.hitbox = pygame.Rect(self.rect.midbottom, (0, 0))
+		# super().__init__ đã thêm cây vào collision_sprites trước khi có hitbox: đăng ký lại
+		reindex(self)
+
+	# Trạng thái đọc/ghi thẳng vào mảng của CropSystem
+	@property
+	def age(self):
+		return float(self.crops.age[self.slot])
+
+	@age.setter
+	def age(self, value):
+		self.crops.age[self.slot] = value
+
+	@property
+	def harvestable(self):
+		return bool(self.crops.harvestable[self.slot])
+
+	@property
+	def needs_water(self):
+		return bool(self.crops.needs_water[self.slot])
+
+	@property
+	def last_watered(self):
+		return int(self.crops.last_watered[self.slot])
+
+	def refresh(self):
+		"""Cập nhật hình theo tuổi (chỉ gọi khi cây đổi frame)"""
+		self.image = self.frames[min(int(self.age), self.max_age)]
+		self.rect = self.image.get_rect(midbottom = (self.soil.rect.centerx, self.soil.rect.bottom + self.y_offset))
+
+	def ripen(self):
+		"""Cây đạt tuổi tối đa: chuyển lên layer main và cho phép thu hoạch"""
+		self.z = LAYERS['main']
+		self.hitbox = self.rect.copy().inflate(-26, -self.rect.height * 0.8)
+		self.hitbox.bottom = self.rect.bottom
+		reindex(self)
+
+	def kill(self):
+		if self.slot is not None:
+			self.crops.remove(self.slot)
+			self.slot = None
+		super().kill()
 
 class SoildLayer:
 	def __init__(self, all_sprites, collision_sprites):
@@ -95,11 +123,14 @@ class SoildLayer:
 		self.all_sprites = all_sprites
 		self.collision_sprites = collision_sprites
 		self.soil_sprites = pygame.sprite.Group()
+		self.soil_tiles = {}  # Format: {(x,y): SoilTile}
 		self.water_sprites = pygame.sprite.Group()
 		self.plant_sprites = pygame.sprite.Group()
 		# Assets
 		self.soil_surfs = import_folder_dict(f'{GRAPHICS_PATH}/world/soil/')
 		self.water_surfs = import_folder(f'{GRAPHICS_PATH}/world/soil_water/')
+		PlantFrames.warm()
+		self.crops = CropSystem(SEED_PROP.get('thirsty', 10 * 1000))
 		
 		self.create_soil_grid()
 		self.create_hit_rects()
@@ -110,24 +141,17 @@ class SoildLayer:
 
 
 	def create_soil_grid(self):
-		from pytmx.util_pygame import load_pygame
-		ground = load_pygame(f'{MAPS_PATH}/map.tmx').get_layer_by_name('Farmable').data
-		h_tiles = len(ground[0])
-		v_tiles = len(ground[1])
+		farmable = load_map(f'{MAPS_PATH}/map.tmx').get_layer_by_name('Farmable')
 		
-		self.grid = [[[] for col in range(h_tiles)] for row in range(v_tiles)] 
-		for x, y, _ in load_pygame(f'{MAPS_PATH}/map.tmx').get_layer_by_name('Farmable').tiles():
-			self.grid[y][x].append('F')
+		self.grid = SoilGrid(len(farmable.data[0]), len(farmable.data))
+		for x, y, _ in farmable.tiles():
+			self.grid.set(x, y, FARMABLE)
 	
 	def create_hit_rects(self):
 		self.hit_rects = []
-		for index_row, row in enumerate(self.grid):
-			for index_col, cell in enumerate(row):
-				if 'F' in cell:
-					x = index_col * TILE_SIZE
-					y = index_row * TILE_SIZE
-					rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-					self.hit_rects.append(rect)
+		for x, y in self.grid.positions(FARMABLE):
+			rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+			self.hit_rects.append(rect)
 	
 	def get_hit(self, point):
 		for rect in self.hit_rects:
@@ -136,13 +160,12 @@ class SoildLayer:
 				x = rect.x // TILE_SIZE
 				y = rect.y // TILE_SIZE
 
-				if 'F' in self.grid[y][x] and not 'X' in self.grid[y][x]:
-					self.grid[y][x].append('X')
-					self.create_soil_tiles()
+				if self.grid.has(x, y, FARMABLE) and not self.grid.has(x, y, TILLED):
+					self.grid.set(x, y, TILLED)
+					self.refresh_soil_tiles(x, y)
 					if (x, y) not in self.soil_timers:
 						# Chỉ tạo mới Timer khi chưa có timer cho tile này
-						self.soil_timers[(x, y)] = Timer(self.soil_duration, self.remove_soil_tile, x, y)
-						self.soil_timers[(x, y)].activate()
+						self.start_soil_timer(x, y)
 
 						if self.all_sprites.debug_mode:
 							self.plant_seed_at(
@@ -151,160 +174,166 @@ class SoildLayer:
 								3,
 								True
 							)
-				print(self.grid[y][x])
+				print(self.grid.get(x, y))
 
 	def water(self, target_pos):
-		for soil_prite in self.soil_sprites.sprites():
-			if soil_prite.rect.collidepoint(target_pos):
-				x = soil_prite.rect.x // TILE_SIZE
-				y = soil_prite.rect.y // TILE_SIZE
-				
-				if 'W' not in self.grid[y][x]:
-					self.grid[y][x].append('W')
-					pos = soil_prite.rect.topleft
-					surf = choice(self.water_surfs)
-					WaterTile(pos, surf, [self.all_sprites, self.water_sprites])
+		x = int(target_pos[0]) // TILE_SIZE
+		y = int(target_pos[1]) // TILE_SIZE
+		soil_sprite = self.soil_tiles.get((x, y))
+		if soil_sprite and not self.grid.has(x, y, WATERED):
+			self.grid.set(x, y, WATERED)
+			pos = soil_sprite.rect.topleft
+			surf = choice(self.water_surfs)
+			WaterTile(pos, surf, [self.all_sprites, self.water_sprites])
 
 	def water_all(self):
-		for index_row, row in enumerate(self.grid):
-			for index_col, cell in enumerate(row):
-				if 'X' in cell and 'W' not in cell:
-					cell.append('W')
-					x = index_col * TILE_SIZE
-					y = index_row * TILE_SIZE
-					WaterTile(
-						pos= (x,y),
-						surf= choice(self.water_surfs),
-						groups=[self.all_sprites, self.water_sprites]
-					)
+		for x, y in self.grid.water_tilled():
+			WaterTile(
+				pos= (x * TILE_SIZE, y * TILE_SIZE),
+				surf= choice(self.water_surfs),
+				groups=[self.all_sprites, self.water_sprites]
+			)
 	
 	def remove_water(self):
 		for sprite in self.water_sprites.sprites():
 			sprite.kill()
 
-		for row in self.grid:
-			for cell in row:
-				if 'W' in cell:
-					cell.remove('W')
+		self.grid.clear_water()
 
 	def check_watered(self, pos):
-		x = pos[0] // TILE_SIZE
-		y = pos[1] // TILE_SIZE
-		cell = self.grid[y][x]
-		is_watered = 'W' in cell
-		return is_watered
+		return self.grid.has(pos[0] // TILE_SIZE, pos[1] // TILE_SIZE, WATERED)
 
 	def plant_seed(self, target_pos, seed_type):
-		for soil_sprite in self.soil_sprites.sprites():
-			if soil_sprite.rect.collidepoint(target_pos):
-				x = soil_sprite.rect.x // TILE_SIZE
-				y = soil_sprite.rect.y // TILE_SIZE
-
-				if 'P' not in self.grid[y][x]:
-					# Remove timer when plant is added
-					if (x,y) in self.soil_timers:
-						del self.soil_timers[(x,y)]
-					
-					self.grid[y][x].append('P')
-					Plant(
-						plant_type= seed_type,
-						soil= soil_sprite,
-						groups= [self.all_sprites, self.plant_sprites, self.collision_sprites],
-						check_watered= self.check_watered
-					)
-					plant_seed_sound.play()
-					
-					
-					
-					return True
+		x = int(target_pos[0]) // TILE_SIZE
+		y = int(target_pos[1]) // TILE_SIZE
+		soil_sprite = self.soil_tiles.get((x, y))
+		if soil_sprite:
+			if not self.grid.has(x, y, PLANTED):
+				# Remove timer when plant is added
+				self.stop_soil_timer(x, y)
+				
+				self.grid.set(x, y, PLANTED)
+				Plant(
+					plant_type= seed_type,
+					soil= soil_sprite,
+					groups= [self.all_sprites, self.plant_sprites, self.collision_sprites],
+					crops= self.crops
+				)
+				plant_seed_sound.play()
+				
+				
+				
+				return True
 		return False
 	
 	def update_plant(self):
-		for plant in self.plant_sprites.sprites():
-			# Store position before potential death
-			x = plant.rect.centerx // TILE_SIZE
-			y = plant.rect.centery // TILE_SIZE
-			
-			plant.grow()
-			
-			# If plant died, remove it from grid
-			if plant not in self.plant_sprites:
-				if 'P' in self.grid[y][x]:
-					self.grid[y][x].remove('P')
+		"""Cập nhật mọi cây trong một lượt; chỉ sprite có thay đổi mới bị đụng tới.
+		Hạn tưới tính theo đồng hồ game (bước cố định, dừng khi pause/mở shop), không theo giờ thật"""
+		self.apply_crop_changes(self.crops.update(self.grid, scheduler.now('game')))
+
+	def apply_crop_changes(self, changes):
+		views = self.crops.views
+		for slot in changes.grown:
+			views[slot].refresh()
+		for slot in changes.ripened:
+			views[slot].refresh()
+			views[slot].ripen()
+		for slot in changes.died:
+			# Cây chết vì khô: xóa sprite và marker PLANTED
+			self.grid.clear(int(self.crops.x[slot]), int(self.crops.y[slot]), PLANTED)
+			views[slot].kill()
+
+	def get_tile_type(self, x, y):
+		"""Chọn 1 trong 16 kiểu tile dựa trên các ô đã cày xung quanh"""
+		t = self.grid.has(x, y - 1, TILLED)
+		b = self.grid.has(x, y + 1, TILLED)
+		r = self.grid.has(x + 1, y, TILLED)
+		l = self.grid.has(x - 1, y, TILLED)
+
+		tile_type = 'o'
+
+		if all((t, b, r, l)): tile_type = 'x'
+		
+		if l and not any((t,r,b)): tile_type = 'r'
+		if r and not any((t,l,b)): tile_type = 'l'
+		if r and l and not any ((t, b)): tile_type = 'lr'
+
+		if t and not any((r,l,b)): tile_type = 'b'
+		if b and not any((r,l,t)): tile_type = 't'
+		if t and b and not any((r,l)): tile_type = 'tb'
+
+		if l and b and not any((r,t)): tile_type = 'tr'
+		if r and b and not any((l,t)): tile_type = 'tl'
+		if l and t and not any((r,b)): tile_type = 'br'
+		if r and t and not any((l,b)): tile_type = 'bl'
+
+		if all((t,b,r)) and not l: tile_type = 'tbr'
+		if all((t,b,l)) and not r: tile_type = 'tbl'
+		if all((l,r,t)) and not b: tile_type = 'lrb'
+		if all((l,r,b)) and not t: tile_type = 'lrt'
+
+		return tile_type
+
+	def update_soil_tile(self, x, y):
+		"""Đồng bộ sprite của một ô với grid: tạo, đổi hình hoặc xóa"""
+		sprite = self.soil_tiles.get((x, y))
+		if not self.grid.has(x, y, TILLED):
+			if sprite:
+				sprite.kill()
+				del self.soil_tiles[(x, y)]
+			return
+
+		surf = self.soil_surfs[self.get_tile_type(x, y)]
+		if sprite:
+			sprite.image = surf
+		else:
+			self.soil_tiles[(x, y)] = SoilTile(
+				pos= (x * TILE_SIZE, y * TILE_SIZE),
+				surf= surf,
+				groups= [self.all_sprites, self.soil_sprites])
+
+	def refresh_soil_tiles(self, x, y):
+		"""Chỉ tính lại ô vừa thay đổi và 4 ô kề"""
+		for dx, dy in ((0, 0), (0, -1), (0, 1), (-1, 0), (1, 0)):
+			self.update_soil_tile(x + dx, y + dy)
 
 	def create_soil_tiles(self):
-		for index_row, row in enumerate(self.grid):
-			for index_col, cell in enumerate(row):
-				if 'X' in cell:
-
-					t = 'X' in self.grid[index_row - 1][index_col]
-					b = 'X' in self.grid[index_row + 1][index_col]
-					r = 'X' in row[index_col + 1]
-					l = 'X' in row[index_col - 1]
-
-					tile_type = 'o'
-
-					if all((t, b, r, l)): tile_type = 'x'
-					
-					if l and not any((t,r,b)): tile_type = 'r'
-					if r and not any((t,l,b)): tile_type = 'l'
-					if r and l and not any ((t, b)): tile_type = 'lr'
-
-					if t and not any((r,l,b)): tile_type = 'b'
-					if b and not any((r,l,t)): tile_type = 't'
-					if t and b and not any((r,l)): tile_type = 'tb'
-
-					if l and b and not any((r,t)): tile_type = 'tr'
-					if r and b and not any((l,t)): tile_type = 'tl'
-					if l and t and not any((r,b)): tile_type = 'br'
-					if r and t and not any((l,b)): tile_type = 'bl'
-
-					if all((t,b,r)) and not l: tile_type = 'tbr'
-					if all((t,b,l)) and not r: tile_type = 'tbl'
-					if all((l,r,t)) and not b: tile_type = 'lrb'
-					if all((l,r,b)) and not t: tile_type = 'lrt'
-
-					SoilTile(
-						pos= (index_col * TILE_SIZE, index_row * TILE_SIZE),
-						surf= self.soil_surfs[tile_type],
-						groups= [self.all_sprites, self.soil_sprites])
+		"""Dựng lại toàn bộ sprite soil từ grid (dùng khi load game)"""
+		for sprite in self.soil_tiles.values():
+			sprite.kill()
+		self.soil_tiles.clear()
+		for x, y in self.grid.positions(TILLED):
+			self.update_soil_tile(x, y)
 
 	def remove_water_tile(self, x, y):
-		if 'P' in self.grid[y][x]:
+		if self.grid.has(x, y, PLANTED):
 			return
 				# Xóa sprite water
 		for sprite in self.water_sprites.sprites():
 			if sprite.rect.x // TILE_SIZE == x and sprite.rect.y // TILE_SIZE == y:
 				sprite.kill()
-		if 'W' in self.grid[y][x]:
-			self.grid[y][x].remove('W')
-			self.soil_timers[(x, y)] = Timer(self.soil_duration, self.remove_soil_tile, x, y)
-			self.soil_timers[(x, y)].activate()
+		if self.grid.has(x, y, WATERED):
+			self.grid.clear(x, y, WATERED)
+			self.start_soil_timer(x, y)
 
 	def remove_soil_tile(self, x, y):
 		"""Remove a soil tile at given coordinates"""
 
-		if 'P' in self.grid[y][x]:
+		if self.grid.has(x, y, PLANTED):
 			return		
 		
-		if 'W' in self.grid[y][x]:
+		if self.grid.has(x, y, WATERED):
 			self.remove_water_tile(x, y)
 			return	
 		
-		# Xóa sprite soil
-		for sprite in self.soil_sprites.sprites():
-			if sprite.rect.x // TILE_SIZE == x and sprite.rect.y // TILE_SIZE == y:
-				sprite.kill()
-
 		# Cập nhật grid
-		if 'X' in self.grid[y][x]:
-			self.grid[y][x].remove('X')
+		self.grid.clear(x, y, TILLED)
 
 		# Xóa timer
-		if (x, y) in self.soil_timers:
-			del self.soil_timers[(x, y)]  # Xóa timer khi đã xóa soil tile
+		self.stop_soil_timer(x, y)
 		
-		self.create_soil_tiles()
+		# Xóa sprite soil của ô này và vẽ lại các ô kề
+		self.refresh_soil_tiles(x, y)
 
 	def update(self, dt):
 		"""Update soil layer state"""
@@ -312,18 +341,31 @@ class SoildLayer:
 		self.update_plant()
 		if self.raining:
 			self.water_all()
-
-		# Duyệt qua một bản sao của soil_timers để kiểm tra các timer đã hết hạn
-		for pos, timer in list(self.soil_timers.items()):
-			timer.update()
-
-			# if not timer.active:
-			# 	print(f"Timer for {pos} finished, removing soil tile")
-			# 	self.remove_soil_tile(*pos)
-
-			# 	# Xóa timer một cách an toàn
-			# 	if pos in self.soil_timers:
-			# 		del self.soil_timers[pos]  # Xóa timer khi đã xử lý
+		# Timer của đất do scheduler chạy khi tới hạn, không cần duyệt mỗi frame
+
+	def start_soil_timer(self, x, y):
+		"""Đặt (lại) hẹn giờ đất khô/mất cho ô (x, y)"""
+		self.stop_soil_timer(x, y)
+		timer = Timer(self.soil_duration, self.remove_soil_tile, x, y)
+		timer.activate()
+		self.soil_timers[(x, y)] = timer
+
+	def stop_soil_timer(self, x, y):
+		timer = self.soil_timers.pop((x, y), None)
+		if timer:
+			timer.deactivate()
+
+	def clear_soil_timers(self):
+		for timer in self.soil_timers.values():
+			timer.deactivate()
+		self.soil_timers.clear()
+
+	def advance(self, dt_ms):
+		"""Cho thời gian trôi thêm dt_ms (khi ngủ): cây lớn, nước trên đất bị xóa.
+		Chi phí tỉ lệ với số cây, không phụ thuộc dt_ms. Gọi trước scheduler.fast_forward(dt_ms):
+		cây tính từ giờ game hiện tại tới cùng thời điểm mà timer của đất được tua tới."""
+		self.apply_crop_changes(self.crops.advance(self.grid, dt_ms, scheduler.now('game')))
+		self.remove_water()
 
 	def plant_seed_at(self, position, plant_type, age=0, watered=False):
 		"""Trồng cây tại vị trí xác định với các thuộc tính đã cho.
@@ -334,72 +376,53 @@ class SoildLayer:
 		# Điều chỉnh position để lấy tile đúng (với bottom của tile)
 		grid_x = position[0] // TILE_SIZE
 		grid_y = (position[1] + default_y_offset) // TILE_SIZE
-		desired_origin = (grid_x * TILE_SIZE, grid_y * TILE_SIZE)
 	
-		# Tìm soil sprite có gốc tile khớp desired_origin
-		target_soil = None
-		for soil_sprite in self.soil_sprites.sprites():
-			if soil_sprite.rect.topleft == desired_origin:
-				target_soil = soil_sprite
-				break
+		# Tìm soil sprite của ô
+		target_soil = self.soil_tiles.get((grid_x, grid_y))
 	
 		if not target_soil:
 			print(f"Không tìm thấy soil sprite cho tile ({grid_x}, {grid_y}).")
 			return False
 	
 		# Kiểm tra marker cày
-		if 'X' not in self.grid[grid_y][grid_x]:
+		if not self.grid.has(grid_x, grid_y, TILLED):
 			print(f"Tile ({grid_x}, {grid_y}) chưa cày, không cho trồng cây.")
 			return False
 	
-		# Xóa cây cũ (nếu có) trong ô này
+		# Xóa cây cũ (nếu có) trong ô này. So theo ô đất của cây: tâm rect của cây cao (đã lớn)
+		# nằm ở ô phía trên nên so theo rect sẽ xóa nhầm cây của ô bên dưới
 		for plant in self.plant_sprites.sprites():
-			if (plant.rect.centerx // TILE_SIZE == grid_x and 
-				plant.rect.centery // TILE_SIZE == grid_y):
+			if plant.soil.rect.topleft == target_soil.rect.topleft:
 				plant.kill()
 	
 		# Đánh dấu ô có cây nếu chưa có
-		if 'P' not in self.grid[grid_y][grid_x]:
-			self.grid[grid_y][grid_x].append('P')
+		self.grid.set(grid_x, grid_y, PLANTED)
 	
 		try:
-			plant = Plant(
+			Plant(
 				plant_type=plant_type,
 				groups=[self.all_sprites, self.plant_sprites, self.collision_sprites],
 				soil=target_soil,
-				check_watered=lambda pos=target_soil.rect.midbottom: self.check_watered(pos)
+				crops=self.crops,
+				age=age
 			)
 		except Exception as e:
 			print(f"Lỗi khi tạo plant {plant_type} tại tile ({grid_x}, {grid_y}): {e}")
 			return False
 	
-		plant.age = age
-		try:
-			plant.image = plant.frames[int(age)]
-		except Exception as e:
-			print(f"Lỗi khi cập nhật hình cho {plant_type} với age {age}: {e}")
-			return False
-	
-		# Định vị lại cây dựa trên gốc của soil sprite
-		exact_pos = target_soil.rect.midbottom
-		plant.rect = plant.image.get_rect(midbottom=exact_pos)
-		plant.rect.y += plant.y_offset
-	
 		if watered:
 			self.water((grid_x * TILE_SIZE, grid_y * TILE_SIZE))
 		return True
 
 	def recreate_water_tiles(self):
 		"""Tái tạo water tile theo grid nếu có marker 'W'"""
-		for row_index, row in enumerate(self.grid):
-			for col_index, cell in enumerate(row):
-				if 'W' in cell:
-					# Xóa water sprite cũ của ô này (nếu có)
-					for sprite in self.water_sprites.sprites():
-						if sprite.rect.x // TILE_SIZE == col_index and sprite.rect.y // TILE_SIZE == row_index:
-							sprite.kill()
-					pos = (col_index * TILE_SIZE, row_index * TILE_SIZE)
-					WaterTile(pos, choice(self.water_surfs), [self.all_sprites, self.water_sprites])
+		for col_index, row_index in self.grid.positions(WATERED):
+			# Xóa water sprite cũ của ô này (nếu có)
+			for sprite in self.water_sprites.sprites():
+				if sprite.rect.x // TILE_SIZE == col_index and sprite.rect.y // TILE_SIZE == row_index:
+					sprite.kill()
+			pos = (col_index * TILE_SIZE, row_index * TILE_SIZE)
+			WaterTile(pos, choice(self.water_surfs), [self.all_sprites, self.water_sprites])
 
 
 
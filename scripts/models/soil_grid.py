@@ -0,0 +1,94 @@
+"""Lưới đất dạng bitflag: mỗi ô là một byte thay cho list marker ('F', 'X', 'W', 'P')"""
+
+FARMABLE = 1  # 'F'
+TILLED = 2    # 'X'
+WATERED = 4   # 'W'
+PLANTED = 8   # 'P'
+
+MARKERS = (('F', FARMABLE), ('X', TILLED), ('W', WATERED), ('P', PLANTED))
+MARKER_FLAGS = dict(MARKERS)
+
+
+def _table(func):
+	"""Bảng dịch 256 byte dùng cho bytearray.translate (xử lý cả lưới ở tốc độ C)"""
+	return bytes(func(value) & 0xFF for value in range(256))
+
+
+CLEAR_WATER_TABLE = _table(lambda value: value & ~WATERED)
+WATER_TILLED_TABLE = _table(lambda value: value | WATERED if value & TILLED else value)
+NEEDS_WATER_TABLE = _table(lambda value: 1 if value & TILLED and not value & WATERED else 0)
+
+
+class SoilGrid:
+	def __init__(self, width, height, cells = None):
+		self.width = width
+		self.height = height
+		self.cells = bytearray(cells) if cells is not None else bytearray(width * height)
+		if len(self.cells) != width * height:
+			raise ValueError(f"Kích thước dữ liệu ({len(self.cells)}) không khớp lưới {width}x{height}")
+
+	def in_bounds(self, x, y):
+		return 0 <= x < self.width and 0 <= y < self.height
+
+	def get(self, x, y):
+		"""Trả về toàn bộ flag của ô, 0 nếu nằm ngoài lưới"""
+		if not self.in_bounds(x, y):
+			return 0
+		return self.cells[y * self.width + x]
+
+	def has(self, x, y, flag):
+		return bool(self.get(x, y) & flag)
+
+	def set(self, x, y, flag):
+		self.cells[y * self.width + x] |= flag
+
+	def clear(self, x, y, flag):
+		self.cells[y * self.width + x] &= ~flag & 0xFF
+
+	def positions(self, flag):
+		"""Duyệt (x, y) của các ô có flag"""
+		width = self.width
+		for index, value in enumerate(self.cells):
+			if value & flag:
+				yield index % width, index // width
+
+	def water_tilled(self):
+		"""Tưới mọi ô đã cày; trả về danh sách (x, y) vừa được tưới"""
+		mask = self.cells.translate(NEEDS_WATER_TABLE)
+		newly_watered = []
+		index = mask.find(1)
+		while index != -1:
+			newly_watered.append((index % self.width, index // self.width))
+			index = mask.find(1, index + 1)
+		if newly_watered:
+			self.cells[:] = self.cells.translate(WATER_TILLED_TABLE)
+		return newly_watered
+
+	def clear_water(self):
+		self.cells[:] = self.cells.translate(CLEAR_WATER_TABLE)
+
+	def copy(self):
+		return SoilGrid(self.width, self.height, self.cells)
+
+	def to_markers(self):
+		"""Chuyển về định dạng cũ: list các hàng, mỗi ô là list marker"""
+		rows = []
+		for y in range(self.height):
+			row = []
+			for value in self.cells[y * self.width:(y + 1) * self.width]:
+				row.append([marker for marker, flag in MARKERS if value & flag])
+			rows.append(row)
+		return rows
+
+	@classmethod
+	def from_markers(cls, rows):
+		"""Đọc lưới từ save cũ (list các hàng chứa list marker).
+		   Giữ nguyên kích thước và tập marker của từng ô; thứ tự marker được chuẩn hóa F, X, W, P."""
+		height = len(rows)
+		width = max((len(row) for row in rows), default = 0)
+		grid = cls(width, height)
+		for y, row in enumerate(rows):
+			for x, cell in enumerate(row):
+				for marker in cell:
+					grid.set(x, y, MARKER_FLAGS[marker])
+		return grid
@@ -2,6 +2,8 @@ import math
 from random import choice, randint
 import pygame
 from settings import *
+from scripts.helpers.spatial_hash import reindex
+from scripts.helpers.assets import assets
 class Generic(pygame.sprite.Sprite):
 	def __init__(self, pos, surf, groups, z = LAYERS['main']):
 		super().__init__(groups)
@@ -9,6 +11,8 @@ class Generic(pygame.sprite.Sprite):
 		self.rect = self.image.get_rect(topleft = pos)
 		self.z = z
 		self.hitbox = self.rect.copy()
+		# super().__init__ đã thêm sprite vào group trước khi có hitbox: đăng ký lại vào SpatialGroup
+		reindex(self)
 	
 class Interaction(Generic):
 	def __init__(self, pos, size, groups, name):
@@ -42,6 +46,7 @@ class WildFlower(Generic):
 	def __init__(self, pos, surf, groups):     
 		super().__init__(pos, surf, groups)
 		self.hitbox = self.rect.copy().inflate(-20, -self.rect.height * 0.9)
+		reindex(self)
 
 class Particle(Generic):
 	def __init__(self, pos, surf, groups, z, duration = 200):
@@ -62,7 +67,7 @@ class Particle(Generic):
 class Apple(Generic):
 	def __init__(self, pos, groups):
 		# Tải hình ảnh và chuyển đổi alpha để tối ưu hiệu suất
-		surf = pygame.image.load(f"{GRAPHICS_PATH}/fruit/apple.png").convert_alpha()
+		surf = assets.image(f"{GRAPHICS_PATH}/fruit/apple.png")
 		super().__init__(pos, surf, groups, LAYERS['fruit'])
 		self.all_sprite = groups[0]
 
@@ -99,6 +104,7 @@ class Tree(pygame.sprite.Sprite):
 		# Hitbox setup
 		self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.6, -self.rect.height * 0.5)
 		self.hitbox.y = self.rect.y + 50
+		reindex(self)
 		
 		# tree attributes
 		self.health = TREE_ATTR[name]['health']
@@ -108,7 +114,7 @@ class Tree(pygame.sprite.Sprite):
 		self.max_health = self.health
 		self.tree_alive = True
 		stump_path = f'{GRAPHICS_PATH}/world/stumps/{"small" if self.name == "Small" else "large"}.png'
-		self.stump_surf = pygame.image.load(stump_path)
+		self.stump_surf = assets.image(stump_path)
 		
 		# Initialize apple attributes
 		self.setup_apple_attributes()  # Add this line to call the setup method
@@ -117,7 +123,7 @@ class Tree(pygame.sprite.Sprite):
 	def setup_apple_attributes(self):
 		"""Thiết lập các thuộc tính liên quan đến táo"""
 		self.apple_sprites = pygame.sprite.Group()
-		self.apple_surf = pygame.image.load(f'{GRAPHICS_PATH}/fruit/apple.png')
+		self.apple_surf = assets.image(f'{GRAPHICS_PATH}/fruit/apple.png')
 		
 		# Thêm thời gian tái sinh táo
 		self.apple_spawn_time = 60  # 60 giây
@@ -217,10 +223,11 @@ class Tree(pygame.sprite.Sprite):
 			# Add back to tree_sprites
 			self.add(self.groups()[1])  # Add back to tree_sprites
 			
-			self.image = pygame.image.load(f'{GRAPHICS_PATH}/objects/tree_{self.name.lower()}.png').convert_alpha()
+			self.image = assets.image(f'{GRAPHICS_PATH}/world/objects/tree_{self.name.lower()}.png')
 			self.rect = self.image.get_rect(midbottom = self.rect.midbottom)
 			self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.6, -self.rect.height * 0.5)
 			self.hitbox.y = self.rect.y + 50
+			reindex(self)
 			self.base_pos = pygame.math.Vector2(self.rect.topleft)
 			
 			# Tạo táo mới khi cây mọc lại
@@ -244,6 +251,41 @@ class Tree(pygame.sprite.Sprite):
 				# Đặt lại hẹn giờ
 				self.apple_timer = self.apple_spawn_time
 	
+	def advance(self, dt_ms):
+		"""Cho thời gian trôi thêm dt_ms (khi ngủ), tính một lần thay vì từng bước.
+		respawn_time tính bằng ms, apple_timer tính bằng giây như trong update()"""
+		if not self.tree_alive:
+			if self.respawn_timer <= 0:
+				return
+			self.respawn_timer -= dt_ms
+			if self.respawn_timer > 0:
+				return
+			# Phần thời gian còn dư sau khi cây mọc lại dùng cho táo
+			dt_ms = -self.respawn_timer
+			self.regrow()
+
+		# Mỗi lần hẹn giờ về 0 thử thêm một táo rồi đặt lại hẹn giờ, dừng khi đủ táo.
+		# Số lần thử tính trước: không quá số lần hẹn giờ về 0, và không quá số chỗ trống
+		# cộng 20 lần đặt hỏng (vị trí trùng táo khác, như giới hạn trong create_fruit)
+		remaining = dt_ms / 1000
+		free = self.health - 1 - len(self.apple_sprites.sprites())
+		if remaining <= 0 or free <= 0:
+			return
+		wait = max(self.apple_timer, 0)
+		if remaining < wait:
+			self.apple_timer -= remaining
+			return
+		remaining -= wait
+		intervals = 1 + int(remaining // self.apple_spawn_time)
+		leftover = remaining - (intervals - 1) * self.apple_spawn_time
+		for _ in range(min(intervals, free + 20)):
+			self.add_random_apple()
+			if len(self.apple_sprites.sprites()) >= self.health - 1:
+				# Đủ táo: hẹn giờ đứng ở giá trị đặt lại như khi chạy từng bước
+				self.apple_timer = self.apple_spawn_time
+				return
+		self.apple_timer = self.apple_spawn_time - leftover
+
 	def die(self):
 		"""Xử lý khi cây chết"""
 		if self.tree_alive:
@@ -263,6 +305,7 @@ class Tree(pygame.sprite.Sprite):
 				self.hitbox = self.rect.copy().inflate(-self.rect.width * 0.58, -self.rect.height * 0.7)
 				self.hitbox.x = self.rect.x + 21
 				self.hitbox.y = self.rect.y + 70
+			reindex(self)
 
 			self.image = self.stump_surf
 			stump_rect = self.image.get_rect()
@@ -364,7 +407,7 @@ class Tree(pygame.sprite.Sprite):
 					apples_created += 1
 
 	def plant_tree_at(position, num_apple, health, groups, tree_name, player_add):
-		tree_image = pygame.image.load(f"{GRAPHICS_PATH}/world/objects/tree_{tree_name.lower()}.png").convert_alpha()
+		tree_image = assets.image(f"{GRAPHICS_PATH}/world/objects/tree_{tree_name.lower()}.png")
 		tree = Tree(
 			pos=position,
 			surf=tree_image,
@@ -0,0 +1,181 @@
+"""Mô phỏng thế giới không cửa sổ, không âm thanh (soak test kinh tế/tăng trưởng, benchmark, CI).
+
+    python -m scripts.simulate [--days 1000] [--plots 200] [--ticks 0] [--seed 0] [--rain] [--player simulation]
+
+Mỗi ngày: chạy --ticks bước Level.update (đo vòng lặp từng frame), tưới mọi ô đã cày, tua cả ngày
+bằng Level.advance (chi phí không phụ thuộc độ dài ngày), thu hoạch cây chín rồi trồng lại mọi ô trống.
+Kết quả tất định theo --seed: random được seed trước khi dựng Level, thời tiết khô trừ khi có --rain,
+cây và timer chạy theo đồng hồ game (không phụ thuộc thời gian chạy thật). --verify chạy hai lần
+cùng seed và báo lỗi nếu kết quả khác nhau.
+Dữ liệu player chỉ được đọc: WriteBehindQueue bỏ mọi lần ghi (inventory, nhiệm vụ).
+"""
+import os
+
+# Phải đặt trước khi import settings (settings quyết định driver SDL và mixer lúc import)
+os.environ.setdefault('SPROUT_HEADLESS', '1')
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+
+import pygame
+
+from settings import *
+from scripts.db.item_db import ItemCatalog
+from scripts.db.write_behind import WriteBehindQueue
+from scripts.helpers.timer import scheduler
+from scripts.level import Level
+from scripts.models.mission import MissionManager
+from scripts.models.soil_grid import FARMABLE, PLANTED, TILLED
+
+
+class Farmer:
+    """Chính sách chơi đơn giản, tất định: cày plots ô đầu tiên, trồng lần lượt các loại cây"""
+    def __init__(self, level, plots, crop_types=tuple(GROW_SPEED)):
+        self.level = level
+        self.soil_layer = level.soil_layer
+        self.crop_types = crop_types
+        self.harvested = Counter()
+        self.planted = 0
+
+        self.positions = list(self.soil_layer.grid.positions(FARMABLE))[:plots]
+        for x, y in self.positions:
+            self.soil_layer.grid.set(x, y, TILLED)
+        self.soil_layer.create_soil_tiles()
+        self.replant()
+
+    def replant(self):
+        """Trồng lại mọi ô trống (vừa thu hoạch hoặc cây đã chết), mỗi ô luôn cùng một loại cây"""
+        grid = self.soil_layer.grid
+        for index, (x, y) in enumerate(self.positions):
+            if grid.has(x, y, PLANTED):
+                continue
+            if not grid.has(x, y, TILLED):
+                grid.set(x, y, TILLED)
+                self.soil_layer.refresh_soil_tiles(x, y)
+            self.plant(x, y, self.crop_types[index % len(self.crop_types)])
+
+    def plant(self, x, y, plant_type):
+        if self.soil_layer.plant_seed_at((x * TILE_SIZE, y * TILE_SIZE), plant_type):
+            self.planted += 1
+
+    def water(self):
+        # Chỉ đổi grid: không cần sprite nước khi không vẽ.
+        # Gọi ngay trước advance: mưa tạnh trong lúc update sẽ xóa nước đã tưới
+        self.soil_layer.grid.water_tilled()
+
+    def harvest(self):
+        mission_manager = self.level.player.mission_manager
+        for plant in self.soil_layer.plant_sprites.sprites():
+            if not plant.harvestable:
+                continue
+            x, y = plant.soil.rect.x // TILE_SIZE, plant.soil.rect.y // TILE_SIZE
+            name = plant.plant_type.replace(' seeds', '')
+            self.harvested[name] += 1
+            if mission_manager:
+                mission_manager.update_missions_by_action('harvest', name, 1)
+            plant.kill()
+            self.soil_layer.grid.clear(x, y, PLANTED)
+        self.replant()
+
+    def harvest_value(self):
+        """Tổng giá bán của số cây đã thu hoạch theo bảng giá hiện tại"""
+        catalog = ItemCatalog.get_instance()
+        total = 0
+        for name, count in self.harvested.items():
+            item = catalog.get_by_name(name)
+            price = catalog.price(item.item_id, 'sell') if item else None
+            total += (price or 0) * count
+        return total
+
+
+def build_world(player_id, seed=0, rain=False):
+    """Level, Player, MissionManager như lúc vào game nhưng không cần màn hình/âm thanh, không ghi DB"""
+    # Phải trước khi tạo Player: InventoryWriter/MissionManager gửi job ghi ngay khi khởi tạo
+    WriteBehindQueue.get_instance().discard()
+    random.seed(seed)
+    level = Level(player_id)
+    if not rain:
+        # Thời tiết khô cố định; mưa chỉ bật khi được yêu cầu
+        level.raining = False
+        level.soil_layer.raining = False
+        level.rain_chance = 0
+    mission_manager = MissionManager(player_id=level.player.player_id, player=level.player)
+    mission_manager.load_player_missions()
+    level.player.mission_manager = mission_manager
+    return level
+
+
+def simulate(level, days, plots, ticks=0):
+    farmer = Farmer(level, plots)
+    step = 1.0 / SIM_FPS
+    day_ms = level.sky.day_length
+    started = time.perf_counter()
+    for _ in range(days):
+        for _ in range(ticks):
+            level.update(step)
+        farmer.water()
+        level.advance(day_ms)
+        level.sky.update_time(day_ms / 1000)
+        farmer.harvest()
+    elapsed = time.perf_counter() - started
+
+    missions = level.player.mission_manager.missions.values()
+    return {
+        'days': days,
+        'seconds': round(elapsed, 3),
+        'days_per_second': round(days / elapsed, 1) if elapsed else None,
+        'planted': farmer.planted,
+        'harvested': dict(farmer.harvested),
+        'harvest_value': farmer.harvest_value(),
+        'crops': level.soil_layer.crops.stats(),
+        'trees_alive': sum(tree.tree_alive for tree in level.tree_sprites),
+        'missions_completed': sum(mission.status == 'completed' for mission in missions),
+        'scheduler': scheduler.stats(),
+        'writes_discarded': WriteBehindQueue.get_instance().stats()['discarded'],
+    }
+
+
+# Số liệu phụ thuộc thời gian chạy thật hoặc trạng thái dùng chung của process, không so khi --verify
+RUN_DEPENDENT = ('seconds', 'days_per_second', 'scheduler', 'writes_discarded')
+
+
+def deterministic_part(report):
+    return {key: value for key, value in report.items() if key not in RUN_DEPENDENT}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--plots', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=0, help='số bước Level.update mỗi ngày')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rain', action='store_true', help='giữ thời tiết ngẫu nhiên của game (theo --seed)')
+    parser.add_argument('--player', default='simulation')
+    parser.add_argument('--verify', action='store_true', help='chạy lại cùng seed và so sánh kết quả')
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    level = build_world(args.player, args.seed, args.rain)
+    report = simulate(level, args.days, args.plots, args.ticks)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+    if args.verify:
+        level.cleanup()
+        level = build_world(args.player, args.seed, args.rain)
+        rerun = simulate(level, args.days, args.plots, args.ticks)
+        expected, actual = deterministic_part(report), deterministic_part(rerun)
+        if expected != actual:
+            for key in expected:
+                if expected[key] != actual.get(key):
+                    print(f"verify: {key} khác nhau: {expected[key]} != {actual.get(key)}")
+            return 1
+        print("verify: hai lần chạy cùng seed cho kết quả giống nhau")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,7 @@
 import pygame
 
 from scripts.helpers.timer import Timer
+from scripts.helpers.assets import assets
 from settings import *
 
 class Button:
@@ -16,7 +17,7 @@ class Button:
         self.hovered = False
         self.clicked = False
         self.was_pressed = False
-        self.timer = Timer(200)
+        self.timer = Timer(200, clock='wall')
         # Lưu sprite pressed nếu có, nếu không, đặt None
         if pressed_image:
             self.pressed_image = pygame.transform.scale(pressed_image, (int(pressed_image.get_width() * scale), int(pressed_image.get_height() * scale)))
@@ -26,13 +27,12 @@ class Button:
         # Nếu có text
         self.text = text
         if text:
-            self.font = pygame.font.Font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
+            self.font = assets.font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
             self.text_color = text_color if text_color else 'Black'
             self.text_surf = self.font.render(text, True, self.text_color)
             self.text_rect = self.text_surf.get_rect(center=self.rect.center)
 
     def update(self, mouse_pos):
-        self.timer.update()
         old_hovered = self.hovered
         self.hovered = self.rect.collidepoint(mouse_pos)
         
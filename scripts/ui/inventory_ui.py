@@ -1,5 +1,5 @@
 import pygame
-from scripts.db.inventory_db import InventoryDatabase
+from scripts.helpers.assets import assets
 from settings import *
 
 class InventoryUI:
@@ -8,8 +8,8 @@ class InventoryUI:
         self.display_surface = pygame.display.get_surface()
         
         # Tải font đẹp hơn
-        self.title_font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 30)
-        self.font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 15)
+        self.title_font = assets.font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
+        self.font = assets.font(f'{FONT_PATH}/LycheeSoda.ttf', 15)
         
         # Thiết lập UI
         self.padding = 20
@@ -41,14 +41,14 @@ class InventoryUI:
         # Tải tài nguyên
         try:
             # Tải các hình ảnh của slot với các trạng thái khác nhau
-            self.slot_surface = pygame.image.load(f'{GRAPHICS_PATH}/ui/inventory/slot.png').convert_alpha()
-            self.slot_hover = pygame.image.load(f'{GRAPHICS_PATH}/ui/inventory/slot_hover.png').convert_alpha()
-            self.slot_selected = pygame.image.load(f'{GRAPHICS_PATH}/ui/inventory/slot_selected.png').convert_alpha()
+            self.slot_surface = assets.image(f'{GRAPHICS_PATH}/ui/inventory/slot.png')
+            self.slot_hover = assets.image(f'{GRAPHICS_PATH}/ui/inventory/slot_hover.png')
+            self.slot_selected = assets.image(f'{GRAPHICS_PATH}/ui/inventory/slot_selected.png')
             
             # Tải hình ảnh cho hotbar slot (hoặc sử dụng hình ảnh đặc biệt nếu có)
             try:
-                self.hotbar_slot_surface = pygame.image.load(f'{GRAPHICS_PATH}/ui/inventory/hotbar_slot.png').convert_alpha()
-                self.hotbar_slot_hover = pygame.image.load(f'{GRAPHICS_PATH}/ui/inventory/hotbar_slot_hover.png').convert_alpha()
+                self.hotbar_slot_surface = assets.image(f'{GRAPHICS_PATH}/ui/inventory/hotbar_slot.png')
+                self.hotbar_slot_hover = assets.image(f'{GRAPHICS_PATH}/ui/inventory/hotbar_slot_hover.png')
             except FileNotFoundError:
                 # Nếu không có ảnh riêng, tạo các phiên bản màu khác của slot thông thường
                 self.hotbar_slot_surface = self._generate_slot_image((80, 80, 120))  # Màu xanh dương nhạt
@@ -70,7 +70,7 @@ class InventoryUI:
         
         # Tải ảnh nền inventory
         try:
-            self.bg_image = pygame.image.load(f'{GRAPHICS_PATH}/ui/inventory/inventory_bg.png').convert_alpha()
+            self.bg_image = assets.image(f'{GRAPHICS_PATH}/ui/inventory/inventory_bg.png')
             self.bg_image = pygame.transform.scale(self.bg_image, (self.width, self.height))
         except FileNotFoundError:
             self.bg_image = None
@@ -88,6 +88,12 @@ class InventoryUI:
         self.show_tooltip = False
         self.tooltip_item = None
         self.tooltip_timer = 0
+
+        # Cache vẽ: icon theo (item_name, size), tooltip và panel tĩnh
+        self.icon_cache = {}
+        self.tooltip_cache = {}
+        self.panel_surface = None
+        self.panel_cache_state = None
         
         # Đồng bộ với hotbar khi mở inventory lần đầu
         self.sync_with_hotbar()
@@ -128,6 +134,7 @@ class InventoryUI:
                         if j >= self.hotbar_slots:
                             self.player.inventory.items[i], self.player.inventory.items[j] = \
                             self.player.inventory.items[j], self.player.inventory.items[i]
+                            self.player.inventory.notify_changed()
                         break
         
     def toggle(self):
@@ -139,8 +146,8 @@ class InventoryUI:
             # Đồng bộ với hotbar khi mở inventory
             self.sync_with_hotbar()
         else:
-            # Khi đóng inventory, đồng bộ các vật phẩm trong 3 slot đầu với hotbar
-            InventoryDatabase.save_inventory(self.player.player_id, self.player.inventory)
+            # Khi đóng inventory, ghi nền inventory (không chặn frame)
+            self.player.save_inventory()
             
     def get_slot_at_pos(self, pos):
         """Xác định vị trí slot dựa trên tọa độ chuột"""
@@ -221,6 +228,7 @@ class InventoryUI:
                     if self.dragged_origin != target_slot:
                         self.player.inventory.items[self.dragged_origin], self.player.inventory.items[target_slot] = \
                         self.player.inventory.items[target_slot], self.player.inventory.items[self.dragged_origin]
+                        self.player.inventory.notify_changed()
 
                 
                 # Reset trạng thái kéo thả
@@ -287,6 +295,7 @@ class InventoryUI:
                     if self.dragged_origin != target_slot:
                         self.player.inventory.items[self.dragged_origin], self.player.inventory.items[target_slot] = \
                         self.player.inventory.items[target_slot], self.player.inventory.items[self.dragged_origin]
+                        self.player.inventory.notify_changed()
 
                 
                 self.dragging = False
@@ -301,231 +310,242 @@ class InventoryUI:
             if self.animation_time > 0.8:
                 self.animation_time = 0
     
-    def draw_tooltip(self, item, pos):
-        """Vẽ tooltip hiển thị thông tin chi tiết về item"""
-        if not item:
-            return
-            
-        # Chuẩn bị thông tin
-        name = item.item_name.replace('_', ' ').title()
-        description = getattr(item, 'item_description', "Một vật phẩm trong game")
+    def get_icon(self, item_name, size, shadow=False):
+        """Icon của item theo kích thước (có thể kèm bóng đổ), cache theo (item_name, size)"""
+        key = (item_name, size, shadow)
+        icon = self.icon_cache.get(key)
+        if icon is None:
+            icon = assets.scaled(f'{GRAPHICS_PATH}/items/{item_name}.png', (size, size))
+            if shadow:
+                shadow_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+                shadow_surface.blit(icon, (0, 0))
+                shadow_surface.fill((0, 0, 0, 100), None, pygame.BLEND_RGBA_MULT)
+                icon = shadow_surface
+            self.icon_cache[key] = icon
+        return icon
+
+    def invalidate_icons(self, item_names):
+        """Chỉ bỏ icon của các item không còn trong inventory"""
+        for key in [key for key in self.icon_cache if key[0] not in item_names]:
+            del self.icon_cache[key]
+
+    def draw_quantity_badge(self, surface, x, y, size, quantity, hotbar):
+        """Vẽ số lượng trong bong bóng ở góc dưới phải của ô (x, y, size)"""
+        quantity_text = self.font.render(str(quantity), True, (255, 255, 255))
+        text_width = quantity_text.get_width()
+        text_height = quantity_text.get_height()
         
-        # Vẽ nền tooltip
-        name_surf = self.font.render(name, True, (255, 255, 255))
-        desc_surf = self.font.render(description, True, (220, 220, 220))
+        # Vẽ nền tròn cho số lượng
+        bubble_radius = max(text_width, text_height) // 2 + 5
+        bubble_x = x + size - bubble_radius - 2
+        bubble_y = y + size - bubble_radius - 2
         
-        width = max(name_surf.get_width(), desc_surf.get_width()) + 20
-        height = name_surf.get_height() + desc_surf.get_height() + 25
+        # Vẽ bóng đổ
+        pygame.draw.circle(surface, (0, 0, 0, 150), 
+                        (bubble_x + 2, bubble_y + 2), bubble_radius)
         
-        # Định vị tooltip để không ra ngoài màn hình
-        tooltip_x = min(pos[0] + 15, SCREEN_WIDTH - width - 5)
-        tooltip_y = min(pos[1] - 10, SCREEN_HEIGHT - height - 5)
+        # Vẽ nền chính - màu khác nhau cho các loại slot
+        if hotbar:
+            bubble_color = (80, 80, 180)  # Màu xanh dương cho hotbar
+            bubble_border = (120, 120, 220)
+        else:
+            bubble_color = (60, 60, 180)  # Màu mặc định
+            bubble_border = (100, 100, 220)
         
-        # Vẽ nền
-        tooltip_surf = pygame.Surface((width, height), pygame.SRCALPHA)
-        tooltip_surf.fill((40, 40, 40, 230))
-        pygame.draw.rect(tooltip_surf, (100, 100, 100, 255), tooltip_surf.get_rect(), 1, border_radius=5)
+        pygame.draw.circle(surface, bubble_color, 
+                        (bubble_x, bubble_y), bubble_radius)
         
-        # Vẽ văn bản
-        tooltip_surf.blit(name_surf, (10, 8))
-        pygame.draw.line(tooltip_surf, (150, 150, 150, 150), (10, name_surf.get_height() + 10), 
-                        (width - 10, name_surf.get_height() + 10), 1)
-        tooltip_surf.blit(desc_surf, (10, name_surf.get_height() + 15))
+        # Vẽ viền
+        pygame.draw.circle(surface, bubble_border, 
+                        (bubble_x, bubble_y), bubble_radius, 2)
         
-        # Hiển thị tooltip
-        self.display_surface.blit(tooltip_surf, (tooltip_x, tooltip_y))
-    
-    def draw(self):
-        """Vẽ inventory UI"""
-        if not self.active:
-            return
-        # Tính toán hiệu ứng mở
-        if self.opening:
-            scale = self.open_progress
-            target_width = self.width * scale
-            target_height = self.height * scale
-            target_x = self.x + (self.width - target_width) / 2
-            target_y = self.y + (self.height - target_height) / 2
-        else:
-            target_width = self.width
-            target_height = self.height
-            target_x = self.x
-            target_y = self.y
-            
-        # Vẽ nền
+        # Vẽ số lượng
+        surface.blit(quantity_text, (bubble_x - text_width // 2, bubble_y - text_height // 2))
+
+    def slot_position(self, index):
+        """Tọa độ góc trên trái của slot, tương đối với góc inventory"""
+        row = index // self.cols
+        col = index % self.cols
+        return (self.padding + col * (self.slot_size + self.gap),
+                self.padding + 50 + row * (self.slot_size + self.gap))  # +50 cho tiêu đề
+
+    def draw_slot_item(self, surface, item, x, y, hotbar):
+        try:
+            surface.blit(self.get_icon(item.item_name, self.slot_size - 16), (x + 8, y + 8))
+            if item.quantity > 1:
+                self.draw_quantity_badge(surface, x, y, self.slot_size, item.quantity, hotbar)
+        except FileNotFoundError:
+            print(f"Cảnh báo: Không tìm thấy hình ảnh cho vật phẩm {item.item_name}")
+
+    def render_background(self, width, height, show_title=True):
         if self.bg_image:
             # Sử dụng ảnh nền tùy chỉnh nếu có
-            scaled_bg = pygame.transform.scale(self.bg_image, (int(target_width), int(target_height)))
-            self.display_surface.blit(scaled_bg, (target_x, target_y))
-        else:
-            # Tạo nền gradient nếu không có ảnh
-            background = pygame.Surface((int(target_width), int(target_height)), pygame.SRCALPHA)
-            
-            # Tạo gradient từ trên xuống
-            for y in range(int(target_height)):
-                alpha = 240  # Độ trong suốt
-                r = int(70 - y/target_height * 20)  # Gradient từ đậm đến nhạt
-                g = int(70 - y/target_height * 10)
-                b = int(80 - y/target_height * 10)
-                pygame.draw.line(background, (r, g, b, alpha), 
-                               (0, y), (target_width, y))
-            
-            # Vẽ viền và các chi tiết
-            pygame.draw.rect(background, (50, 50, 60, 255), background.get_rect(), 3, border_radius=10)
-            pygame.draw.rect(background, (30, 30, 40, 255), background.get_rect().inflate(-6, -6), 2, border_radius=8)
-            
-            # Vẽ tiêu đề
-            if not self.opening or (self.opening and self.open_progress > 0.7):
-                title = self.title_font.render("Inventory", True, (255, 230, 180))
-                background.blit(title, (target_width//2 - title.get_width()//2, 15))
-                
+            return pygame.transform.scale(self.bg_image, (width, height))
 
-            self.display_surface.blit(background, (target_x, target_y))
+        # Tạo nền gradient nếu không có ảnh
+        background = pygame.Surface((width, height), pygame.SRCALPHA)
         
-        # Không vẽ slot nếu đang mở
-        if self.opening and self.open_progress < 0.8:
-            return
-            
-        # Vẽ các slot và item
-        mouse_pos = pygame.mouse.get_pos()
+        # Tạo gradient từ trên xuống
+        for y in range(height):
+            alpha = 240  # Độ trong suốt
+            r = int(70 - y/height * 20)  # Gradient từ đậm đến nhạt
+            g = int(70 - y/height * 10)
+            b = int(80 - y/height * 10)
+            pygame.draw.line(background, (r, g, b, alpha), 
+                           (0, y), (width, y))
+        
+        # Vẽ viền và các chi tiết
+        pygame.draw.rect(background, (50, 50, 60, 255), background.get_rect(), 3, border_radius=10)
+        pygame.draw.rect(background, (30, 30, 40, 255), background.get_rect().inflate(-6, -6), 2, border_radius=8)
+        
+        # Vẽ tiêu đề
+        if show_title:
+            title = self.title_font.render("Inventory", True, (255, 230, 180))
+            background.blit(title, (width//2 - title.get_width()//2, 15))
+        return background
+
+    def panel_state(self):
+        """Những gì quyết định nội dung panel; panel chỉ vẽ lại khi giá trị này đổi"""
+        items = tuple((item.item_name, item.quantity) if item is not None else None
+                      for item in self.player.inventory.items[:self.rows * self.cols])
+        hidden_slot = self.dragged_origin if self.dragging else None
+        return items, self.hovered_slot, hidden_slot
+
+    def render_panel(self, state):
+        """Vẽ nền, các slot, icon và số lượng vào một surface duy nhất"""
+        items, hovered_slot, hidden_slot = state
+        self.invalidate_icons({item[0] for item in items if item is not None})
+
+        panel = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        panel.blit(self.render_background(self.width, self.height), (0, 0))
+
         for i in range(self.rows * self.cols):
-            row = i // self.cols
-            col = i % self.cols
-            x = self.x + self.padding + col * (self.slot_size + self.gap)
-            y = self.y + self.padding + 50 + row * (self.slot_size + self.gap)  # +50 cho tiêu đề
+            x, y = self.slot_position(i)
             
             # Xác định loại slot (thông thường hay hotbar)
             is_hotbar_slot = self.is_hotbar_slot(i)
             
             # Chọn bề mặt slot dựa trên trạng thái và loại
-            if i == self.hovered_slot:
-                # Slot được hover
+            if i == hovered_slot:
                 slot_img = self.hotbar_slot_hover if is_hotbar_slot else self.slot_hover
-            elif self.dragging and i == self.get_nearest_slot(mouse_pos):
-                # Slot gần nhất khi đang kéo
-                slot_img = self.slot_selected
             else:
-                # Slot thông thường
                 slot_img = self.hotbar_slot_surface if is_hotbar_slot else self.slot_surface
-            
-            # Hiệu ứng nhấp nháy cho slot đích khi kéo thả
-            if self.dragging and i == self.get_nearest_slot(mouse_pos):
-                if (self.animation_time < 0.4):  # Nhấp nháy trong nửa đầu chu kỳ
-                    self.display_surface.blit(slot_img, (x, y))
-                    # Vẽ hiệu ứng phát sáng xung quanh slot
-                    highlight_rect = pygame.Rect(x - 3, y - 3, self.slot_size + 6, self.slot_size + 6)
-                    brightness = int(200 + 55 * (0.4 - self.animation_time) / 0.4)  # Từ 200-255 và ngược lại
-                    
-                    # Màu khác cho hotbar slot
-                    highlight_color = (brightness, brightness, 100) if not is_hotbar_slot else (100, 100, brightness)
-                    pygame.draw.rect(self.display_surface, highlight_color, 
-                                  highlight_rect, 3, border_radius=6)
-            else:
-                self.display_surface.blit(slot_img, (x, y))
+            panel.blit(slot_img, (x, y))
             
             # Vẽ item nếu có
-            if i < len(self.player.inventory.items):
+            if i < len(self.player.inventory.items) and i != hidden_slot:
                 item = self.player.inventory.items[i]
-                if item is not None and (not self.dragging or i != self.dragged_origin):
-                    try:
-                        item_surface = pygame.image.load(f'{GRAPHICS_PATH}/items/{item.item_name}.png').convert_alpha()
-                        item_surface = pygame.transform.scale(item_surface, (self.slot_size - 16, self.slot_size - 16))
-                        self.display_surface.blit(item_surface, (x + 8, y + 8))
-                        
-                        # Vẽ số lượng với hiệu ứng đẹp hơn
-                        if item.quantity > 1:
-                            # Tạo nền cho số lượng
-                            quantity_text = self.font.render(str(item.quantity), True, (255, 255, 255))
-                            text_width = quantity_text.get_width()
-                            text_height = quantity_text.get_height()
-                            
-                            # Vẽ nền tròn cho số lượng
-                            bubble_radius = max(text_width, text_height) // 2 + 5
-                            bubble_x = x + self.slot_size - bubble_radius - 2
-                            bubble_y = y + self.slot_size - bubble_radius - 2
-                            
-                            # Vẽ bóng đổ
-                            pygame.draw.circle(self.display_surface, (0, 0, 0, 150), 
-                                            (bubble_x + 2, bubble_y + 2), bubble_radius)
-                            
-                            # Vẽ nền chính - màu khác nhau cho các loại slot
-                            if is_hotbar_slot:
-                                bubble_color = (80, 80, 180)  # Màu xanh dương cho hotbar
-                                bubble_border = (120, 120, 220)
-                            else:
-                                bubble_color = (60, 60, 180)  # Màu mặc định
-                                bubble_border = (100, 100, 220)
-                            
-                            pygame.draw.circle(self.display_surface, bubble_color, 
-                                            (bubble_x, bubble_y), bubble_radius)
-                            
-                            # Vẽ viền
-                            pygame.draw.circle(self.display_surface, bubble_border, 
-                                            (bubble_x, bubble_y), bubble_radius, 2)
-                            
-                            # Vẽ số lượng
-                            text_x = bubble_x - text_width // 2
-                            text_y = bubble_y - text_height // 2
-                            self.display_surface.blit(quantity_text, (text_x, text_y))
-                    except FileNotFoundError:
-                        print(f"Cảnh báo: Không tìm thấy hình ảnh cho vật phẩm {item.item_name}")
+                if item is not None:
+                    self.draw_slot_item(panel, item, x, y, is_hotbar_slot)
+        return panel
+
+    def get_tooltip(self, item):
+        name = item.item_name.replace('_', ' ').title()
+        description = getattr(item, 'item_description', "Một vật phẩm trong game")
+        key = (name, description)
+        tooltip_surf = self.tooltip_cache.get(key)
+        if tooltip_surf is None:
+            name_surf = self.font.render(name, True, (255, 255, 255))
+            desc_surf = self.font.render(description, True, (220, 220, 220))
+            
+            width = max(name_surf.get_width(), desc_surf.get_width()) + 20
+            height = name_surf.get_height() + desc_surf.get_height() + 25
+            
+            # Vẽ nền
+            tooltip_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+            tooltip_surf.fill((40, 40, 40, 230))
+            pygame.draw.rect(tooltip_surf, (100, 100, 100, 255), tooltip_surf.get_rect(), 1, border_radius=5)
+            
+            # Vẽ văn bản
+            tooltip_surf.blit(name_surf, (10, 8))
+            pygame.draw.line(tooltip_surf, (150, 150, 150, 150), (10, name_surf.get_height() + 10), 
+                            (width - 10, name_surf.get_height() + 10), 1)
+            tooltip_surf.blit(desc_surf, (10, name_surf.get_height() + 15))
+            self.tooltip_cache[key] = tooltip_surf
+        return tooltip_surf
+
+    def draw_tooltip(self, item, pos):
+        """Vẽ tooltip hiển thị thông tin chi tiết về item"""
+        if not item:
+            return
+        tooltip_surf = self.get_tooltip(item)
+        
+        # Định vị tooltip để không ra ngoài màn hình
+        tooltip_x = min(pos[0] + 15, SCREEN_WIDTH - tooltip_surf.get_width() - 5)
+        tooltip_y = min(pos[1] - 10, SCREEN_HEIGHT - tooltip_surf.get_height() - 5)
+        self.display_surface.blit(tooltip_surf, (tooltip_x, tooltip_y))
+    
+    def draw(self):
+        """Vẽ inventory UI"""
+        if not self.active:
+            return
+
+        # Hiệu ứng mở: chỉ vẽ nền thu phóng
+        if self.opening and self.open_progress < 0.8:
+            target_width = int(self.width * self.open_progress)
+            target_height = int(self.height * self.open_progress)
+            if target_width > 0 and target_height > 0:
+                target_x = self.x + (self.width - target_width) / 2
+                target_y = self.y + (self.height - target_height) / 2
+                background = self.render_background(target_width, target_height, self.open_progress > 0.7)
+                self.display_surface.blit(background, (target_x, target_y))
+            return
+
+        # Panel tĩnh (nền, slot, icon, số lượng) chỉ vẽ lại khi inventory/hover/kéo thay đổi
+        state = self.panel_state()
+        if self.panel_surface is None or state != self.panel_cache_state:
+            self.panel_surface = self.render_panel(state)
+            self.panel_cache_state = state
+        self.display_surface.blit(self.panel_surface, (self.x, self.y))
+
+        mouse_pos = pygame.mouse.get_pos()
+
+        # Hiệu ứng nhấp nháy cho slot đích khi kéo thả
+        if self.dragging:
+            target_slot = self.get_nearest_slot(mouse_pos)
+            if target_slot is not None and self.animation_time < 0.4:  # Nhấp nháy trong nửa đầu chu kỳ
+                slot_x, slot_y = self.slot_position(target_slot)
+                x, y = self.x + slot_x, self.y + slot_y
+                is_hotbar_slot = self.is_hotbar_slot(target_slot)
+                slot_img = self.slot_selected if target_slot != self.hovered_slot else (self.hotbar_slot_hover if is_hotbar_slot else self.slot_hover)
+                self.display_surface.blit(slot_img, (x, y))
+                if target_slot < len(self.player.inventory.items) and target_slot != self.dragged_origin:
+                    item = self.player.inventory.items[target_slot]
+                    if item is not None:
+                        self.draw_slot_item(self.display_surface, item, x, y, is_hotbar_slot)
+
+                # Vẽ hiệu ứng phát sáng xung quanh slot
+                highlight_rect = pygame.Rect(x - 3, y - 3, self.slot_size + 6, self.slot_size + 6)
+                brightness = int(200 + 55 * (0.4 - self.animation_time) / 0.4)  # Từ 200-255 và ngược lại
+                
+                # Màu khác cho hotbar slot
+                highlight_color = (brightness, brightness, 100) if not is_hotbar_slot else (100, 100, brightness)
+                pygame.draw.rect(self.display_surface, highlight_color, 
+                              highlight_rect, 3, border_radius=6)
         
         # Vẽ item đang kéo
         if self.dragging and self.dragged_item:
             try:
                 # Điều chỉnh kích thước dựa trên hiệu ứng phóng to
                 drag_size = int((self.slot_size - 16) * self.drag_scale)
-                item_surface = pygame.image.load(f'{GRAPHICS_PATH}/items/{self.dragged_item.item_name}.png').convert_alpha()
-                item_surface = pygame.transform.scale(item_surface, (drag_size, drag_size))
                 
                 # Tính vị trí giữa mục và thêm độ lệch từ lúc bắt đầu kéo
                 center_offset = drag_size // 2
                 x = mouse_pos[0] - center_offset - (self.drag_offset[0] if self.drag_offset else 0)
                 y = mouse_pos[1] - center_offset - (self.drag_offset[1] if self.drag_offset else 0)
                 
-                # Vẽ bóng đổ cho item đang kéo
-                shadow_surface = pygame.Surface((drag_size, drag_size), pygame.SRCALPHA)
-                shadow_surface.blit(item_surface, (0, 0))
-                shadow_surface.fill((0, 0, 0, 100), None, pygame.BLEND_RGBA_MULT)
-                self.display_surface.blit(shadow_surface, (x + 4, y + 4))
-                
-                # Vẽ item đang kéo
-                self.display_surface.blit(item_surface, (x, y))
+                # Vẽ bóng đổ và item đang kéo
+                self.display_surface.blit(self.get_icon(self.dragged_item.item_name, drag_size, shadow=True), (x + 4, y + 4))
+                self.display_surface.blit(self.get_icon(self.dragged_item.item_name, drag_size), (x, y))
                 
                 # Vẽ số lượng nếu > 1
                 if self.dragged_item.quantity > 1:
-                    # Tạo nền cho số lượng
-                    quantity_text = self.font.render(str(self.dragged_item.quantity), True, (255, 255, 255))
-                    text_width = quantity_text.get_width()
-                    text_height = quantity_text.get_height()
-                    
-                    # Vẽ nền tròn cho số lượng
-                    bubble_radius = max(text_width, text_height) // 2 + 5
-                    bubble_x = x + drag_size - bubble_radius + 5
-                    bubble_y = y + drag_size - bubble_radius + 5
-                    
-                    # Vẽ bóng đổ
-                    pygame.draw.circle(self.display_surface, (0, 0, 0, 150), 
-                                    (bubble_x + 2, bubble_y + 2), bubble_radius)
-                    
-                    # Vẽ nền chính
-                    bubble_color = (80, 80, 180) if self.is_hotbar_slot(self.dragged_origin) else (60, 60, 180)
-                    pygame.draw.circle(self.display_surface, bubble_color, 
-                                     (bubble_x, bubble_y), bubble_radius)
-                    
-                    # Vẽ viền
-                    bubble_border = (120, 120, 220) if self.is_hotbar_slot(self.dragged_origin) else (100, 100, 220)
-                    pygame.draw.circle(self.display_surface, bubble_border, 
-                                     (bubble_x, bubble_y), bubble_radius, 2)
-                    
-                    # Vẽ số lượng
-                    text_x = bubble_x - text_width // 2
-                    text_y = bubble_y - text_height // 2
-                    self.display_surface.blit(quantity_text, (text_x, text_y))
+                    self.draw_quantity_badge(self.display_surface, x + 7, y + 7, drag_size,
+                                             self.dragged_item.quantity, self.is_hotbar_slot(self.dragged_origin))
                     
             except FileNotFoundError:
                 print(f"Cảnh báo: Không tìm thấy hình ảnh cho vật phẩm đang kéo {self.dragged_item.item_name}")
 
         # Vẽ tooltip
         if self.show_tooltip:
-            self.draw_tooltip(self.tooltip_item, mouse_pos)
\ No newline at end of file
+            self.draw_tooltip(self.tooltip_item, mouse_pos)
@@ -3,10 +3,11 @@ import pygame
 import pygame.locals
 from scripts.db.item_db import ItemDatabase, Item 
 from scripts.helpers.support import import_folder
+from scripts.helpers.assets import assets
+from scripts.helpers.text import text_renderer
 from scripts.ui.button import Button
 from settings import *
 from scripts.helpers.timer import Timer
-from scripts.db.settings_db import SettingsDB
 from scripts.db.player_db import PlayerDatabase
 import copy
 from settings import set_global_volume  # existing imports
@@ -19,9 +20,9 @@ small_button_path = f"{GRAPHICS_PATH}/ui/button/22x24"
 class MainMenu:
 	def __init__(self, screen):
 		self.screen = screen
-		self.font = pygame.font.Font(f'{FONT_PATH}/LycheeSoda.ttf', 50)
+		assets.preload(ASSET_MANIFEST['menu'])
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 50)
 
-		set_global_volume(global_volume)
 		self.running = True
 
 		self.bg_images = import_folder(f'{GRAPHICS_PATH}/ui/main_menu_bg/')
@@ -52,9 +53,9 @@ class MainMenu:
 			pygame.quit()
 			sys.exit()
 
-		self.start_image = pygame.image.load(f'{big_button_path}/play_button.png').convert_alpha()
-		self.settings_image = pygame.image.load(f'{big_button_path}/settings_button.png').convert_alpha()
-		self.exit_image = pygame.image.load(f'{big_button_path}/exit_button.png').convert_alpha()
+		self.start_image = assets.image(f'{big_button_path}/play_button.png')
+		self.settings_image = assets.image(f'{big_button_path}/settings_button.png')
+		self.exit_image = assets.image(f'{big_button_path}/exit_button.png')
 
 		self.start_button = Button(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 65, self.start_image, 2.3, start_game)
 		self.settings_button = Button(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, self.settings_image, 2.3,  open_settings)
@@ -115,7 +116,7 @@ class PauseMenu:
 		self.to_home_active = False
 
 		# Load background with transparency
-		self.pause_bg = pygame.image.load(f'{GRAPHICS_PATH}/ui/pause_bg.png').convert_alpha()
+		self.pause_bg = assets.image(f'{GRAPHICS_PATH}/ui/pause_bg.png')
 		bg_scale = 3 
 		self.pause_bg = pygame.transform.scale(
 			self.pause_bg, 
@@ -125,8 +126,8 @@ class PauseMenu:
 		self.pause_rect = self.pause_bg.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
 
 		# Load button images
-		self.resume_image = pygame.image.load(f'{big_button_path}/resume_button.png').convert_alpha()
-		self.exit_to_home_image = pygame.image.load(f'{big_button_path}/home_button.png').convert_alpha()
+		self.resume_image = assets.image(f'{big_button_path}/resume_button.png')
+		self.exit_to_home_image = assets.image(f'{big_button_path}/home_button.png')
 
 		# Create buttons with timers
 		self.resume_button = Button(
@@ -195,7 +196,8 @@ class ShopMenu:
 		self.player = player
 		self.toggle_menu = toggle_menu
 		self.display_surface = pygame.display.get_surface()
-		self.font = pygame.font.Font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
+		assets.preload(ASSET_MANIFEST['shop'])
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
 		self.items_data = self.load_items_from_db()
 
 		# Options
@@ -223,17 +225,17 @@ class ShopMenu:
 
 		# Movement
 		self.index = 0
-		self.timer = Timer(200)
+		self.timer = Timer(200, clock='wall')
 
 		# Scaled icons (adjust the size multiplier as needed)
 		scale_factor = 0.5
 		self.icons = {}
 		for item in self.trade_options:
-			original_img = pygame.image.load(f'{GRAPHICS_PATH}/items/{item.item_name.lower()}.png').convert_alpha()
+			original_img = assets.image(f'{GRAPHICS_PATH}/items/{item.item_name.lower()}.png')
 			scaled_width = int(original_img.get_width() * scale_factor)
 			scaled_height = int(original_img.get_height() * scale_factor)
 			self.icons[item.item_name] = pygame.transform.scale(original_img, (scaled_width, scaled_height))
-		original_money = pygame.image.load(f'{GRAPHICS_PATH}/items/coins.png').convert_alpha()
+		original_money = assets.image(f'{GRAPHICS_PATH}/items/coins.png')
 		money_scaled_width = int(original_money.get_width() * scale_factor)
 		money_scaled_height = int(original_money.get_height() * scale_factor)
 		self.money_icon = pygame.transform.scale(original_money, (money_scaled_width, money_scaled_height))		
@@ -364,11 +366,11 @@ class ShopMenu:
 		self.header_amount = self.font.render('Amount', False, 'Black')
 
 		# Button
-		buy_btn_surf = pygame.image.load(f'{GRAPHICS_PATH}/ui/shop_menu/buy_button_off.png').convert_alpha()
-		sell_btn_surf = pygame.image.load(f'{GRAPHICS_PATH}/ui/shop_menu/sell_button_off.png').convert_alpha()
+		buy_btn_surf = assets.image(f'{GRAPHICS_PATH}/ui/shop_menu/buy_button_off.png')
+		sell_btn_surf = assets.image(f'{GRAPHICS_PATH}/ui/shop_menu/sell_button_off.png')
 		# Button
-		buy_btn_surf_on = pygame.image.load(f'{GRAPHICS_PATH}/ui/shop_menu/buy_button_on.png').convert_alpha()
-		sell_btn_surf_on = pygame.image.load(f'{GRAPHICS_PATH}/ui/shop_menu/sell_button_on.png').convert_alpha()
+		buy_btn_surf_on = assets.image(f'{GRAPHICS_PATH}/ui/shop_menu/buy_button_on.png')
+		sell_btn_surf_on = assets.image(f'{GRAPHICS_PATH}/ui/shop_menu/sell_button_on.png')
 		
 		buy_button = Button(0, 0, buy_btn_surf, 1.5, self.buy_seletected_item, None, None, buy_btn_surf_on)
 		sell_button = Button(0, 0, sell_btn_surf, 1.5, self.sell_selected_item, None, None, sell_btn_surf_on)
@@ -523,14 +525,12 @@ class ShopMenu:
 		self.display_surface.blit(self.header_amount, amount_rect)
 
 	def update(self, dt):
-		self.timer.update()
-		
 		for event in pygame.event.get():
 			if event.type == pygame.KEYDOWN:
-				if event.key == keys_bind['action']['batch trade']:
+				if event.key == settings_service.keys_bind['action']['batch trade']:
 					self.batch_trade = True
 			if event.type == pygame.KEYUP:
-				if event.key == keys_bind['action']['batch trade']:
+				if event.key == settings_service.keys_bind['action']['batch trade']:
 					self.batch_trade = False
 			
 			# Xử lý sự kiện cuộn
@@ -623,18 +623,18 @@ class SettingsMenu:
 		self.height = 400
 		self.paddingx = 130
 		self.paddingy = 80
-		self.font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 30)
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
 		self.keys_bind = {}
 		self.move_keybind_buttons = {}
 		# Load current global volume from settings
-		self.volume = SettingsDB.get_settings()['volume']
+		self.volume = settings_service.volume
 		self.old_volume = self.volume 
 		
 		self.volume_surfs = import_folder(f'{GRAPHICS_PATH}/ui/settings_menu/volume/levels/')
 		self.muted = False
 		
 		# Instead of referencing KEY_BIND directly, create a deep copy
-		self.keybinds = copy.deepcopy(keys_bind)
+		self.keybinds = copy.deepcopy(settings_service.keys_bind)
 		# This copy is temporary and will be persisted only on confirm.
 		self.keybind_buttons = {}
 		self.selected_keybind = None
@@ -646,7 +646,7 @@ class SettingsMenu:
 		self.action_column_x = self.paddingx
 		self.move_column_x = self.paddingx + 250
 		
-		self.keybind_image = pygame.image.load(f'{GRAPHICS_PATH}/ui/settings_menu/key_bind_text.png')
+		self.keybind_image = assets.image(f'{GRAPHICS_PATH}/ui/settings_menu/key_bind_text.png')
 		self.keybind_surf = pygame.transform.scale(self.keybind_image, (100, 30))
 		for action, key in self.keybinds['action'].items():
 			keybind_rect = self.keybind_surf.get_rect(top = start_y, right = self.paddingx)
@@ -658,20 +658,20 @@ class SettingsMenu:
 			self.move_keybind_buttons[move] = rect
 			start_y_move += 50
 
-		self.cursor_img = pygame.image.load(f"{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png").convert_alpha()
+		self.cursor_img = assets.image(f"{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png")
 		# Create the Back button (used to exit settings)
-		self.back_surf = pygame.image.load(f"{small_button_path}/exit_button_off.png").convert_alpha()
+		self.back_surf = assets.image(f"{small_button_path}/exit_button_off.png")
 		self.back_surf_scaled = pygame.transform.scale_by(self.back_surf, 1.6)
 		self.back_button = Button(80, SCREEN_HEIGHT - 75, self.back_surf_scaled, 1.5, self.exit_settings)
 
 		# Setup volume control buttons (code omitted for brevity)
 		# Nút tăng âm lượng 
-		self.volume_up_button_off_surf = pygame.image.load(f'{small_button_path}/volume_up_button_off.png')
-		self.volume_up_button_on_surf = pygame.image.load(f'{small_button_path}/volume_up_button_on.png')
+		self.volume_up_button_off_surf = assets.image(f'{small_button_path}/volume_up_button_off.png')
+		self.volume_up_button_on_surf = assets.image(f'{small_button_path}/volume_up_button_on.png')
 		
 		# Nút giảm âm lượng
-		self.volume_down_button_off_surf = pygame.image.load(f'{small_button_path}/volume_down_button_off.png')
-		self.volume_down_button_on_surf = pygame.image.load(f'{small_button_path}/volume_down_button_on.png')
+		self.volume_down_button_off_surf = assets.image(f'{small_button_path}/volume_down_button_off.png')
+		self.volume_down_button_on_surf = assets.image(f'{small_button_path}/volume_down_button_on.png')
 		
 		self.volume_up_surf_off = pygame.transform.scale_by(self.volume_up_button_off_surf, 1.6)
 		self.volume_down_surf_off = pygame.transform.scale_by(self.volume_down_button_off_surf, 1.6)
@@ -681,8 +681,8 @@ class SettingsMenu:
 		
 		# Nút tắt âm lượng
 		# Vẽ trạng thái mute
-		self.mute_surf_on = pygame.image.load(f'{small_button_path}/mute_button_on.png')
-		self.mute_surf_off = pygame.image.load(f'{small_button_path}/mute_button_off.png')
+		self.mute_surf_on = assets.image(f'{small_button_path}/mute_button_on.png')
+		self.mute_surf_off = assets.image(f'{small_button_path}/mute_button_off.png')
 		
 		self.mute_surf_on = pygame.transform.scale_by(self.mute_surf_on, 1.6)
 		self.mute_surf_off = pygame.transform.scale_by(self.mute_surf_off, 1.6)
@@ -716,15 +716,11 @@ class SettingsMenu:
 
 	def exit_settings(self):
 		# Backup current (original) keybinds in case the user cancels
-		original_keybinds = copy.deepcopy(keys_bind)
+		original_keybinds = copy.deepcopy(settings_service.keys_bind)
 
 		def on_confirm():
-			# Save the modified keybinds along with volume to the database
-			SettingsDB.save_setting(self.volume, self.keybinds)
-			 # Immediately update the global KEY_BIND so new keys are used by the game
-			global keys_bind
-			keys_bind = self.keybinds
-			set_global_volume(self.volume)
+			# Áp dụng ngay (subscriber cập nhật keybind của player và âm lượng), ghi DB trên thread nền
+			settings_service.update(volume = self.volume, keys_bind = self.keybinds)
 			print("Settings saved and new keybinds applied.")
 			self.running = False  
 
@@ -771,8 +767,7 @@ class SettingsMenu:
 		mouse_pos = pygame.mouse.get_pos()
 		# Draw a translucent background
 		self.display_surface.fill((0, 0, 0))
-		self.settings_surf = pygame.image.load(f'{GRAPHICS_PATH}/ui/settings_menu/settings_bg.png')
-		self.settings_surf_scaled = pygame.transform.scale(self.settings_surf, (SCREEN_WIDTH, SCREEN_HEIGHT))
+		self.settings_surf_scaled = assets.scaled(f'{GRAPHICS_PATH}/ui/settings_menu/settings_bg.png', (SCREEN_WIDTH, SCREEN_HEIGHT))
 		self.settings_rect = self.settings_surf_scaled.get_rect()
 		self.display_surface.blit(self.settings_surf_scaled, self.settings_rect)
 		
@@ -882,15 +877,15 @@ class ConfirmationPopup:
 		self.display_surface = display_surface
 		self.on_confirm = on_confirm
 		self.on_cancel = on_cancel
-		self.font = pygame.font.Font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 30)
 		self.message = "Save changes to settings?"
 		self.message_surf = self.font.render(self.message, True, (255, 255, 255))
 		self.message_rect = self.message_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
 
-		self.cursor_img = pygame.image.load(f"{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png").convert_alpha()
+		self.cursor_img = assets.image(f"{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png")
 		# Create Yes and No buttons. Adjust image paths as needed.
-		yes_image = pygame.image.load(f'{GRAPHICS_PATH}/ui/confirm_popup/button_white_up.png').convert_alpha()
-		no_image = pygame.image.load(f'{GRAPHICS_PATH}/ui/confirm_popup/button_Orange_up.png').convert_alpha()
+		yes_image = assets.image(f'{GRAPHICS_PATH}/ui/confirm_popup/button_white_up.png')
+		no_image = assets.image(f'{GRAPHICS_PATH}/ui/confirm_popup/button_Orange_up.png')
 		self.yes_button = Button(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 50, yes_image, 2.3, self.confirm)
 		self.no_button = Button(SCREEN_WIDTH // 2 + 100, SCREEN_HEIGHT // 2 + 50, no_image, 2.3, self.cancel)
 		self.running = True
@@ -930,9 +925,9 @@ class CharacterSelectUI:
 		self.on_cancel_callback = on_cancel_callback  # Gọi khi hủy/quay lại
 		
 		# Fonts
-		self.title_font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 48)
-		self.header_font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 32)
-		self.font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 24)
+		self.title_font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 48)
+		self.header_font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 32)
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 24)
 		
 		# Load danh sách nhân vật đã lưu
 		self.characters = PlayerDatabase.get_all_players()
@@ -948,10 +943,10 @@ class CharacterSelectUI:
 		self.bg_color = (20, 20, 30, 240)
 		
 		# Load hình ảnh nút
-		self.new_btn_img = pygame.image.load(f'{medium_button_path}/new_button.png').convert_alpha()
-		self.select_btn_img = pygame.image.load(f'{medium_button_path}/select_button.png').convert_alpha() 
-		self.back_btn_img = pygame.image.load(f'{medium_button_path}/back_button.png').convert_alpha()
-		self.delete_btn_img = pygame.image.load(f'{small_button_path}/delete_button.png').convert_alpha()
+		self.new_btn_img = assets.image(f'{medium_button_path}/new_button.png')
+		self.select_btn_img = assets.image(f'{medium_button_path}/select_button.png') 
+		self.back_btn_img = assets.image(f'{medium_button_path}/back_button.png')
+		self.delete_btn_img = assets.image(f'{small_button_path}/delete_button.png')
 		self.delete_btn_img = pygame.transform.scale(self.delete_btn_img, (30, 30))
 		
 		# Tạo nút
@@ -982,7 +977,7 @@ class CharacterSelectUI:
 		# Thêm biến cho thông báo lỗi
 		self.error_message = ""
 		self.show_error = False
-		self.error_font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 18)
+		self.error_font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 18)
 		self.error_color = (255, 80, 80)  # Màu đỏ cho thông báo lỗi
 		
 	def toggle_creation_mode(self):
@@ -1049,7 +1044,7 @@ class CharacterSelectUI:
 			if character_data:
 				# Giả sử có một đường dẫn avatar hoặc sprite sheet trong dữ liệu nhân vật
 				# Hoặc sử dụng một sprite sheet mặc định
-				character_sprites = pygame.image.load(f"{GRAPHICS_PATH}/character/bonnie.png").convert_alpha()
+				character_sprites = assets.image(f"{GRAPHICS_PATH}/character/bonnie.png")
 				if character_sprites:
 					self.avatar = character_sprites
 					self.preview_character = character_id
@@ -1433,3 +1428,22 @@ class CharacterSelectUI:
 		self.display_surface.blit(yes_text, yes_text_rect)
 		self.display_surface.blit(no_text, no_text_rect)
 
+
+class LoadingScreen:
+	"""Màn hình chờ trong lúc dữ liệu người chơi được đọc trên thread nền"""
+	def __init__(self, screen):
+		self.screen = screen
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 48)
+		self.elapsed = 0
+
+	def reset(self):
+		self.elapsed = 0
+
+	def draw(self, dt):
+		self.elapsed += dt
+		dots = '.' * (int(self.elapsed * 3) % 4)
+		self.screen.fill((30, 30, 40))
+		text_surf = self.font.render(f'Loading{dots}', True, 'White')
+		# Căn theo chữ không có dấu chấm để chữ không bị nhảy
+		text_rect = self.font.render('Loading', True, 'White').get_rect(center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+		self.screen.blit(text_surf, text_rect)
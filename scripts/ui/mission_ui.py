@@ -2,16 +2,18 @@ import pygame
 from datetime import datetime
 from settings import GRAPHICS_PATH, SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH
 from scripts.ui.button import Button
+from scripts.helpers.assets import assets
+from scripts.helpers.text import text_renderer
 
 class MissionUI:
     def __init__(self, mission_manager):
         self.mission_manager = mission_manager
         
         # Fonts
-        self.title_font = pygame.font.Font(f"{FONT_PATH}/LycheeSoda.ttf", 28)
-        self.header_font = pygame.font.Font(f"{FONT_PATH}/LycheeSoda.ttf", 22)
-        self.font = pygame.font.Font(f"{FONT_PATH}/LycheeSoda.ttf", 18)
-        self.small_font = pygame.font.Font(f"{FONT_PATH}/LycheeSoda.ttf", 14)
+        self.title_font = text_renderer.font(f"{FONT_PATH}/LycheeSoda.ttf", 28)
+        self.header_font = text_renderer.font(f"{FONT_PATH}/LycheeSoda.ttf", 22)
+        self.font = text_renderer.font(f"{FONT_PATH}/LycheeSoda.ttf", 18)
+        self.small_font = text_renderer.font(f"{FONT_PATH}/LycheeSoda.ttf", 14)
         
         # Panel dimensions - use relative positioning based on screen size
         panel_width = min(380, SCREEN_WIDTH * 0.35)  # Max 35% of screen width
@@ -53,11 +55,11 @@ class MissionUI:
         
         # Load icons
         self.mission_icons = {
-            "daily": pygame.image.load(f"{GRAPHICS_PATH}/ui/mission/daily_icon.png").convert_alpha() if pygame.image.get_extended() else None,
-            "weekly": pygame.image.load(f"{GRAPHICS_PATH}/ui/mission/weekly_icon.png").convert_alpha() if pygame.image.get_extended() else None,
-            "story": pygame.image.load(f"{GRAPHICS_PATH}/ui/mission/story_icon.png").convert_alpha() if pygame.image.get_extended() else None,
-            "chained": pygame.image.load(f"{GRAPHICS_PATH}/ui/mission/chained_icon.png").convert_alpha() if pygame.image.get_extended() else None,
-            "one_time": pygame.image.load(f"{GRAPHICS_PATH}/ui/mission/one_time_icon.png").convert_alpha() if pygame.image.get_extended() else None
+            "daily": assets.image(f"{GRAPHICS_PATH}/ui/mission/daily_icon.png") if pygame.image.get_extended() else None,
+            "weekly": assets.image(f"{GRAPHICS_PATH}/ui/mission/weekly_icon.png") if pygame.image.get_extended() else None,
+            "story": assets.image(f"{GRAPHICS_PATH}/ui/mission/story_icon.png") if pygame.image.get_extended() else None,
+            "chained": assets.image(f"{GRAPHICS_PATH}/ui/mission/chained_icon.png") if pygame.image.get_extended() else None,
+            "one_time": assets.image(f"{GRAPHICS_PATH}/ui/mission/one_time_icon.png") if pygame.image.get_extended() else None
         }
         
         # Scale icons if loaded
@@ -75,12 +77,12 @@ class MissionUI:
         }
         
         # Reward icon
-        self.reward_icon = pygame.image.load(f"{GRAPHICS_PATH}/items/coins.png").convert_alpha() if pygame.image.get_extended() else None
+        self.reward_icon = assets.image(f"{GRAPHICS_PATH}/items/coins.png") if pygame.image.get_extended() else None
         if self.reward_icon:
             self.reward_icon = pygame.transform.scale(self.reward_icon, (20, 20))
         
         # Toggle button
-        self.toggle_button_img = pygame.image.load(f"{GRAPHICS_PATH}/ui/mission_toggle.png").convert_alpha()
+        self.toggle_button_img = assets.image(f"{GRAPHICS_PATH}/ui/mission_toggle.png")
         self.toggle_button_img = pygame.transform.scale(self.toggle_button_img, (32, 42))
         self.toggle_button_img = pygame.transform.flip(self.toggle_button_img, True, False)
         # CHANGED: Initial position for toggle button will be updated in update()
@@ -1,5 +1,7 @@
 import pygame
 from settings import *
+from scripts.helpers.assets import assets
+from scripts.helpers.text import text_renderer, TypewriterLayout
 
 class Overlay:
 	def __init__(self, player):
@@ -8,14 +10,14 @@ class Overlay:
 		
 		# Nhập các tài nguyên
 		overlay_path = f'{GRAPHICS_PATH}/overlay/'
-		self.tools_surface = {tool: pygame.image.load(f'{overlay_path}{tool}.png').convert_alpha() for tool in player.tools}
+		self.tools_surface = {tool: assets.image(f'{overlay_path}{tool}.png') for tool in player.tools}
 		self.hotbar_surface = {}
 	  
 		# Tải các thành phần giao diện
-		self.highlight_surface = pygame.image.load(f'{overlay_path}hotbar/hotbar_selected_highlight.png').convert_alpha()
-		self.tool_slot = pygame.image.load(f'{overlay_path}tool_slot.png').convert_alpha()
-		hotbar_bg = pygame.image.load(f'{overlay_path}hotbar/hotbar_bg.png').convert_alpha()
-		self.slot_background = pygame.image.load(f'{overlay_path}hotbar/hotbar_slot.png').convert_alpha()
+		self.highlight_surface = assets.image(f'{overlay_path}hotbar/hotbar_selected_highlight.png')
+		self.tool_slot = assets.image(f'{overlay_path}tool_slot.png')
+		hotbar_bg = assets.image(f'{overlay_path}hotbar/hotbar_bg.png')
+		self.slot_background = assets.image(f'{overlay_path}hotbar/hotbar_slot.png')
 		
 		# Thanh công cụ nền
 		self.hotbar_background = hotbar_bg
@@ -38,8 +40,12 @@ class Overlay:
 		self.hotbar_x = (SCREEN_WIDTH - self.hotbar_width) // 2
 		self.hotbar_y = SCREEN_HEIGHT - self.hotbar_height - 10
 		
-		# Bề mặt cho overlay
+		# Bề mặt cho overlay: chỉ vẽ lại khi hotbar/lựa chọn/hiệu ứng đánh dấu thay đổi
 		self.overlay_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+		self.overlay_rect = self.overlay_surf.get_rect()
+		self.overlay_state = None
+		self.hotbar_dirty = True
+		player.inventory.add_listener(self.mark_hotbar_dirty)
 
 		# Thêm biến để theo dõi trạng thái kéo chuột giữa
 		self.middle_mouse_scrolling = False
@@ -106,7 +112,7 @@ class Overlay:
 		# Tải lại hình ảnh cho tất cả hạt giống hiện tại
 		for item in self.player.hotbar:
 			try:
-				self.hotbar_surface[item] = pygame.image.load(f'{GRAPHICS_PATH}/items/{item}.png').convert_alpha()
+				self.hotbar_surface[item] = assets.image(f'{GRAPHICS_PATH}/items/{item}.png')
 			except:
 				print(f"Không thể tải hình ảnh cho vật phẩm: {item}")
 		
@@ -119,10 +125,17 @@ class Overlay:
 			total_padding = self.hotbar_width - (2 * 20) - (self.total_items * self.slot_size)
 			self.slot_padding = total_padding // (self.total_items - 1)
 
+	def mark_hotbar_dirty(self):
+		self.hotbar_dirty = True
+
 	def update_hotbar(self):
 		"""Cập nhật hotbar khi danh sách công cụ hoặc hạt giống thay đổi"""
-		# Cập nhật bề mặt hạt giống
-		self.update_hotbar_surfaces()
+		# Chỉ nạp lại bề mặt hạt giống khi inventory đã thay đổi
+		if self.hotbar_dirty:
+			self.player.update_hotbar()
+			self.update_hotbar_surfaces()
+			self.hotbar_dirty = False
+			self.overlay_state = None
 		
 		# Đảm bảo chỉ số được chọn vẫn hợp lệ
 		if self.selected_index >= len(self.items):
@@ -131,7 +144,7 @@ class Overlay:
 		# Cập nhật trạng thái lựa chọn của người chơi
 		self.update_selected_index()
 	
-	def draw_toolbar(self):
+	def draw_toolbar(self, surface):
 		# Lấy vị trí của thanh hotbar
 		hotbar_rect = self.hotbar_background.get_rect(topleft=(self.hotbar_x, self.hotbar_y))
 		current_tool = self.player.selected_tool
@@ -150,19 +163,19 @@ class Overlay:
 		start_y = toolbar_rect.top + (self.hotbar_height - self.slot_size) // 2 + 10  # Căn giữa theo chiều dọc
 		tool_slot_rect = self.tool_slot.get_rect(centery = toolbar_rect.centery + 10, left = toolbar_rect.left)
 
-		self.display_surface.blit(tool_background, toolbar_rect)
+		surface.blit(tool_background, toolbar_rect)
 		for index, tool in enumerate(self.player.tools):
 			item_x = start_x + index * (slot_size[0] + padding)
 			item_y = start_y
 			
 			slot_rect = pygame.Rect(item_x, item_y, slot_size[0], slot_size[1])
-			self.display_surface.blit(
+			surface.blit(
 				pygame.transform.scale(self.slot_background, slot_size),
 				slot_rect
 			)
 			tool_surface = pygame.transform.scale(self.tools_surface[tool], (slot_size[0] // 1.5, slot_size[1] // 1.5))
 			tool_rect = tool_surface.get_rect(centerx=slot_rect.centerx, centery=slot_rect.centery - 5)
-			self.display_surface.blit(tool_surface, tool_rect)
+			surface.blit(tool_surface, tool_rect)
 			
 			# Cập nhật vị trí cho slot tiếp theo
 			tool_slot_rect.left += slot_width + spacing
@@ -175,11 +188,11 @@ class Overlay:
 					(highlight_size, highlight_size)
 				)
 				highlight_rect = highlight.get_rect(center=slot_rect.center)
-				self.display_surface.blit(highlight, highlight_rect)
+				surface.blit(highlight, highlight_rect)
 
-	def draw_hotbar(self):
+	def draw_hotbar(self, surface):
 		# Vẽ nền thanh công cụ
-		self.display_surface.blit(self.hotbar_background, (self.hotbar_x, self.hotbar_y))
+		surface.blit(self.hotbar_background, (self.hotbar_x, self.hotbar_y))
 		
 		# Tính vị trí bắt đầu cho vật phẩm đầu tiên
 		start_x = self.hotbar_x + 20  # Khoảng cách cố định từ cạnh trái
@@ -196,7 +209,7 @@ class Overlay:
 			
 			# Vẽ nền ô
 			slot_rect = pygame.Rect(item_x, item_y, self.slot_size, self.slot_size)
-			self.display_surface.blit(
+			surface.blit(
 				pygame.transform.scale(self.slot_background, (self.slot_size, self.slot_size)),
 				slot_rect
 			)
@@ -220,7 +233,7 @@ class Overlay:
 					(highlight_size, highlight_size)
 				)
 				highlight_rect = highlight.get_rect(center=slot_rect.center)
-				self.display_surface.blit(highlight, highlight_rect)
+				surface.blit(highlight, highlight_rect)
 			
 			# Vẽ vật phẩm với tỷ lệ nhất quán
 			item_size = (self.slot_size - 8 ) // 1.5 # Để lại khoảng trống trong ô
@@ -241,7 +254,7 @@ class Overlay:
 				item_surface = pygame.transform.scale(item_surface, (scaled_size, scaled_size))
 				
 			item_rect = item_surface.get_rect(center=slot_rect.center)
-			self.display_surface.blit(item_surface, item_rect)
+			surface.blit(item_surface, item_rect)
 
 	def display(self, dt=1/60):
 		# Cập nhật thời gian chờ giữa các lần cuộn
@@ -254,18 +267,20 @@ class Overlay:
 		
 		# Cập nhật chỉ số được chọn trước khi vẽ
 		self.selected_index = self.player.hotbar_index
- 
-
-		# Xóa bề mặt overlay
-		self.overlay_surf.fill((0, 0, 0, 0))
-		# Vẽ thanh công cụ
-		self.draw_hotbar()
-		self.draw_toolbar()
-
 		self.update_hotbar()
-		
-		# Vẽ bề mặt overlay lên màn hình
-		self.display_surface.blit(self.overlay_surf, (0, 0))
+
+		# Vẽ lại thanh công cụ chỉ khi nội dung, lựa chọn hoặc hiệu ứng đánh dấu thay đổi
+		state = (tuple(self.items), self.player.selected_item, self.player.selected_tool,
+				 max(self.scroll_highlight_timer, 0))
+		if state != self.overlay_state:
+			self.overlay_state = state
+			self.overlay_surf.fill((0, 0, 0, 0))
+			self.draw_hotbar(self.overlay_surf)
+			self.draw_toolbar(self.overlay_surf)
+			self.overlay_rect = self.overlay_surf.get_bounding_rect()
+		
+		# Vẽ bề mặt overlay lên màn hình (chỉ vùng có nội dung)
+		self.display_surface.blit(self.overlay_surf, self.overlay_rect, self.overlay_rect)
 
 class Dialog:
 	"""Hệ thống hội thoại nâng cao cho tất cả NPC với kiểu dáng và tương tác tốt hơn"""
@@ -282,17 +297,17 @@ class Dialog:
 		font_size = int(20 * self.scale_factor)
 		name_font_size = int(30 * self.scale_factor)
 		
-		self.font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', font_size)
-		self.name_font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', name_font_size)
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', font_size)
+		self.name_font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', name_font_size)
 		
 		# Tải tài nguyên giao diện hội thoại
-		self.dialog_bg_surface = pygame.image.load(f'{GRAPHICS_PATH}/ui/dialog/dialog_bg.png').convert_alpha()
-		self.dialog_avatar_frame_surface = pygame.image.load(f'{GRAPHICS_PATH}/ui/dialog/dialog_avata_frame.png').convert_alpha()
+		self.dialog_bg_surface = assets.image(f'{GRAPHICS_PATH}/ui/dialog/dialog_bg.png')
+		self.dialog_avatar_frame_surface = assets.image(f'{GRAPHICS_PATH}/ui/dialog/dialog_avata_frame.png')
 		
-		self.dialog_text_surface_top = pygame.image.load(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_top.png').convert_alpha()
-		self.dialog_text_surface = pygame.image.load(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box.png').convert_alpha()
-		self.dialog_text_surface_bottom = pygame.image.load(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_bottom.png').convert_alpha()
-		self.dialog_text_surface_arrow = pygame.image.load(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_arrow.png').convert_alpha()
+		self.dialog_text_surface_top = assets.image(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_top.png')
+		self.dialog_text_surface = assets.image(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box.png')
+		self.dialog_text_surface_bottom = assets.image(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_bottom.png')
+		self.dialog_text_surface_arrow = assets.image(f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_arrow.png')
 		
 		# Kiểu hội thoại dựa trên loại NPC
 		self.npc_type = npc_type
@@ -302,7 +317,7 @@ class Dialog:
 		self.avatar_surface = None
 		if avatar_path:
 			try:
-				self.avatar_surface = pygame.image.load(avatar_path).convert_alpha()
+				self.avatar_surface = assets.image(avatar_path)
 			except:
 				print(f"Không thể tải avatar từ: {avatar_path}")
 		
@@ -323,6 +338,9 @@ class Dialog:
 		# Thông số hoạt ảnh
 		self.current_text = ""
 		self.text_index = 0
+		self.text_layout = None  # TypewriterLayout, tạo khi vẽ lần đầu
+		self.display_source = None
+		self.display_text = ""
 		self.animation_speed = 0.03  # Giá trị thấp hơn = nhanh hơn
 		self.is_text_complete = False
 		self.is_active = True
@@ -452,7 +470,7 @@ class Dialog:
 	def set_emote(self, emote_name):
 		"""Thiết lập biểu cảm hiển thị trên avatar"""
 		try:
-			self.emote_surface = pygame.image.load(f'{GRAPHICS_PATH}/ui/emotes/{emote_name}.png').convert_alpha()
+			self.emote_surface = assets.image(f'{GRAPHICS_PATH}/ui/emotes/{emote_name}.png')
 			self.emote = emote_name
 			self.emote_timer = 0
 		except:
@@ -628,7 +646,7 @@ class Dialog:
 						
 						# Phát âm thanh gõ mỗi 4 ký tự
 						if self.text_index % 6 == 0:
-							char_sound.set_volume(0.2 * global_volume)
+							char_sound.set_volume(0.2 * settings_service.volume)
 							char_sound.play()
 				else:
 					self.is_text_complete = True
@@ -645,6 +663,15 @@ class Dialog:
 		"""Vẽ hộp hội thoại đáp ứng với lựa chọn có thể có"""
 		if not self.is_active:
 			return
+
+		# Bố cục văn bản gõ chữ: chỉ ngắt dòng lại khi đổi câu, chỉ render ký tự mới hiện
+		text_area_width = self.text_box_width - (self.padding['text'] * 2)
+		if self.text_layout is None:
+			self.text_layout = TypewriterLayout(self.font, text_area_width, self.text_color)
+		if self.display_source != self.text:
+			self.display_source = self.text
+			self.display_text = self.strip_speed_codes(self.text)
+		self.text_layout.update(self.display_text, self.current_text)
 			
 		# Tính toán chiều cao văn bản để điều chỉnh kích thước
 		if self.in_choice_mode and self.is_text_complete:
@@ -655,7 +682,7 @@ class Dialog:
 			])
 			text_height = self.calculate_text_dimensions(total_text)
 		else:
-			text_height = self.calculate_text_dimensions(self.current_text)
+			text_height = self.text_layout.height()
 		
 		# Tính toán chiều cao hộp với đệm
 		text_box_height = max(self.min_height, text_height + (self.padding['text'] * 2))
@@ -829,16 +856,15 @@ class Dialog:
 		self.screen.blit(name_surface, (name_x, name_y))
 
 		# Vẽ văn bản với ngắt dòng
-		text_area_width = self.text_box_width - (self.padding['text'] * 2)
 		text_start_x = self.dialog_text_rect_center.left + self.padding['text']
 		text_start_y = self.dialog_text_rect_center.top + self.padding['text']
 		
 		# Vẽ văn bản thông thường
-		self.render_text(self.current_text, text_start_x, text_start_y, text_area_width)
+		self.text_layout.draw(self.screen, text_start_x, text_start_y)
 
 		# Vẽ lựa chọn nếu đang ở chế độ lựa chọn và văn bản đã hoàn thành
 		if self.in_choice_mode and self.is_text_complete:
-			choice_y = text_start_y + self.calculate_text_dimensions(self.current_text) + 20
+			choice_y = text_start_y + self.text_layout.height() + 20
 			for i, choice in enumerate(self.choices):
 				# Kiểu dáng khác nhau cho lựa chọn đã chọn
 				if i == self.selected_choice:
@@ -892,6 +918,20 @@ class Dialog:
 			)
 
 	# Các phương thức trợ giúp
+	@staticmethod
+	def strip_speed_codes(text):
+		"""Văn bản sau khi gõ xong: bỏ các mã tốc độ '{p', '{f', '{s', '{n' giống như update()"""
+		result = []
+		index = 0
+		while index < len(text):
+			if text[index] == '{' and index + 1 < len(text) and text[index + 1] in 'pfsn':
+				index += 2
+				if index >= len(text):
+					break
+			result.append(text[index])
+			index += 1
+		return ''.join(result)
+
 	def calculate_text_dimensions(self, text):
 		"""Tính toán chiều cao cần thiết cho văn bản với chiều rộng cố định"""
 		available_width = self.text_box_width - (self.padding['text'] * 2)
@@ -920,14 +960,6 @@ class Dialog:
 		lines.append(current_line)
 		return lines
 	
-	def render_text(self, text, x, y, max_width):
-		"""Vẽ văn bản với ngắt dòng đơn giản"""
-		lines = self.get_wrapped_text(text, max_width)
-		line_height = self.font.get_linesize()
-		for i, line in enumerate(lines):
-			text_surface = self.font.render(line, True, self.text_color)
-			self.screen.blit(text_surface, (x, y + i * line_height))
-	
 	def advance_dialog(self):
 		"""Được gọi khi người chơi nhấn phím để tiến hội thoại"""
 		if not self.is_text_complete:
@@ -966,7 +998,7 @@ class Clock:
 	def __init__(self, sky):
 		self.display_surface = pygame.display.get_surface()
 		self.sky = sky
-		self.font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 32)
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 32)
 		self.day_counter = DayCounter()
 		
 		# Cài đặt vị trí
@@ -1004,7 +1036,7 @@ class Clock:
 
 class DayCounter:
 	def __init__(self):
-		self.font = pygame.font.Font(f'{FONT_PATH}/Lycheesoda.ttf', 32)
+		self.font = text_renderer.font(f'{FONT_PATH}/LycheeSoda.ttf', 32)
 		self.paddingx = 20
 		self.paddingy = 20
 		self.position = (SCREEN_WIDTH - self.paddingx, self.paddingy)
@@ -1026,7 +1058,7 @@ class DayCounter:
 
 class FPSOverlay:
 	def __init__(self):
-		self.font = pygame.font.Font(None, 24)
+		self.font = assets.font(None, 24)
 	
 	def draw(self, display_surface, clock):
 		# Lấy FPS từ clock object
@@ -1,10 +1,19 @@
+import os
 import pygame
 from pygame.math import Vector2
+# Chạy không cửa sổ, không âm thanh (mô phỏng, benchmark, CI): SPROUT_HEADLESS=1
+HEADLESS = os.environ.get('SPROUT_HEADLESS') == '1'
+if HEADLESS:
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
 # screen
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 TILE_SIZE = 64
+CHUNK_SIZE = 512 # kích thước chunk nền tĩnh (bội số của TILE_SIZE)
 FPS = 60
+SIM_FPS = 60 # số bước mô phỏng mỗi giây, cố định và độc lập với FPS vẽ (grow_speed, transition tính theo bước)
+MAX_SIM_STEPS = 5 # số bước mô phỏng tối đa mỗi frame khi máy chậm; thời gian dư bị bỏ
 
 
 # assets path
@@ -99,6 +108,8 @@ RAIN_PROP = {
 		'min': 20 * 1000 , # Ít nhất mưa kéo dài 20 giây 
 		'max': 60 * 1000 # Dài nhất mưa kéo dài 60 giây
 	},
+	'spawn_rate': 60, # số hạt mưa sinh ra mỗi giây trên toàn bản đồ
+	'pool': 64, # số hạt tối đa cho mỗi loại (hạt rơi, vệt nước), dùng lại theo vòng
 }
 
 SOIL_PROP = {
@@ -117,6 +128,58 @@ TREE_ATTR = {
 }
 
 
+ASSET_PROP = {
+	'budget': 256 * 1024 * 1024, # giới hạn bộ nhớ cho AssetManager (byte)
+}
+
+# Asset nạp trước cho từng màn hình: (loại, *tham số) theo tên method của AssetManager
+ASSET_MANIFEST = {
+	'menu': [
+		('folder', f'{GRAPHICS_PATH}/ui/main_menu_bg/'),
+		('font', f'{FONT_PATH}/LycheeSoda.ttf', 50),
+		('image', f'{GRAPHICS_PATH}/ui/button/90x27/play_button.png'),
+		('image', f'{GRAPHICS_PATH}/ui/button/90x27/settings_button.png'),
+		('image', f'{GRAPHICS_PATH}/ui/button/90x27/exit_button.png'),
+		('image', f'{GRAPHICS_PATH}/mouse/Triangle Mouse icon 1.png'),
+		('image', f'{GRAPHICS_PATH}/mouse/Catpaw pointing Mouse icon.png'),
+		('image', f'{GRAPHICS_PATH}/mouse/Catpaw holding Mouse icon.png'),
+	],
+	'level': [
+		('folder_dict', f'{GRAPHICS_PATH}/world/soil/'),
+		('folder', f'{GRAPHICS_PATH}/world/soil_water/'),
+		('folder', f'{GRAPHICS_PATH}/world/water'),
+		('folder', f'{GRAPHICS_PATH}/world/rain/drops/'),
+		('folder', f'{GRAPHICS_PATH}/world/rain/floor/'),
+		('image', f'{GRAPHICS_PATH}/fruit/apple.png'),
+		('image', f'{GRAPHICS_PATH}/world/stumps/small.png'),
+		('image', f'{GRAPHICS_PATH}/world/stumps/large.png'),
+		('image', f'{GRAPHICS_PATH}/world/objects/tree_small.png'),
+		('image', f'{GRAPHICS_PATH}/world/objects/tree_medium.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/dialog_bg.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/dialog_avata_frame.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_top.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_bottom.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/dialog_text_box_arrow.png'),
+		('image', f'{GRAPHICS_PATH}/ui/dialog/avatar/bonnie.png'),
+	] + [
+		('folder', f'{GRAPHICS_PATH}/fruit/{plant}') for plant in GROW_SPEED
+	] + [
+		('folder', f'{GRAPHICS_PATH}/character/{direction}_{action}')
+		for direction in ('down', 'up', 'left', 'right')
+		for action in ('idle', 'move', 'hoe', 'axe', 'water')
+	],
+	'shop': [
+		('font', f'{FONT_PATH}/LycheeSoda.ttf', 30),
+		('image', f'{GRAPHICS_PATH}/items/coins.png'),
+		('image', f'{GRAPHICS_PATH}/ui/shop_menu/buy_button_off.png'),
+		('image', f'{GRAPHICS_PATH}/ui/shop_menu/sell_button_off.png'),
+		('image', f'{GRAPHICS_PATH}/ui/shop_menu/buy_button_on.png'),
+		('image', f'{GRAPHICS_PATH}/ui/shop_menu/sell_button_on.png'),
+	],
+}
+
+
 DEFAULT_KEY_BIND = {
 	'move': {
 		'up': pygame.K_w,
@@ -133,26 +196,32 @@ DEFAULT_KEY_BIND = {
 	}
 }
 
-from scripts.db.settings_db import SettingsDB
-settings_data = SettingsDB.get_settings()
-keys_bind = settings_data['keys_bind']
+# Settings người chơi nạp từ DB khi cần lần đầu (không truy vấn DB lúc import)
+from scripts.db.settings_service import settings_service
+default_volume = 3
+settings_service.set_defaults(volume = default_volume, keys_bind = DEFAULT_KEY_BIND)
+keys_bind = DEFAULT_KEY_BIND  # cập nhật qua subscriber khi settings được nạp/đổi
 
 def update_key_bind(new_keybind):
     global keys_bind
     keys_bind = new_keybind
 
-pygame.mixer.init()
+if not HEADLESS:
+	pygame.mixer.init()
 
-default_volume = 3
-global_volume = settings_data['volume']
-
-collect_item_sound = pygame.mixer.Sound(f'{AUDIO_PATH}/success.wav')
-background_music = pygame.mixer.Sound(f'{AUDIO_PATH}/bg.mp3')
-chopping_sound =  pygame.mixer.Sound(f'{AUDIO_PATH}/axe.mp3')
-tilt_sound = pygame.mixer.Sound(f'{AUDIO_PATH}/hoe.wav')
-watering_sound =  pygame.mixer.Sound(f'{AUDIO_PATH}/water.mp3')
-plant_seed_sound = pygame.mixer.Sound(f'{AUDIO_PATH}/plant.wav')
-char_sound = pygame.mixer.Sound(f'{AUDIO_PATH}/dialog_char.mp3')
+from scripts.helpers.assets import assets
+assets.budget = ASSET_PROP['budget']
+assets.headless = HEADLESS
+
+global_volume = default_volume
+
+collect_item_sound = assets.sound(f'{AUDIO_PATH}/success.wav')
+background_music = assets.sound(f'{AUDIO_PATH}/bg.mp3')
+chopping_sound =  assets.sound(f'{AUDIO_PATH}/axe.mp3')
+tilt_sound = assets.sound(f'{AUDIO_PATH}/hoe.wav')
+watering_sound =  assets.sound(f'{AUDIO_PATH}/water.mp3')
+plant_seed_sound = assets.sound(f'{AUDIO_PATH}/plant.wav')
+char_sound = assets.sound(f'{AUDIO_PATH}/dialog_char.mp3')
             
 sounds = [
 		background_music,
@@ -173,3 +242,8 @@ def set_global_volume(new_volume):
 	for sound in sounds:
 		sound.set_volume(norm_volume)
 
+def apply_settings(values):
+	update_key_bind(values['keys_bind'])
+	set_global_volume(values['volume'])
+
+settings_service.subscribe(apply_settings)